@@ -0,0 +1,16 @@
+### BLACKJACK ###
+# Blackjack game, round engine and analysis tools. Importing the package or any of its modules
+# has no side effects: the console game starts from blackjack.cli.main() (command: blackjack).
+#
+# Modules:
+#   cards, shoe, rng            card encoding, dealing shoe, shuffle backends
+#   engine                      I/O-free round engine and table rules
+#   strategy, dealer, ev        basic strategy, exact dealer probabilities, move EVs
+#   cli, render, server         console game, output backends, network game server
+#   sim, sweep, bench, profile  Monte Carlo simulator, rule sweeps, benchmarks, phase timings
+#   history, analytics          hand-history logs and their analysis
+#   checkpoint                  session snapshots for crash recovery
+#   batch, sidebet_odds         vectorized scoring and exact sidebet odds (numpy)
+
+
+__version__ = '5.1.0'
@@ -0,0 +1,8 @@
+### python -m blackjack ###
+# Plays the console game
+
+
+from blackjack.cli import main
+
+
+main()
@@ -0,0 +1,253 @@
+### BLACKJACK HISTORY ANALYTICS ###
+# Aggregate statistics over hand-history logs (history.py) in one streaming pass.
+# Each log file is memory-mapped as an array of records and processed a chunk of records at a
+# time with vectorized counting, so memory stays bounded whatever the size of the log and the
+# pass runs at disk speed.
+#
+# A log (a path and its rotated files) is one session with one bankroll. Several logs, e.g. the
+# per-task logs of a simulation, can be analyzed together; counts are summed and each log gets
+# its own bankroll summary.
+#
+# Requires numpy.
+# Usage: python -m blackjack.analytics sim-0000.bjh sim-0001.bjh
+
+
+import argparse
+import os
+import numpy as np
+from blackjack.batch import ACE_TABLE, VALUE_TABLE
+from blackjack.cards import CARD_VALUE
+from blackjack.engine import MAX_HANDS
+from blackjack.history import (FLAG_INSURANCE, FLAG_SPLIT, FLAG_EXITED, HEADER_SIZE, OUTCOME_CODES, RECORD_FIELDS,
+                               RECORD_SIZE, history_files, read_header)
+
+
+_FIELD_TYPES = {'Q': '<u8', 'd': '<f8', 'B': 'u1'}
+
+## numpy dtype of a record, matching history.RECORD_FORMAT
+RECORD_DTYPE = np.dtype({
+    'names': [name for name, fmt in RECORD_FIELDS],
+    'formats': [('u1', (int(fmt[:-1]),)) if fmt.endswith('s') else _FIELD_TYPES[fmt] for name, fmt in RECORD_FIELDS],
+    'offsets': list(np.cumsum([0] + [int(fmt[:-1]) if fmt.endswith('s') else np.dtype(_FIELD_TYPES[fmt]).itemsize
+                                   for name, fmt in RECORD_FIELDS])[:-1]),
+    'itemsize': RECORD_SIZE,
+})
+
+NUM_TOTALS = 23         # player totals 0..21, 22 = bust
+NUM_UPCARDS = 11        # dealer upcard values 1 (Ace) .. 10, index 0 unused
+WIN, LOSE, PUSH = 0, 1, 2
+
+# outcome code -> WIN / LOSE / PUSH, -1 for unsettled (exited) hands
+_OUTCOME_CLASS = np.full(len(OUTCOME_CODES), -1, dtype=np.int8)
+_OUTCOME_CLASS[OUTCOME_CODES['win']] = WIN
+_OUTCOME_CLASS[OUTCOME_CODES['dealer_bust']] = WIN
+_OUTCOME_CLASS[OUTCOME_CODES['lose']] = LOSE
+_OUTCOME_CLASS[OUTCOME_CODES['bust']] = LOSE
+_OUTCOME_CLASS[OUTCOME_CODES['push']] = PUSH
+
+_UPCARD_VALUE = np.array(CARD_VALUE + (0,), dtype=np.int64)
+
+
+## HISTORYSTATS class ##
+##
+# Attributes:
+# rounds (int): No. of rounds
+# exits (int): No. of rounds the player exited
+# splits (int): No. of rounds with a split
+# outcomes (array): NUM_TOTALS x NUM_UPCARDS x 3 counts of hands won / lost / pushed, by player's final total and dealer upcard
+# sidebet_L (array), sidebet_R (array): Rounds with the sidebet bet, by payoff (0 = lost)
+# insurance_won, insurance_lost (int): No. of rounds with insurance bought, by result
+# bankrolls (list): (path, initial balance, final balance, max balance, curve) of every log.
+#       curve (array) is the balance after every curve_step-th round.
+
+class HistoryStats:
+    def __init__(self):
+        self.rounds = 0
+        self.exits = 0
+        self.splits = 0
+        self.outcomes = np.zeros((NUM_TOTALS, NUM_UPCARDS, 3), dtype=np.int64)
+        self.sidebet_L = np.zeros(256, dtype=np.int64)
+        self.sidebet_R = np.zeros(256, dtype=np.int64)
+        self.insurance_won = 0
+        self.insurance_lost = 0
+        self.bankrolls = []
+
+    ## Count the outcome of one player hand column of a chunk
+    def _add_hands(self, cards, outcome, upcards, played):
+        totals = VALUE_TABLE[cards].sum(axis=1, dtype=np.int64)
+        soft = ACE_TABLE[cards].any(axis=1) & (totals <= 11)
+        totals = np.minimum(totals + 10*soft, NUM_TOTALS - 1)
+
+        classes = _OUTCOME_CLASS[outcome]
+        settled = played & (classes >= 0)
+        index = (totals[settled]*NUM_UPCARDS + upcards[settled])*3 + classes[settled]
+        self.outcomes += np.bincount(index, minlength=self.outcomes.size).reshape(self.outcomes.shape)
+
+    ## Add a chunk of records
+    def add_chunk(self, records):
+        self.rounds += len(records)
+        flags = records['flags']
+        split = (flags & FLAG_SPLIT) != 0
+        self.exits += int(np.count_nonzero(flags & FLAG_EXITED))
+        self.splits += int(np.count_nonzero(split))
+
+        upcards = _UPCARD_VALUE[records['dealer_cards'][:, 0]]
+        for number in range(1, MAX_HANDS + 1):
+            self._add_hands(records['hand%d_cards' % number], records['hand%d_outcome' % number], upcards,
+                            records['hand%d_num_cards' % number] != 0)
+
+        self.sidebet_L += np.bincount(records['sidebet_L'][records['hand1_bet_sidebet_L'] != 0], minlength=256)
+        self.sidebet_R += np.bincount(records['sidebet_R'][records['hand1_bet_sidebet_R'] != 0], minlength=256)
+
+        insured = (flags & FLAG_INSURANCE) != 0
+        won = records['hand1_win_insurance'] > 0
+        self.insurance_won += int(np.count_nonzero(insured & won))
+        self.insurance_lost += int(np.count_nonzero(insured & ~won))
+
+
+## MAP_RECORDS method ##
+##
+# Inputs:
+# path (string): One log file
+#
+# Outputs:
+# records (array): Read-only memory-mapped RECORD_DTYPE array of the file's records
+
+def map_records(path):
+    with open(path, 'rb') as f:
+        read_header(f.read(HEADER_SIZE), path)
+    num_records, remainder = divmod(os.path.getsize(path) - HEADER_SIZE, RECORD_SIZE)
+    if remainder:
+        raise ValueError("%s: truncated record at the end of the file" % path)
+    if num_records == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(num_records,))
+
+
+## ROUND_NET method ##
+##
+# Inputs:
+# record: One record of a RECORD_DTYPE array
+#
+# Outputs:
+# net (float): Player's net winnings over the round, summed over every hand slot
+
+def round_net(record):
+    net = 0.0
+    for name, fmt in RECORD_FIELDS:
+        if name.startswith('hand') and '_win_' in name:
+            net += record[name]
+    return float(net)
+
+
+## ANALYZE_HISTORY method ##
+##
+# Inputs:
+# paths (list): Paths of the first file of each log. Rotated files are read after it.
+# chunk_records (int): No. of records counted per step
+# curve_points (int): Max. No. of points kept of each bankroll curve
+#
+# Outputs:
+# stats (HistoryStats)
+
+def analyze_history(paths, chunk_records=1 << 18, curve_points=1000):
+    stats = HistoryStats()
+
+    for path in paths:
+        files = history_files(path)
+        if not files:
+            raise ValueError("%s: no such hand history" % path)
+        maps = [map_records(file_path) for file_path in files]
+        total = sum(len(records) for records in maps)
+        if total == 0:
+            continue
+
+        curve_step = -(-total // curve_points)
+        curve = []
+        initial = None
+        max_balance = -np.inf
+        final = None
+        done = 0
+
+        for records in maps:
+            for start in range(0, len(records), chunk_records):
+                chunk = records[start:start + chunk_records]
+                stats.add_chunk(chunk)
+
+                balances = chunk['balance']
+                if initial is None:
+                    initial = float(balances[0]) - round_net(chunk[0])
+                    max_balance = initial
+                max_balance = max(max_balance, float(balances.max()))
+                final = float(balances[-1])
+
+                # keep every curve_step-th balance of the whole log
+                first = (-(done + 1)) % curve_step
+                curve.append(np.array(balances[first::curve_step]))
+                done += len(chunk)
+
+        stats.bankrolls.append((path, initial, final, max_balance, np.concatenate(curve)))
+
+    return stats
+
+
+## PRINT_ANALYTICS method ##
+##
+# Inputs:
+# stats (HistoryStats)
+#
+# Outputs:
+# prints win / loss / push rates by player total and dealer upcard, sidebet, insurance and split frequencies, and bankrolls
+
+def print_analytics(stats):
+    n = stats.rounds
+    if n == 0:
+        print("\nNo rounds logged")
+        return
+
+    print("\nRounds: %d  Splits: %.3f%%  Exits: %d" % (n, 100*stats.splits/n, stats.exits))
+
+    upcard_order = list(range(2, NUM_UPCARDS)) + [1]
+    header = "total " + "".join("%7s" % ('A' if upcard == 1 else upcard) for upcard in upcard_order)
+    for title, column in (("Win", WIN), ("Loss", LOSE), ("Push", PUSH)):
+        print("\n%s rate %% by player total (rows) and dealer upcard (columns)" % title)
+        print(header)
+        for total in range(4, NUM_TOTALS):
+            hands = stats.outcomes[total].sum(axis=1)
+            if not hands.any():
+                continue
+            cells = "".join("%7.1f" % (100*stats.outcomes[total, upcard, column]/hands[upcard]) if hands[upcard] else "      -"
+                            for upcard in upcard_order)
+            print("%5s %s" % ('bust' if total == NUM_TOTALS - 1 else total, cells))
+
+    for title, counts in (("Left sidebet (Perfect Pairs)", stats.sidebet_L), ("Right sidebet (21+3)", stats.sidebet_R)):
+        bets = counts.sum()
+        if bets == 0:
+            continue
+        print("\n%s: %d bets" % (title, bets))
+        for payoff in np.nonzero(counts)[0][::-1]:
+            print("  %s  %.5f%%" % ("lost  " if payoff == 0 else "%3d:1 " % payoff, 100*counts[payoff]/bets))
+
+    insured = stats.insurance_won + stats.insurance_lost
+    if insured:
+        print("\nInsurance: %d bought, %.2f%% won" % (insured, 100*stats.insurance_won/insured))
+
+    for path, initial, final, max_balance, curve in stats.bankrolls:
+        print("\n%s: initial $%s, final $%s, highest $%s (%d curve points)" % (path, initial, final, max_balance, len(curve)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand history analytics")
+    parser.add_argument('paths', nargs='+', help="Hand history logs (first file of each; rotated files are included)")
+    parser.add_argument('--curve', default=None, help="Write the bankroll curve of the first log to this file, one balance per line")
+    args = parser.parse_args()
+
+    stats = analyze_history(args.paths)
+    print_analytics(stats)
+
+    if args.curve and stats.bankrolls:
+        np.savetxt(args.curve, stats.bankrolls[0][4], fmt='%.2f')
+
+
+if __name__ == '__main__':
+    main()
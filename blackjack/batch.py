@@ -0,0 +1,209 @@
+### BLACKJACK BATCH ###
+# Vectorized NumPy counterparts of the scoring functions in engine.py, for evaluating
+# many hands per call. Hands are passed as a 2-D array of card codes (hands x max cards),
+# padded on the right with PAD.
+#
+# Sidebets are classified by table lookup. The tables are filled once from the engine's own
+# check_perfect_pair() / check_21_plus_3(), so they pay exactly what the game pays:
+#   - Perfect Pairs: 52x52 payoffs indexed by the two player card codes
+#   - 21+3: payoffs indexed by the three ranks and which of the three suits match, 13^3 x 8 entries
+#     instead of 52^3 (only ranks and suit equality matter)
+#
+# Requires numpy. tests/test_batch.py (or python -m blackjack.batch) checks it against sum_cards() over every
+# ordered 2- to 5-card rank combination, and the sidebet tables against every 2- and 3-card deal.
+
+
+import itertools
+import numpy as np
+from blackjack.cards import ACE_MIN, CARD_RANK, CARD_SUIT, CARD_VALUE, NUM_CARDS, FACES
+from blackjack.engine import check_perfect_pair, check_21_plus_3
+
+
+PAD = NUM_CARDS     # padding code. -1 is accepted too for signed arrays (indexes the same table entry).
+
+# Lookup tables indexed by card code, with one extra entry for PAD
+VALUE_TABLE = np.array(CARD_VALUE + (0,), dtype=np.int16)
+ACE_TABLE = np.array([code >= ACE_MIN for code in range(NUM_CARDS)] + [False], dtype=bool)
+CARD_TABLE = np.array([True]*NUM_CARDS + [False], dtype=bool)
+RANK_TABLE = np.array(CARD_RANK, dtype=np.int16)
+SUIT_TABLE = np.array(CARD_SUIT, dtype=np.int16)
+
+NUM_RANKS = len(FACES)
+NUM_SUIT_PATTERNS = 8   # bit 0: suits 1 and 2 match, bit 1: suits 1 and 3, bit 2: suits 2 and 3
+# Suits of three cards giving each possible suit pattern (patterns 3, 5 and 6 can't happen)
+_PATTERN_SUITS = {0: (0, 1, 2), 1: (0, 0, 1), 2: (0, 1, 0), 4: (1, 0, 0), 7: (0, 0, 0)}
+
+
+## _BUILD_PAIR_TABLE method ##
+##
+# Inputs:
+# <none>
+#
+# Outputs:
+# table (array): 52x52 int16 Perfect Pairs payoffs, 0 where the sidebet loses
+
+def _build_pair_table():
+    table = np.zeros((NUM_CARDS, NUM_CARDS), dtype=np.int16)
+    for first in range(NUM_CARDS):
+        for second in range(NUM_CARDS):
+            table[first, second] = check_perfect_pair([first, second], {'sidebet_L': 0})['sidebet_L']
+    return table
+
+
+## _BUILD_TRIPLE_TABLE method ##
+##
+# Inputs:
+# <none>
+#
+# Outputs:
+# table (array): int16 21+3 payoffs indexed by (rank_1*13 + rank_2)*13 + rank_3, then suit pattern.
+#       0 where the sidebet loses.
+
+def _build_triple_table():
+    table = np.zeros((NUM_RANKS**3, NUM_SUIT_PATTERNS), dtype=np.int16)
+    for ranks in itertools.product(range(NUM_RANKS), repeat=3):
+        index = (ranks[0]*NUM_RANKS + ranks[1])*NUM_RANKS + ranks[2]
+        for pattern, suits in _PATTERN_SUITS.items():
+            card_1, card_2, card_3 = (rank*4 + suit for rank, suit in zip(ranks, suits))
+            table[index, pattern] = check_21_plus_3([card_1, card_2], [card_3], {'sidebet_R': 0})['sidebet_R']
+    return table
+
+
+PAIR_PAYOFF_TABLE = _build_pair_table()
+TRIPLE_PAYOFF_TABLE = _build_triple_table()
+
+
+## SUM_CARDS_BATCH method ##
+##
+# Inputs:
+# hands (array): 2-D integer array of card codes (hands x max cards), padded with PAD
+#
+# Outputs:
+# sum_cards_prim (array): Primary sum of every hand, as sum_cards()
+# sum_cards_sec (array): Secondary sum of every hand, as sum_cards()
+# best_sum (array): Best allowable sum of every hand, as sum_cards()
+# is_blackjack (array): True where the hand is a two-card 21
+# is_bust (array): True where best_sum > 21
+
+def sum_cards_batch(hands):
+    hands = np.asarray(hands)
+    if hands.ndim != 2:
+        raise ValueError("hands must be a 2-D array (hands x max cards), got %d-D" % hands.ndim)
+
+    sum_cards_sec = VALUE_TABLE[hands].sum(axis=1, dtype=np.int16)
+    has_ace = ACE_TABLE[hands].any(axis=1)
+    sum_cards_prim = sum_cards_sec + np.int16(10)*has_ace
+
+    best_sum = np.where(sum_cards_prim <= 21, sum_cards_prim, sum_cards_sec)
+
+    num_cards = CARD_TABLE[hands].sum(axis=1)
+    is_blackjack = (best_sum == 21) & (num_cards == 2)
+    is_bust = best_sum > 21
+
+    return sum_cards_prim, sum_cards_sec, best_sum, is_blackjack, is_bust
+
+
+## SIDEBETS_BATCH method ##
+##
+# Inputs:
+# player_cards (array): (deals x 2) integer array of the player's first two card codes
+# dealer_upcards (array): Integer array of the dealer's upcard codes, one per deal
+#
+# Outputs:
+# payoffs_L (array): Perfect Pairs payoff of every deal (30, 12, 5), 0 where it loses
+# payoffs_R (array): 21+3 payoff of every deal (100, 40, 30, 10, 5), 0 where it loses
+# Payoffs are multipliers of the sidebet, as payoffs['sidebet_L'] / payoffs['sidebet_R'] in the engine.
+
+def sidebets_batch(player_cards, dealer_upcards):
+    player_cards = np.asarray(player_cards)
+    dealer_upcards = np.asarray(dealer_upcards)
+    if player_cards.ndim != 2 or player_cards.shape[1] != 2:
+        raise ValueError("player_cards must be a (deals x 2) array, got shape %s" % (player_cards.shape,))
+    if dealer_upcards.shape != player_cards.shape[:1]:
+        raise ValueError("dealer_upcards must have one card per deal, got shape %s" % (dealer_upcards.shape,))
+
+    card_1, card_2, card_3 = player_cards[:, 0], player_cards[:, 1], dealer_upcards
+    payoffs_L = PAIR_PAYOFF_TABLE[card_1, card_2]
+
+    rank_index = (RANK_TABLE[card_1]*NUM_RANKS + RANK_TABLE[card_2])*NUM_RANKS + RANK_TABLE[card_3]
+    suit_1, suit_2, suit_3 = SUIT_TABLE[card_1], SUIT_TABLE[card_2], SUIT_TABLE[card_3]
+    pattern = (suit_1 == suit_2) + 2*(suit_1 == suit_3) + 4*(suit_2 == suit_3)
+    payoffs_R = TRIPLE_PAYOFF_TABLE[rank_index, pattern]
+
+    return payoffs_L, payoffs_R
+
+
+## PAD_HANDS method ##
+##
+# Inputs:
+# hands (list): List of hands, each a list of card codes
+# max_cards (int): Width of the output. Defaults to the longest hand.
+#
+# Outputs:
+# hands (array): 2-D uint8 array of card codes padded with PAD
+
+def pad_hands(hands, max_cards=None):
+    if max_cards is None:
+        max_cards = max(len(hand_cards) for hand_cards in hands)
+
+    padded = np.full((len(hands), max_cards), PAD, dtype=np.uint8)
+    for i, hand_cards in enumerate(hands):
+        padded[i, :len(hand_cards)] = hand_cards
+
+    return padded
+
+
+## VERIFY_SUM_CARDS_BATCH method ##
+##
+# Inputs:
+# max_cards (int): Largest hand size to check
+#
+# Outputs:
+# num_hands (int): No. of hands checked
+# Raises AssertionError if sum_cards_batch() disagrees with sum_cards() on any ordered combination
+# of 2 to max_cards ranks (suits rotate, they don't affect the sums).
+
+def verify_sum_cards_batch(max_cards=5):
+    from blackjack.engine import sum_cards
+
+    num_hands = 0
+    for hand_size in range(2, max_cards+1):
+        hands = [[rank*4 + i % 4 for i, rank in enumerate(ranks)] for ranks in itertools.product(range(len(FACES)), repeat=hand_size)]
+        sum_cards_prim, sum_cards_sec, best_sum, is_blackjack, is_bust = sum_cards_batch(pad_hands(hands, max_cards))
+
+        for i, hand_cards in enumerate(hands):
+            expected = sum_cards(hand_cards)
+            assert (sum_cards_prim[i], sum_cards_sec[i], best_sum[i]) == expected, (hand_cards, expected)
+            assert is_blackjack[i] == (expected[2] == 21 and hand_size == 2), hand_cards
+            assert is_bust[i] == (expected[2] > 21), hand_cards
+
+        num_hands += len(hands)
+
+    return num_hands
+
+
+## VERIFY_SIDEBETS_BATCH method ##
+##
+# Inputs:
+# <none>
+#
+# Outputs:
+# num_deals (int): No. of deals checked
+# Raises AssertionError if sidebets_batch() disagrees with check_perfect_pair() / check_21_plus_3()
+# on any of the 52^3 (card 1, card 2, upcard) deals.
+
+def verify_sidebets_batch():
+    deals = np.array(list(itertools.product(range(NUM_CARDS), repeat=3)), dtype=np.uint8)
+    payoffs_L, payoffs_R = sidebets_batch(deals[:, :2], deals[:, 2])
+
+    for i, (card_1, card_2, card_3) in enumerate(deals.tolist()):
+        payoffs = check_perfect_pair([card_1, card_2], {'sidebet_L': 0, 'sidebet_R': 0})
+        payoffs = check_21_plus_3([card_1, card_2], [card_3], payoffs)
+        assert (payoffs_L[i], payoffs_R[i]) == (payoffs['sidebet_L'], payoffs['sidebet_R']), (card_1, card_2, card_3)
+
+    return len(deals)
+
+
+if __name__ == '__main__':
+    print("sum_cards_batch matches sum_cards on %d hands" % verify_sum_cards_batch())
+    print("sidebets_batch matches check_perfect_pair and check_21_plus_3 on %d deals" % verify_sidebets_batch())
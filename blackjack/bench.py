@@ -0,0 +1,421 @@
+### BLACKJACK BENCHMARKS ###
+# Regression benchmarks of the engine's hot paths. Every benchmark runs on fixed seeds and fixed
+# card inputs, so runs are comparable between commits.
+#
+# Each benchmark reports:
+#   ops/s       calls per second, best of several timed repeats
+#   peak B      tracemalloc peak of memory allocated during one call, above what was in use before it.
+#               The function benchmarks call over a batch of inputs whose calls keep nothing, so their
+#               peak is that of the hungriest call of the batch.
+#   blocks      memory blocks still allocated per call afterwards (sys.getallocatedblocks), ~0 unless a call leaks
+#
+# Results can be saved as a baseline (JSON) and later runs checked against it: a benchmark fails when
+# its ops/s drops, or its peak bytes grow, by more than the threshold fraction.
+#
+# Usage: python -m blackjack.bench --save              (store a baseline)
+#        python -m blackjack.bench --threshold 0.2     (compare with it, exit 1 on a regression)
+
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from blackjack.cards import NUM_CARDS
+from blackjack.engine import (MAIN, BLACKJACK, Bro, HandClass, check_21_plus_3, check_perfect_pair, compare_player_dealer, new_shoe,
+                              play_round, shuffle_shoe, sum_cards)
+from blackjack.rng import MTShuffler
+from blackjack.shoe import Shoe, shoe_template
+from blackjack.strategy import basic_strategy_policy
+
+
+BANKROLL = 1e12     # never limits splitting or doubling
+SEED = 1
+NUM_DECKS = 8
+NUM_INPUTS = 1000   # fixed inputs per batch of the function benchmarks
+
+DEFAULT_BASELINE = 'blackjack_bench_baseline.json'
+
+
+## SPLIT_POLICY method ##
+##
+# Inputs:
+# kind (string): 'insurance', 'first' or 'next'
+# Player (Bro)
+# playerHand (HandClass)
+# options (tuple): allowed actions
+# dealer_upcard (int): Card code of the dealer's upcard
+#
+# Outputs:
+# player_action (string)
+# Splits every pair, otherwise plays basic strategy
+
+def split_policy(kind, Player, playerHand, options, dealer_upcard):
+    if 'SPLIT' in options:
+        return 'SPLIT'
+    return basic_strategy_policy(kind, Player, playerHand, options, dealer_upcard)
+
+
+## REPLAYSHOE class ##
+##
+# Deals recorded rounds over and over: the cards of one round, then (at discard()) the next round's.
+#
+# Attributes:
+# rounds (list): Cards (bytes) of every recorded round, in dealing order
+# cards (bytes): Cards of the current round
+# pos (int): Index of the next card to deal
+# index (int): Index of the current round in rounds
+
+class ReplayShoe:
+    def __init__(self, rounds):
+        self.rounds = rounds
+        self.index = 0
+        self.cards = rounds[0]
+        self.pos = 0
+
+    def deal(self):
+        pos = self.pos
+        card = self.cards[pos]
+        self.pos = pos + 1
+        return card
+
+    def needs_shuffle(self):
+        return False
+
+    ## End of a round: move on to the next recorded round
+    def discard(self):
+        self.index = (self.index + 1) % len(self.rounds)
+        self.cards = self.rounds[self.index]
+        self.pos = 0
+
+
+## NEW_BET method ##
+##
+# Inputs:
+# Player (Bro)
+#
+# Outputs:
+# playerHand (HandClass): Player's new Hand #1 with a main bet of 10
+
+def new_bet(Player):
+    Player.hands[0] = playerHand = HandClass('Hand #1')
+    playerHand.bets[MAIN] = 10.0
+    return playerHand
+
+
+## RECORD_SPLIT_ROUNDS method ##
+##
+# Inputs:
+# num_rounds (int): No. of split rounds to record
+# seed (int)
+#
+# Outputs:
+# rounds (list): Cards (bytes) of num_rounds rounds where split_policy splits, dealt from seeded shoes
+
+def record_split_rounds(num_rounds, seed=SEED):
+    deck = Shoe(NUM_DECKS, MTShuffler(seed))
+    Player = Bro('player', BANKROLL)
+    rounds = []
+
+    while len(rounds) < num_rounds:
+        if deck.needs_shuffle():
+            deck.shuffle()
+        start = deck.pos
+        new_bet(Player)
+        result = play_round(Player, deck, split_policy)
+        if len(result.hands) > 1:
+            rounds.append(bytes(deck.cards[start:deck.pos]))
+
+    return rounds
+
+
+## Benchmarks. Each takes a seed and returns (op, calls): op() makes calls calls of the code measured.
+
+def bench_sum_cards(seed):
+    rng = random.Random(seed)
+    hands = [[rng.randrange(NUM_CARDS) for i in range(rng.randint(2, 5))] for j in range(NUM_INPUTS)]
+
+    def op():
+        for hand_cards in hands:
+            sum_cards(hand_cards)
+    return op, len(hands)
+
+
+def bench_check_perfect_pair(seed):
+    rng = random.Random(seed)
+    # every third hand is a pair, so every branch is taken
+    pairs = []
+    for i in range(NUM_INPUTS):
+        first_card = rng.randrange(NUM_CARDS)
+        second_card = (first_card & ~3) | rng.randrange(4) if i % 3 == 0 else rng.randrange(NUM_CARDS)
+        pairs.append([first_card, second_card])
+    payoffs = {'sidebet_L': 0}
+
+    def op():
+        for player_hand_cards in pairs:
+            check_perfect_pair(player_hand_cards, payoffs)
+    return op, len(pairs)
+
+
+def bench_check_21_plus_3(seed):
+    rng = random.Random(seed)
+    hands = [([rng.randrange(NUM_CARDS), rng.randrange(NUM_CARDS)], [rng.randrange(NUM_CARDS)]) for i in range(NUM_INPUTS)]
+    payoffs = {'sidebet_R': 0}
+
+    def op():
+        for player_hand_cards, dealer_hand_cards in hands:
+            check_21_plus_3(player_hand_cards, dealer_hand_cards, payoffs)
+    return op, len(hands)
+
+
+def bench_new_shoe(seed):
+    random.seed(seed)      # new_shoe() draws its shoe seeds from the random module
+
+    def op():
+        new_shoe(NUM_DECKS)
+    return op, 1
+
+
+def bench_shuffle_shoe(seed):
+    random.seed(seed)
+    cards = bytearray(shoe_template(NUM_DECKS))
+
+    def op():
+        shuffle_shoe(cards, 1)
+    return op, 1
+
+
+def bench_shoe_shuffle(seed):
+    deck = Shoe(NUM_DECKS, MTShuffler(seed))
+    return deck.shuffle, 1
+
+
+def bench_compare_player_dealer(seed):
+    rng = random.Random(seed)
+    hands = []
+    for i in range(NUM_INPUTS):
+        playerHand, dealerHand = HandClass('Hand #1'), HandClass('Dealer')
+        playerHand.bets[MAIN] = playerHand.bets[BLACKJACK] = 10.0
+        for hand in (playerHand, dealerHand):
+            for j in range(rng.randint(2, 4)):
+                hand.add_card(rng.randrange(NUM_CARDS))
+        hands.append((playerHand, dealerHand))
+    payoffs = {'blackjack': 0.5}
+
+    def op():
+        for playerHand, dealerHand in hands:
+            compare_player_dealer(playerHand, dealerHand, payoffs)
+    return op, len(hands)
+
+
+def bench_round(seed):
+    deck = Shoe(NUM_DECKS, MTShuffler(seed))
+    Player = Bro('player', BANKROLL)
+
+    def op():
+        if deck.needs_shuffle():
+            deck.shuffle()
+        new_bet(Player)
+        play_round(Player, deck, basic_strategy_policy)
+    return op, 1
+
+
+def bench_split_round(seed):
+    deck = ReplayShoe(record_split_rounds(500, seed))
+    Player = Bro('player', BANKROLL)
+
+    def op():
+        new_bet(Player)
+        play_round(Player, deck, split_policy)
+    return op, 1
+
+
+# name -> benchmark
+BENCHMARKS = {
+    'sum_cards': bench_sum_cards,
+    'check_perfect_pair': bench_check_perfect_pair,
+    'check_21_plus_3': bench_check_21_plus_3,
+    'new_shoe': bench_new_shoe,
+    'shuffle_shoe': bench_shuffle_shoe,
+    'shoe_shuffle': bench_shoe_shuffle,
+    'compare_player_dealer': bench_compare_player_dealer,
+    'round': bench_round,
+    'split_round': bench_split_round,
+}
+
+
+## TIME_OP method ##
+##
+# Inputs:
+# op (function), calls (int): As returned by a benchmark
+# min_time (float): Seconds each timed repeat runs at least
+# repeats (int): No. of timed repeats
+#
+# Outputs:
+# ops_per_sec (float): Calls per second of the fastest repeat
+
+def time_op(op, calls, min_time=0.2, repeats=5):
+    timer = time.perf_counter
+
+    # calibrate the No. of op() calls per repeat
+    loops = 1
+    while True:
+        start = timer()
+        for i in range(loops):
+            op()
+        elapsed = timer() - start
+        if elapsed >= min_time/4:
+            break
+        loops *= 2
+    loops = max(int(loops*min_time/elapsed), 1)
+
+    best = float('inf')
+    for repeat in range(repeats):
+        start = timer()
+        for i in range(loops):
+            op()
+        best = min(best, timer() - start)
+
+    return loops*calls/best
+
+
+## MEASURE_ALLOCATIONS method ##
+##
+# Inputs:
+# op (function), calls (int): As returned by a benchmark
+# samples (int): No. of op() calls measured
+#
+# Outputs:
+# peak_bytes (float): Mean tracemalloc peak of an op() call, above the memory in use before it
+# blocks (float): Net No. of memory blocks left allocated per call
+
+def measure_allocations(op, calls, samples=50):
+    op()        # warm up caches and lazily built tables
+
+    blocks = sys.getallocatedblocks()
+    for i in range(samples):
+        op()
+    blocks = sys.getallocatedblocks() - blocks
+
+    peak_bytes = 0
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            op()
+            peak_bytes += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    return peak_bytes/samples, blocks/(samples*calls)
+
+
+## RUN_BENCHMARKS method ##
+##
+# Inputs:
+# names (list): Benchmarks to run, keys of BENCHMARKS
+# seed (int)
+# min_time (float), repeats (int): See time_op()
+#
+# Outputs:
+# results (dict): name -> {'ops_per_sec', 'peak_bytes', 'blocks'}
+
+def run_benchmarks(names, seed=SEED, min_time=0.2, repeats=5):
+    results = {}
+    for name in names:
+        op, calls = BENCHMARKS[name](seed)
+        peak_bytes, blocks = measure_allocations(op, calls)
+        results[name] = {'ops_per_sec': time_op(op, calls, min_time, repeats), 'peak_bytes': peak_bytes, 'blocks': blocks}
+    return results
+
+
+## COMPARE_RESULTS method ##
+##
+# Inputs:
+# results (dict): From run_benchmarks()
+# baseline (dict): Same form, from an earlier run
+# threshold (float): Allowed fraction of ops/s lost, or of peak bytes gained
+#
+# Outputs:
+# regressions (list): One message per regression. Empty if none.
+
+def compare_results(results, baseline, threshold=0.2):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['ops_per_sec'] < base['ops_per_sec']*(1 - threshold):
+            regressions.append("%s: %.0f ops/s, baseline %.0f (%+.1f%%)" % (
+                name, result['ops_per_sec'], base['ops_per_sec'], 100*(result['ops_per_sec']/base['ops_per_sec'] - 1)))
+        # a few bytes either way are tracemalloc's own bookkeeping
+        if result['peak_bytes'] > base['peak_bytes']*(1 + threshold) + 64:
+            regressions.append("%s: %.0f peak bytes per call, baseline %.0f" % (name, result['peak_bytes'], base['peak_bytes']))
+    return regressions
+
+
+## PRINT_RESULTS method ##
+##
+# Inputs:
+# results (dict): From run_benchmarks()
+# baseline (dict): Earlier results to show the ops/s change against. None for no comparison.
+#
+# Outputs:
+# prints one line per benchmark
+
+def print_results(results, baseline=None):
+    print("%-22s %14s %10s %8s %9s" % ("benchmark", "ops/s", "peak B", "blocks", "vs base"))
+    for name, result in results.items():
+        change = ''
+        if baseline and name in baseline:
+            change = '%+.1f%%' % (100*(result['ops_per_sec']/baseline[name]['ops_per_sec'] - 1))
+        print("%-22s %14.0f %10.0f %8.2f %9s" % (name, result['ops_per_sec'], result['peak_bytes'], result['blocks'], change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blackjack engine benchmarks")
+    parser.add_argument('names', nargs='*', help="Benchmarks to run (default: all): %s" % ', '.join(BENCHMARKS))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline results file (JSON)")
+    parser.add_argument('--save', action='store_true', help="Store the results in the baseline file instead of comparing")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Fraction of ops/s lost (or peak bytes gained) that fails the run")
+    parser.add_argument('--seed', type=int, default=SEED, help="Seed of the benchmark inputs")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Seconds per timed repeat")
+    parser.add_argument('--repeats', type=int, default=5, help="No. of timed repeats, the best is kept")
+    args = parser.parse_args()
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmark(s): %s" % ', '.join(unknown))
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(names, args.seed, args.min_time, args.repeats)
+    print_results(results, None if args.save else baseline)
+
+    if args.save:
+        saved = baseline or {}
+        saved.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(saved, f, indent=1, sort_keys=True)
+        print("\nBaseline saved to %s" % args.baseline)
+    elif baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions past %.0f%%:" % (100*args.threshold))
+            for message in regressions:
+                print("  " + message)
+            sys.exit(1)
+        print("\nNo regressions past %.0f%%" % (100*args.threshold))
+    else:
+        print("\nNo baseline at %s, run with --save to store one" % args.baseline)
+
+
+if __name__ == '__main__':
+    main()
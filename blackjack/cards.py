@@ -0,0 +1,81 @@
+### BLACKJACK CARDS ###
+# Integer card encoding used everywhere in the game logic.
+#
+# A card is one small int: code = rank*4 + suit (0..51)
+#   rank: 0..12 for 2, 3, ... 10, J, Q, K, A  (aces are the highest codes, 48..51)
+#   suit: 0..3 for Hearts, Diamonds, Spades, Clubs  (bit 1 is the colour: 0 red, 1 black)
+#
+# Per-code lookup tables below replace string comparisons and per-object attribute lookups.
+# Card is kept only as a display adapter around a code.
+
+
+SUITS = ('Hearts', 'Diamonds', 'Spades', 'Clubs')
+FACES = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+
+NUM_CARDS = 52
+ACE_RANK = 12
+ACE_MIN = ACE_RANK*4      # any code >= ACE_MIN is an ace
+
+
+## CARD_CODE method ##
+##
+# Inputs:
+# face (string): Face of the card. e.g. 2, 3, 10, J, Q, K, A
+# suit (string): Suit of the card. e.g. Hearts, Diamonds
+#
+# Outputs:
+# code (int): Card code
+
+def card_code(face, suit):
+    return FACES.index(face)*4 + SUITS.index(suit)
+
+
+# Lookup tables, indexed by card code
+CARD_RANK = tuple(code >> 2 for code in range(NUM_CARDS))
+CARD_SUIT = tuple(code & 3 for code in range(NUM_CARDS))
+CARD_COLOUR = tuple((code >> 1) & 1 for code in range(NUM_CARDS))                    # 0 = red, 1 = black
+CARD_FACE = tuple(FACES[code >> 2] for code in range(NUM_CARDS))
+CARD_NAME = tuple('{} of {}'.format(FACES[code >> 2], SUITS[code & 3]) for code in range(NUM_CARDS))
+CARD_SHORT_NAME = tuple(FACES[code >> 2] + SUITS[code & 3][0] for code in range(NUM_CARDS))                # e.g. AH, 10S
+CARD_VALUE = tuple(min(rank + 2, 10) if rank != ACE_RANK else 1 for rank in CARD_RANK)         # secondary (hard) value, Ace = 1
+CARD_VALUE_PRIM = tuple(11 if rank == ACE_RANK else CARD_VALUE[code] for code, rank in enumerate(CARD_RANK))   # primary value, Ace = 11
+
+# Card counting tags: Hi-Lo 2-6 +1, 7-9 0, 10-A -1. KO 2-7 +1, 8-9 0, 10-A -1.
+HI_LO_TAG = tuple(1 if rank <= 4 else 0 if rank <= 7 else -1 for rank in CARD_RANK)
+KO_TAG = tuple(1 if rank <= 5 else 0 if rank <= 7 else -1 for rank in CARD_RANK)
+
+# Rank bitmasks (1 << rank) of every 3-card straight: (A,2,3), (2,3,4) ... (J,Q,K) and (Q,K,A)
+STRAIGHT_MASKS = frozenset([(1 << ACE_RANK) | 0b11] + [0b111 << rank for rank in range(ACE_RANK - 1)])
+
+# Shoe order of a single deck, as the cards come out of a new box (suit by suit)
+DECK_TEMPLATE = bytes(card_code(face, suit) for suit in SUITS for face in FACES)
+
+
+## CARD class ##
+##
+# Display adapter around a card code.
+#
+# Attributes:
+# code (int): Card code
+# face (string): Face of the card. e.g. 2, 3, 10, J, Q, K, A
+# suit (string): Suit of the card. e.g. Hearts, Diamonds
+# value_prim (int): Primary Blackjack value of the card. For 2 to 10, value is same as face. For J, Q, K value is 10. For Ace, value is 11.
+# value_sec (int): Secondary Blackjack value of the card. For Ace, value is 1. For others, value is same as Primary value.
+
+class Card:
+    def __init__(self, face, suit):
+        self.code = card_code(face, suit)
+        self.face = face
+        self.suit = suit
+        self.value_prim = CARD_VALUE_PRIM[self.code]
+        self.value_sec = CARD_VALUE[self.code]
+
+    @classmethod
+    def from_code(cls, code):
+        return cls(CARD_FACE[code], SUITS[CARD_SUIT[code]])
+
+    def __int__(self):
+        return self.code
+
+    def __str__(self):
+        return CARD_NAME[self.code]
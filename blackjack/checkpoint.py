@@ -0,0 +1,114 @@
+### BLACKJACK SESSION CHECKPOINT ###
+# Compact binary snapshot of a playing session, taken at a round boundary: the player's balances
+# and last bets, the round No., and the shoe (shoe.py state(): deck count, cut, shoe seed, shuffle
+# backend state) with its cursor. Restoring it rebuilds the shoe from its seed and moves the
+# cursor back, so the rest of the shoe, every later shoe and (for a ContinuousShoe) every later
+# draw come out exactly as they would have without the interruption.
+#
+# The shoe part only changes at a shuffle and is packed once per shoe, so a snapshot after every
+# round is one struct.pack of the header plus a bytes concatenation. Layout (little-endian):
+#   magic 'BJS1', version, round No., shoe cursor, flags, balance, init_balance, max_balance,
+#   prev_bets (one per bet type), shoe state size, shoe state
+#
+# Usage: data = session_state(Player, deck, rounds); write_checkpoint(path, data)
+#        Player, deck, rounds = read_checkpoint(path)
+
+
+import os
+import struct
+from array import array
+from blackjack.engine import BET_NAMES, Bro
+from blackjack.shoe import restore_shoe
+
+
+MAGIC = b'BJS1'
+VERSION = 1
+
+HEADER_FORMAT = '<4sHQIB3d%ddI' % len(BET_NAMES)
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# flags: balances that were floats (the others are restored as int)
+FLAG_BALANCE_FLOAT, FLAG_INIT_FLOAT, FLAG_MAX_FLOAT = 1, 2, 4
+
+
+## SESSION_STATE method ##
+##
+# Inputs:
+# Player (Bro): The player, between rounds
+# deck (Shoe or ContinuousShoe): The session's shoe
+# rounds (int): No. of rounds played so far
+#
+# Outputs:
+# data (bytes): Snapshot of the session
+
+def session_state(Player, deck, rounds=0):
+    shoe_state = deck.state()
+    flags = 0
+    if isinstance(Player.balance, float):
+        flags |= FLAG_BALANCE_FLOAT
+    if isinstance(Player.init_balance, float):
+        flags |= FLAG_INIT_FLOAT
+    if isinstance(Player.max_balance, float):
+        flags |= FLAG_MAX_FLOAT
+    return struct.pack(HEADER_FORMAT, MAGIC, VERSION, rounds, deck.pos, flags,
+                       Player.balance, Player.init_balance, Player.max_balance, *Player.prev_bets,
+                       len(shoe_state)) + shoe_state
+
+
+## RESTORE_SESSION method ##
+##
+# Inputs:
+# data (bytes): From session_state()
+# name (string): Name of the restored player
+#
+# Outputs:
+# Player (Bro), deck (Shoe or ContinuousShoe), rounds (int)
+
+def restore_session(data, name='player'):
+    if len(data) < HEADER_SIZE or data[:4] != MAGIC:
+        raise ValueError("Not a session checkpoint")
+    values = struct.unpack_from(HEADER_FORMAT, data)
+    magic, version, rounds, pos, flags, balance, init_balance, max_balance = values[:8]
+    if version != VERSION:
+        raise ValueError("Unsupported checkpoint version %d" % version)
+    shoe_size = values[-1]
+    if len(data) != HEADER_SIZE + shoe_size:
+        raise ValueError("Truncated session checkpoint")
+
+    Player = Bro(name, balance if flags & FLAG_BALANCE_FLOAT else int(balance))
+    Player.init_balance = init_balance if flags & FLAG_INIT_FLOAT else int(init_balance)
+    Player.max_balance = max_balance if flags & FLAG_MAX_FLOAT else int(max_balance)
+    Player.prev_bets[:] = array('d', values[8:-1])
+    deck = restore_shoe(data[HEADER_SIZE:], pos)
+    return Player, deck, rounds
+
+
+## WRITE_CHECKPOINT method ##
+##
+# Write data to path atomically: a crash mid-write leaves the previous checkpoint in place
+#
+# Inputs:
+# path (string): Checkpoint file
+# data (bytes): From session_state()
+#
+# Outputs:
+# <none>
+
+def write_checkpoint(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+## READ_CHECKPOINT method ##
+##
+# Inputs:
+# path (string): Checkpoint file written by write_checkpoint()
+#
+# Outputs:
+# Player (Bro), deck (Shoe or ContinuousShoe), rounds (int)
+
+def read_checkpoint(path):
+    with open(path, 'rb') as f:
+        return restore_session(f.read())
@@ -0,0 +1,711 @@
+### TO DO ###
+# - make GUI
+
+### UPDATE vs v4.2 ###
+# - reworked dealer's ace-first-blackjack. If dealer has 1st card ace and has blackjack, hand is over whether insurance taken or not. Compare with Player's hand.
+# - added support for left sidebet perfect pairs
+# - added support for right sidebet 21+3
+# - code cleanup
+
+### BLACKJACK CLI ###
+# Console game. Importing this module has no side effects; main() (console command: blackjack,
+# or python -m blackjack) starts a game. --pace scales the pauses, --renderer picks the output backend (render.py).
+
+
+import argparse
+from functools import partial
+from blackjack.cards import CARD_FACE, CARD_NAME, CARD_VALUE, CARD_VALUE_PRIM
+from blackjack.dealer import full_composition, remove_values
+from blackjack.engine import MAIN, BLACKJACK, INSURANCE, SIDEBET_L, SIDEBET_R, STAND_INSURANCE, DEFAULT_RULES, Bro, HandClass, parse_rules, play_round
+from blackjack.render import BufferedRenderer, NullRenderer, TerminalRenderer
+from blackjack.shoe import Shoe
+from blackjack.ev import action_evs
+from blackjack.strategy import STRATEGY_TABLE, basic_strategy_policy, rules_strategy_table
+
+
+_inflect_engine = None      # inflect is slow to import, so it is only loaded when a split needs it
+
+
+## NUMBER_TO_WORDS method ##
+##
+# Inputs:
+# number (int)
+#
+# Outputs:
+# words (string): e.g. 'two'
+
+def number_to_words(number):
+    global _inflect_engine
+    if _inflect_engine is None:
+        import inflect
+        _inflect_engine = inflect.engine()
+    return _inflect_engine.number_to_words(number)
+
+
+
+## PRINT_CARDS_BESTSUM method ##
+##
+# Inputs:
+# hand (HandClass): Hand of cards
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# prints all the cards in the hand in a single row along with best sum
+
+def print_cards_bestsum(hand, renderer):
+    card_str = ", ".join(CARD_NAME[card] for card in hand.hand_cards)
+
+    renderer.line(card_str + (" (Sum: %d)" % hand.best_total))
+
+
+## PRINT_CARDS_BOTHSUMS method ##
+##
+# Inputs:
+# hand (HandClass): Hand of cards
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# prints all the cards in the hand in a single row along with primary sum and/or secondary sum as per situation
+
+def print_cards_bothsums(hand, renderer):
+    card_str = ", ".join(CARD_NAME[card] for card in hand.hand_cards)
+
+    sum_cards_prim, sum_cards_sec = hand.soft_total, hand.hard_total
+
+    if sum_cards_sec == sum_cards_prim:
+        card_str += " (Sum: %d)" % sum_cards_prim
+    elif sum_cards_prim == 21:
+        card_str += " (Sum: %d)" % sum_cards_prim
+    elif sum_cards_prim > 21:
+        card_str += " (Sum: %d)" % sum_cards_sec
+    else:
+        card_str += " (Sum: %d/%d)" % (sum_cards_sec, sum_cards_prim)
+
+    renderer.line(card_str)
+
+
+# Prompt names of the hand actions, in prompt order
+ACTION_PROMPTS = (('H', 'Hit (h)'), ('D', 'Double Down (d)'), ('SPLIT', 'Split (split)'), ('S', 'Stand (s)'))
+
+
+## ACTION_PROMPT method ##
+##
+# Inputs:
+# options (tuple): actions allowed by the engine
+#
+# Outputs:
+# prompt (string): e.g. '\nHit (h)/ Stand (s) or exit: '
+# choices (string): the same actions as answers, e.g. "'h', 's' or 'exit'"
+
+def action_prompt(options):
+    actions = [action for action, name in ACTION_PROMPTS if action in options]
+    prompt = '\n' + '/ '.join(name for action, name in ACTION_PROMPTS if action in options)
+    choices = ', '.join("'%s'" % action.lower() for action in actions)
+    if 'EXIT' in options:
+        prompt += ' or exit'
+        choices += " or 'exit'"
+    return prompt + ': ', choices
+
+
+## GET_PLAYER_INIT_INPUT method ##
+##
+# Inputs:
+# Player (Bro)
+# playerHand (HandClass)
+# num_hands (int): number of hands being played by the player. 1 + No. of splits
+# options (tuple): actions allowed by the engine on the first two cards (engine.get_init_options())
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# player_action (string): H = Hit, S = Stand, D = Double down, SPLIT = split, EXIT = exit game
+
+def get_player_init_input(Player, playerHand, num_hands, options, renderer):
+    prompt, choices = action_prompt(options)
+    # balance needed for one more main bet, to double down or split
+    required = (num_hands + 1)*playerHand.bets[MAIN]
+
+    playerHand.player_action = renderer.ask(prompt).upper()
+
+    while playerHand.player_action not in options:
+        if playerHand.player_action == 'D' and Player.balance < required:
+            renderer.line("Insufficient balance to double down (Required $%s, Balance $%s)." % (required, Player.balance))
+            renderer.line("Please respond with %s" % choices)
+        elif playerHand.player_action == 'D' and num_hands > 1:
+            renderer.line("Cannot double down after splitting")
+            renderer.line("Please respond with %s" % choices)
+        elif playerHand.player_action == 'D':
+            renderer.line("Cannot double down on %d" % playerHand.best_total)
+            renderer.line("Please respond with %s" % choices)
+        elif playerHand.player_action == 'SPLIT' and CARD_VALUE[playerHand.hand_cards[0]] != CARD_VALUE[playerHand.hand_cards[1]]:
+            renderer.line("Invalid response. Please respond with %s" % choices)
+        elif playerHand.player_action == 'SPLIT' and Player.balance < required:
+            renderer.line("Insufficient balance for splitting (Required $%s, Balance $%s)." % (required, Player.balance))
+            renderer.line("Please respond with %s" % choices)
+        elif playerHand.player_action == 'SPLIT':
+            renderer.line("Cannot split again." if num_hands > 1 else "Splitting is not allowed.")
+            renderer.line("Please respond with %s" % choices)
+        else:
+            renderer.line("Invalid response. Please respond with %s" % choices)
+
+        playerHand.player_action = renderer.ask(prompt).upper()
+
+    if (playerHand.player_action == 'SPLIT'):
+        if CARD_FACE[playerHand.hand_cards[0]] == 'A':
+            renderer.line("Splitting Aces ...")
+        elif CARD_FACE[playerHand.hand_cards[0]] == 'K':
+            renderer.line("Splitting Kings ...")
+        elif CARD_FACE[playerHand.hand_cards[0]] == 'Q':
+            renderer.line("Splitting Queens ...")
+        elif CARD_FACE[playerHand.hand_cards[0]] == 'J':
+            renderer.line("Splitting Jacks ...")
+        elif CARD_FACE[playerHand.hand_cards[0]] == '6':
+            renderer.line("Splitting Sixes ...")
+        else:
+            renderer.line("Splitting %ss ..." % (number_to_words(CARD_VALUE[playerHand.hand_cards[0]]).capitalize()))
+        return playerHand.player_action
+    elif (playerHand.player_action == 'EXIT'):
+        exit_action = ''
+        while exit_action not in ('y','n'):
+            exit_action = renderer.ask('\nDo you want to exit the game? ALL ACTIVE BETS WILL BE FORFEITED (y/n): ').lower()
+        
+        if exit_action == 'y':
+            return 'EXIT'
+        else:
+            return get_player_init_input(Player, playerHand, num_hands, options, renderer)
+    else:
+        return playerHand.player_action
+
+
+## GET_PLAYER_INPUT method ##
+##
+# Inputs:
+# options (tuple): actions allowed by the engine after a hit
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# player_action (string): H = Hit, S = Stand, EXIT = exit game
+
+def get_player_input(options, renderer):
+    prompt, choices = action_prompt(options)
+    player_action = renderer.ask(prompt).upper()
+
+    while player_action not in options:
+        renderer.line("Invalid response. Please respond with %s" % choices)
+        player_action = renderer.ask(prompt).upper()
+    
+    if (player_action == 'EXIT'):
+        exit_action = ''
+        while exit_action not in ('y','n'):
+            exit_action = renderer.ask('\nDo you want to exit the game? BET WILL BE FORFEITED (y/n): ').lower()
+        
+        if exit_action == 'y':
+            return 'EXIT'
+        else:
+            return get_player_input(options, renderer)
+    else:
+        return player_action
+
+
+## GET_PLAYER_BET method ##
+##
+# Inputs:
+# Player (Bro)
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# Player (Bro)
+# Sets Player's bet amounts (main, left sidebet, right sidebet). Gives the option to repeat last bet.
+
+def get_player_bet(Player, renderer):    
+    bet_amt = '0'
+        
+    def is_bet_valid(bet_amt: list):
+        if len(bet_amt) != 3:
+            return False
+        # all bets should be numeric
+        elif not (bet_amt[0].isnumeric() == bet_amt[1].isnumeric() == bet_amt[2].isnumeric() == True):
+            return False 
+        # main bet should be > 0, rest should be >= 0
+        elif int(bet_amt[0]) < 1 or int(bet_amt[1]) < 0 or int(bet_amt[2]) < 0:
+            return False
+        # all bets should be multiples of 10
+        elif int(bet_amt[0])%10 > 0 or int(bet_amt[1])%10 > 0 or int(bet_amt[2])%10 > 0:
+            return False
+        else:
+            return True
+    
+    
+    ask_bet_again = True
+    while (ask_bet_again):
+
+        last_bet_total = sum(Player.prev_bets)
+
+        if  last_bet_total != 0 and last_bet_total <= Player.balance:
+            renderer.line("\nLast Bet: Main $%s, Left sidebet $%s, Right sidebet $%s" % (Player.prev_bets[MAIN], Player.prev_bets[SIDEBET_L], Player.prev_bets[SIDEBET_R]))
+            bet_amt = renderer.ask("Place Bet Amount [main, left sidebet, right sidebet] \nin multiples of 10 (enter 'r' to repeat last bet): $").upper()
+        else:
+            bet_amt = renderer.ask("\nPlace Bet Amount [main, left sidebet, right sidebet] in multiples of 10: $").upper()
+
+        bet_amt = bet_amt.replace(' ','').split(',')
+        len_bet = len(bet_amt)
+
+
+        # if player entered 'r' and balance lower than total last bet
+        if len_bet == 1 and bet_amt[0] == 'R' and last_bet_total > Player.balance:
+            renderer.line("Insufficient balance to repeat last bet (Required $%s, Balance $%s)" % (sum(Player.prev_bets), Player.balance))
+            
+        # if player entered 'r' and there WAS a last bet and balance is enough
+        elif len_bet == 1 and bet_amt[0] == 'R' and last_bet_total > 0 and last_bet_total <= Player.balance:
+            Player.hands[0].bets[:] = Player.prev_bets
+            ask_bet_again = False
+            
+        # else if player input only 1 entry (assume it to be main bet) but bet is invalid
+        elif len_bet == 1 and (bet_amt[0].isnumeric() == False or int(bet_amt[0]) < 1 or int(bet_amt[0])%10 > 0):
+            renderer.line("Invalid bet")
+            
+        # else if player input only 1 entry (assume it to be main bet) but bet is more than balance
+        elif len_bet == 1 and int(bet_amt[0]) > Player.balance:
+            renderer.line("Insufficient balance to repeat last bet (Required $%s, Balance $%s)" % (sum(Player.prev_bets), Player.balance))
+            
+        elif len_bet == 1:
+            Player.hands[0].bets[MAIN] = int(bet_amt[0])*1.0
+            ask_bet_again = False
+
+        # else bet MUST have 3 (non-negative, multiples of 10, integer) inputs separated by comma. Main bet should be > 0.
+        elif is_bet_valid(bet_amt) == False:
+            renderer.line("Invalid bet")
+            
+        # else if total amount bet is higher than balance
+        elif is_bet_valid(bet_amt) == True and sum(int(values) for values in bet_amt) > Player.balance:
+            renderer.line("Insufficient balance ($%s)" % Player.balance)
+            
+        else:
+            Player.hands[0].bets[MAIN] = int(bet_amt[0])*1.0
+            Player.hands[0].bets[SIDEBET_L] = int(bet_amt[1])*1.0
+            Player.hands[0].bets[SIDEBET_R] = int(bet_amt[2])*1.0
+            ask_bet_again = False
+
+    return Player
+
+
+## GET_PLAYER_DECISION method ##
+##
+# Inputs:
+# kind (string): 'insurance', 'first' (first action of a hand) or 'next' (after a hit)
+# Player (Bro)
+# playerHand (HandClass)
+# options (tuple): actions allowed by the engine
+# dealer_upcard (int): Card code of the dealer's upcard
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# player_action (string)
+# Decision callback for play_round(). Asks the player on the console.
+
+def get_player_decision(kind, Player, playerHand, options, dealer_upcard, renderer):
+    if kind == 'insurance':
+        insurance_input = ''
+        while insurance_input not in ('Y','N'):
+            insurance_input = renderer.ask('\nDealer has an Ace. Do you want to buy insurance for $%d? (y/n): ' % (playerHand.bets[MAIN]/2)).upper()
+        return insurance_input
+    elif kind == 'first':
+        return get_player_init_input(Player, playerHand, Player.num_hands, options, renderer)
+    else:
+        return get_player_input(options, renderer)
+
+
+## GET_AUTO_DECISION method ##
+##
+# Inputs:
+# kind (string): 'insurance', 'first' or 'next'
+# Player (Bro)
+# playerHand (HandClass)
+# options (tuple): actions allowed by the engine
+# dealer_upcard (int): Card code of the dealer's upcard
+# renderer: Output backend (see render.py)
+# table (bytes): Basic strategy table for the table rules (strategy.rules_strategy_table())
+#
+# Outputs:
+# player_action (string)
+# Decision callback for play_round(). Plays the basic strategy table and shows each decision.
+
+def get_auto_decision(kind, Player, playerHand, options, dealer_upcard, renderer, table=STRATEGY_TABLE):
+    player_action = basic_strategy_policy(kind, Player, playerHand, options, dealer_upcard, table)
+
+    action_names = {'H': 'Hit', 'S': 'Stand', 'D': 'Double Down', 'SPLIT': 'Split', 'N': 'No insurance'}
+    renderer.line("\nBasic strategy: %s" % action_names[player_action])
+    renderer.pause(1)
+
+    return player_action
+
+
+## PRINT_OPTIMAL_MOVE method ##
+##
+# Inputs:
+# deck (Shoe)
+# hole_card (int): Card code of the dealer's hole card. Only counted as unseen, never revealed.
+# playerHand (HandClass)
+# options (tuple): actions allowed by the engine
+# dealer_upcard (int): Card code of the dealer's upcard
+# renderer: Output backend (see render.py)
+# rules (Rules): Table rules
+# num_hands (int): No. of hands in play, 1 + No. of splits
+#
+# Outputs:
+# prints the action with the highest EV for the unseen cards, and its EV
+
+def print_optimal_move(deck, hole_card, playerHand, options, dealer_upcard, renderer, rules=DEFAULT_RULES, num_hands=1):
+    composition = list(deck.composition())
+    composition[CARD_VALUE[hole_card]-1] += 1
+    try:
+        evs = action_evs(playerHand.hand_cards, dealer_upcard, tuple(composition), options, rules=rules, num_hands=num_hands)
+    except ValueError:
+        # too few cards left to finish the round: the shoe deals on from its shuffled discards,
+        # so every card not on the table is unseen
+        on_table = [CARD_VALUE[card] for card in playerHand.hand_cards + [dealer_upcard]]
+        composition = remove_values(full_composition(deck.num_decks), on_table)
+        evs = action_evs(playerHand.hand_cards, dealer_upcard, composition, options, rules=rules, num_hands=num_hands)
+
+    action_names = {'H': 'Hit', 'S': 'Stand', 'D': 'Double Down', 'SPLIT': 'Split'}
+    best = max(evs, key=evs.get)
+    renderer.line("Optimal move: %s (EV %+.3f x bet)" % (action_names[best], evs[best]))
+
+
+## SHOW_EVENT method ##
+##
+# Inputs:
+# event (string): Round event raised by play_round()
+# result (RoundResult): Round in progress
+# hand (HandClass): Hand the event is about. None for dealer-only events.
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# prints the event, pausing between steps of the round
+
+def show_event(event, result, hand, renderer):
+    dealer_cards = result.dealer_hand.hand_cards
+
+    if event == 'deal':
+        renderer.line("\nBets closed. Dealing hand ...")
+        renderer.pause(1.5)
+        renderer.line("\nDealer:\n%s, <hidden card> (Sum: %s)" % (CARD_NAME[dealer_cards[0]], CARD_VALUE_PRIM[dealer_cards[0]]))
+        renderer.line("\nPlayer:")
+        print_cards_bothsums(hand, renderer)
+
+    elif event == 'sidebet_L':
+        if result.payoffs['sidebet_L'] == 30:
+            renderer.line("\nLeft sidebet WON. PERFECT PAIRS !!")
+        elif result.payoffs['sidebet_L'] == 12:
+            renderer.line("\nLeft sidebet WON. COLOURED PAIRS !!")
+        elif result.payoffs['sidebet_L'] == 5:
+            renderer.line("\nLeft sidebet WON. MIXED PAIRS !!")
+        else:
+            renderer.line("\nLeft sidebet LOST")
+
+        if result.payoffs['sidebet_L'] != 0:
+            renderer.line("You win $%s" % hand.hand_winnings[SIDEBET_L])
+
+    elif event == 'sidebet_R':
+        if result.payoffs['sidebet_R'] == 100:
+            renderer.line("\nRight sidebet WON. SUITED THREE-OF-A-KIND !!")
+        elif result.payoffs['sidebet_R'] == 40:
+            renderer.line("\nRight sidebet WON. STRAIGHT FLUSH !!")
+        elif result.payoffs['sidebet_R'] == 30:
+            renderer.line("\nRight sidebet WON. THREE-OF-A-KIND !!")
+        elif result.payoffs['sidebet_R'] == 10:
+            renderer.line("\nRight sidebet WON. STRAIGHT !!")
+        elif result.payoffs['sidebet_R'] == 5:
+            renderer.line("\nRight sidebet WON. FLUSH !!")
+        else:
+            renderer.line("\nRight sidebet LOST")
+
+        if result.payoffs['sidebet_R'] != 0:
+            renderer.line("You win $%s" % hand.hand_winnings[SIDEBET_R])
+
+    elif event == 'insurance_bought':
+        renderer.line("Insurance Bought")
+        renderer.pause(1.5)
+
+    elif event == 'insurance_unavailable':
+        renderer.line("\nDealer has an Ace. Insufficient balance for buying insurance")
+        renderer.pause(1.5)
+
+    elif event == 'insurance_lost':
+        renderer.line("\nDealer doesn't have Blackjack. Insurance LOST.")
+
+    elif event == 'insurance_won':
+        renderer.line('\nDealer has Blackjack. Insurance WON.')
+
+    elif event == 'dealer_blackjack':
+        renderer.line('\nDealer has Blackjack.')
+
+    elif event == 'split':
+        for playerHand in result.hands:
+            renderer.line("\nPlayer %s:" % playerHand.name)
+            print_cards_bothsums(playerHand, renderer)
+        renderer.pause(3)
+
+    elif event == 'play_split_hand':
+        if hand is not result.hands[0]:
+            renderer.pause(1.5)
+        renderer.line("\n-------------------\nPlaying %s ..." % hand.name)
+        renderer.line("\nDealer:\n%s, <hidden card> (Sum: %s)" % (CARD_NAME[dealer_cards[0]], CARD_VALUE_PRIM[dealer_cards[0]]))
+        renderer.line("\nPlayer %s:" % hand.name)
+        print_cards_bothsums(hand, renderer)
+
+    elif event == 'blackjack':
+        renderer.pause(2)
+        renderer.line("\nPlayer has got Blackjack.")
+
+    elif event == 'double':
+        renderer.line('\n____________\nDOUBLE DOWN\n------------\nTotal bet doubled to: $%s\n' % hand.bets[MAIN])
+        renderer.pause(2)
+
+    elif event == 'player_card':
+        renderer.line("\nPlayer:")
+        print_cards_bothsums(hand, renderer)
+
+    elif event == 'stand':
+        renderer.line("\nPlayer has stood.")
+
+    elif event == 'bust':
+        renderer.pause(2)
+        renderer.line("\nPlayer has busted.")
+
+    elif event == 'reveal':
+        renderer.pause(2)
+        renderer.line("\nREVEALING DEALER'S CARDS")
+        renderer.pause(1)
+        renderer.line("\nDealer:")
+        print_cards_bestsum(result.dealer_hand, renderer)
+
+    elif event == 'dealer_card':
+        renderer.line("\nDealer picking card #%s" % len(dealer_cards))
+        renderer.pause(2)
+        renderer.line("\nDealer:")
+        print_cards_bestsum(result.dealer_hand, renderer)
+
+    elif event == 'settle':
+        renderer.pause(1)
+        renderer.line("\nPlayer %s:" % hand.name if len(result.hands) > 1 else "\nPlayer:")
+        print_cards_bestsum(hand, renderer)
+
+        if hand.outcome == 'bust':
+            renderer.line("\nPlayer has busted. Dealer wins.")
+        elif hand.outcome == 'dealer_bust':
+            renderer.line("\nDealer has busted. Player wins.")
+        elif hand.outcome == 'lose':
+            renderer.line("\nPlayer has a lower hand. Dealer wins.")
+        elif hand.outcome == 'push' and hand.hand_status == STAND_INSURANCE:
+            renderer.line("\nPlayer also has Blackjack.\nPush.")
+        elif hand.outcome == 'push':
+            renderer.line("\nPush.")
+        elif result.dealer_hand.best_total < 17:
+            renderer.line("\nPlayer has Blackjack. Dealer has a lower hand. Player wins.")
+        else:
+            renderer.line("\nPlayer wins.")
+
+
+## PRINT_WINNINGS method ##
+##
+# Inputs:
+# Player (Bro)
+# result (RoundResult)
+# renderer: Output backend (see render.py)
+#
+# Outputs:
+# prints each hand's net winnings and the balance after the round
+
+def print_winnings(Player, result, renderer):
+    hand1 = result.hands[0]
+
+    hand1_winnings = sum(hand1.hand_winnings)
+    this_hand_winnings = hand1_winnings
+
+    hand1_win_str = "$"+str(hand1_winnings) if hand1_winnings >= 0 else "-$"+str(-hand1_winnings)
+    insurance_win = hand1.hand_winnings[INSURANCE]
+    sidebet_L_win = hand1.hand_winnings[SIDEBET_L]
+    sidebet_R_win = hand1.hand_winnings[SIDEBET_R]
+
+    # Display Hand #1 winnings
+    renderer.line("")
+    if len(result.hands) > 1:
+        renderer.line("----------------\nHAND #1 WINNINGS\n----------------")
+    if insurance_win != 0:
+        ins_win_str = "$"+str(insurance_win) if insurance_win>=0 else "-$"+str(-insurance_win)
+        renderer.line("Insurance win: %s" % ins_win_str)
+    if sidebet_L_win != 0:
+        sideL_win_str = "$"+str(sidebet_L_win) if sidebet_L_win>=0 else "-$"+str(-sidebet_L_win)
+        renderer.line("Left Sidebet win: %s" % sideL_win_str)
+    if sidebet_R_win != 0:
+        sideR_win_str = "$"+str(sidebet_R_win) if sidebet_R_win>=0 else "-$"+str(-sidebet_R_win)
+        renderer.line("Right Sidebet win: %s" % sideR_win_str)
+
+    main_bet_win = hand1.hand_winnings[MAIN] + hand1.hand_winnings[BLACKJACK]
+    main_win_str = "$"+str(main_bet_win) if main_bet_win >= 0 else "-$"+str(-main_bet_win)
+    renderer.line("Main bet win: %s" % main_win_str)
+
+    # Display the winnings of the split hands (Hand #2 on)
+    if len(result.hands) > 1:
+        renderer.line("----------------\nTotal: %s" % hand1_win_str)
+
+    for hand_number, playerHand in enumerate(result.hands[1:], 2):
+        split_winnings = sum(playerHand.hand_winnings)
+        split_win_str = "$"+str(split_winnings) if split_winnings >= 0 else "-$"+str(-split_winnings)
+        renderer.line("\n----------------\nHAND #%d WINNINGS\n----------------" % hand_number)
+        renderer.line("Total: %s\n" % split_win_str)
+
+        this_hand_winnings += split_winnings
+
+    net_hand_win_str = "$"+str(this_hand_winnings) if (this_hand_winnings) >= 0 else "-$"+str(-this_hand_winnings)
+    renderer.line("------------------------------\nNet Hand Winnings: %s \nBalance: $%s" % (net_hand_win_str, Player.balance))
+
+
+#############################################################
+######################## main method ########################
+#############################################################
+
+def start_game(renderer=None, profiler=None, rules=None):
+    # renderer defaults to the terminal at the normal pace. profiler (PhaseProfiler, see profile.py) times the round phases.
+    # rules (engine.Rules) default to the house rules.
+    if renderer is None:
+        renderer = TerminalRenderer()
+    if rules is None:
+        rules = DEFAULT_RULES
+
+    renderer.line("\nWelcome to TakeMyMoney BlackJack ©\n")
+
+    # Deposit player balance
+    init_bal = '0'
+    while init_bal.isnumeric() is False or int(init_bal) < 10:
+        init_bal = renderer.ask("Deposit Balance (minimum 10): $")
+
+    # initializing Player
+    Player = Bro('player', int(init_bal)*1.0)
+
+    # let the basic strategy table play the hands, or ask the player
+    auto_play = ''
+    while auto_play not in ('y','n'):
+        auto_play = renderer.ask("Auto-play hands with basic strategy? (y/n): ").lower()
+    if auto_play == 'y':
+        decide = partial(get_auto_decision, renderer=renderer, table=rules_strategy_table(rules))
+    else:
+        decide = partial(get_player_decision, renderer=renderer)
+
+    show_hints = 'n'
+    if auto_play == 'n':
+        show_hints = ''
+        while show_hints not in ('y','n'):
+            show_hints = renderer.ask("Show optimal move hints? (y/n): ").lower()
+
+    # initializing shoe/deck
+    num_decks = rules.num_decks
+    deck = Shoe(num_decks, penetration=rules.penetration)
+    renderer.line('\nPlaying with %d decks in shoe' % num_decks)
+    renderer.line("Shoe shuffled (seed %s)" % deck.seed)
+
+
+    #######################
+    ### COMMENCING HAND ###
+    #######################
+
+    keep_playing = 'y'
+    while(keep_playing == 'y' and Player.balance >= 10):
+        renderer.line("\nBalance: $%s" % Player.balance)
+
+        if deck.needs_shuffle():
+            deck.shuffle()
+            renderer.line('\nNEW SHOE. Playing with %d decks in shoe' % num_decks)
+            renderer.line("Shoe shuffled (seed %s)" % deck.seed)
+
+        # reinitialize
+        Player.hands[0] = HandClass('Hand #1')
+
+        # get player's bet amounts
+        if profiler is not None:
+            profiler.begin('betting')
+        Player = get_player_bet(Player, renderer)
+        Player.prev_bets[:] = Player.hands[0].bets
+        if profiler is not None:
+            profiler.end()
+
+        # play the round. All game logic lives in the engine; this shell only asks and shows.
+        # The hints take the dealer's hole card from the deal event: its place in the shoe moves
+        # if the shoe runs out mid-round.
+        dealt = {}
+
+        def show_and_keep_deal(event, result, hand):
+            if event == 'deal':
+                dealt['dealer'] = result.dealer_hand
+            show_event(event, result, hand, renderer)
+
+        def decide_with_hint(kind, Player, playerHand, options, dealer_upcard):
+            if kind != 'insurance':
+                print_optimal_move(deck, dealt['dealer'].hand_cards[1], playerHand, options, dealer_upcard, renderer, rules, Player.num_hands)
+            return decide(kind, Player, playerHand, options, dealer_upcard)
+
+        result = play_round(Player, deck, decide_with_hint if show_hints == 'y' else decide, show_and_keep_deal, rules=rules, profiler=profiler)
+
+        renderer.pause(2)
+        if profiler is not None:
+            profiler.begin('display')
+        print_winnings(Player, result, renderer)
+        if profiler is not None:
+            profiler.end()
+
+        # User input for next round
+        if result.exited:
+            keep_playing = 'exit'
+        else:
+            next_round = ''
+            while next_round not in ('y','n') and Player.balance >= 10:
+                next_round = renderer.ask("\nPlay another hand (y/n): ")
+
+            keep_playing = next_round
+
+        renderer.clear()
+
+
+    ## display net winnings, max balance and final balance at exit
+    net_win = Player.balance - Player.init_balance
+
+    if net_win < 0:
+        renderer.line("\n---- Exiting Game ----\n\nNet Winnings: -$%s" % -net_win)
+        renderer.line("Highest Balance achieved: $%s" % Player.max_balance)
+        renderer.line("\n----------------------\nFinal Balance: $%s\n----------------------" % Player.balance)
+        renderer.line("\nThanks for donating your money to TakeMyMoney BlackJack ©. AHAHA YIPPIKAYAY MADAF... ;D \n")
+    else:
+        renderer.line("\n---- Exiting Game ----\n\nNet Winnings: $%s" % net_win)
+        renderer.line("Highest Balance achieved: $%s" % Player.max_balance)
+        renderer.line("\n----------------------\nFinal Balance: $%s\n----------------------" % Player.balance)
+        renderer.line("\nThank you for playing with TakeMyMoney BlackJack © \n")
+
+    renderer.flush()
+    return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="blackjack", description="TakeMyMoney BlackJack console game")
+    parser.add_argument('--renderer', default='terminal', choices=('terminal', 'buffered', 'null'),
+                        help="Output backend: the interactive terminal, output written in one go per prompt, or none (answers still read from stdin)")
+    parser.add_argument('--pace', type=float, default=1.0, help="Pause multiplier of the terminal renderer: 1 = normal pacing, 0 = no pauses")
+    parser.add_argument('--rules', default='', help="Table rules as a spec, e.g. '6D H17 DAS SP4 D10-11' (see engine.parse_rules)")
+    args = parser.parse_args(argv)
+    if args.pace < 0:
+        parser.error("--pace must be >= 0")
+    try:
+        rules = parse_rules(args.rules)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.renderer == 'null':
+        renderer = NullRenderer()
+    elif args.renderer == 'buffered':
+        renderer = BufferedRenderer()
+    else:
+        renderer = TerminalRenderer(args.pace)
+    start_game(renderer, rules=rules)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+### BLACKJACK DEALER PROBABILITIES ###
+# Exact probabilities of the dealer's final total, given the dealer's upcard and the composition
+# of the cards left in the shoe. Works by recursion over shoe states (every card the dealer can
+# draw, weighted by how many are left), memoized on (composition, dealer total).
+#
+# A composition is a tuple of 10 counts indexed by blackjack value - 1:
+#   (aces, twos, threes, ... nines, ten-valued cards)
+# Dealer draws to 17 and stands on all 17s, or with hit_soft_17 (H17) hits soft 17, as play_dealer() in engine.py.
+
+
+from functools import lru_cache
+from blackjack.cards import CARD_VALUE
+
+
+OUTCOMES = (17, 18, 19, 20, 21, 'blackjack', 'bust')
+BLACKJACK = 5       # index of 'blackjack' in OUTCOMES
+BUST = 6            # index of 'bust' in OUTCOMES
+NUM_VALUES = 10
+
+_ZERO = (0.0,)*len(OUTCOMES)
+
+
+## FULL_COMPOSITION method ##
+##
+# Inputs:
+# num_decks (int): No. of decks in the shoe
+#
+# Outputs:
+# composition (tuple): Counts per value of a full shoe
+
+def full_composition(num_decks):
+    return (4*num_decks,)*9 + (16*num_decks,)
+
+
+## CARDS_COMPOSITION method ##
+##
+# Inputs:
+# cards (iterable): Card codes, e.g. deck.cards[deck.pos:] for the undealt part of a Shoe
+#
+# Outputs:
+# composition (tuple): Counts per value of the cards
+
+def cards_composition(cards):
+    counts = [0]*NUM_VALUES
+    for card in cards:
+        counts[CARD_VALUE[card]-1] += 1
+    return tuple(counts)
+
+
+## REMOVE_VALUES method ##
+##
+# Inputs:
+# composition (tuple)
+# values (iterable): Blackjack values (1 for Ace ... 10) of the cards to take out
+#
+# Outputs:
+# composition (tuple): Composition without those cards
+
+def remove_values(composition, values):
+    counts = list(composition)
+    for value in values:
+        if counts[value-1] == 0:
+            raise ValueError("No card of value %d left in the composition" % value)
+        counts[value-1] -= 1
+    return tuple(counts)
+
+
+## _DEALER_FROM method ##
+##
+# Inputs:
+# composition (tuple): Cards left to draw from
+# hard_total (int): Dealer's total counting Aces as 1
+# has_ace (bool): True if dealer holds an Ace
+# hit_soft_17 (bool): Dealer hits soft 17
+#
+# Outputs:
+# probabilities (tuple): Probability of each of OUTCOMES, from a hand of 2+ cards (no blackjack possible)
+
+@lru_cache(maxsize=1 << 18)
+def _dealer_from(composition, hard_total, has_ace, hit_soft_17):
+    best_total = hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+
+    if hard_total > 21:
+        return _ZERO[:BUST] + (1.0,)
+    if best_total >= 17 and not (hit_soft_17 and best_total == 17 and hard_total == 7):
+        return _ZERO[:best_total-17] + (1.0,) + _ZERO[best_total-16:]
+
+    num_cards = sum(composition)
+    if num_cards == 0:
+        raise ValueError("Shoe ran out of cards before the dealer reached 17")
+
+    probabilities = [0.0]*len(OUTCOMES)
+    counts = list(composition)
+    for i in range(NUM_VALUES):
+        count = counts[i]
+        if count == 0:
+            continue
+        counts[i] = count - 1
+        sub = _dealer_from(tuple(counts), hard_total + i + 1, has_ace or i == 0, hit_soft_17)
+        counts[i] = count
+
+        weight = count / num_cards
+        for j in range(len(OUTCOMES)):
+            probabilities[j] += weight * sub[j]
+
+    return tuple(probabilities)
+
+
+## DEALER_OUTCOME_PROBS method ##
+##
+# Inputs:
+# upcard (int): Blackjack value of the dealer's upcard, 1 for Ace ... 10
+# composition (tuple): Cards the dealer draws from, upcard already removed
+# no_blackjack (bool): True to condition on the dealer not having blackjack (e.g. after checking under an Ace)
+# hit_soft_17 (bool): Dealer hits soft 17 (Rules.hit_soft_17)
+#
+# Outputs:
+# probabilities (tuple): Probability of each of OUTCOMES
+
+def dealer_outcome_probs(upcard, composition, no_blackjack=False, hit_soft_17=False):
+    if not 1 <= upcard <= NUM_VALUES:
+        raise ValueError("upcard must be a blackjack value from 1 (Ace) to 10, got %r" % (upcard,))
+    composition = tuple(composition)
+    if len(composition) != NUM_VALUES:
+        raise ValueError("composition must have %d counts, got %d" % (NUM_VALUES, len(composition)))
+
+    num_cards = sum(composition)
+    probabilities = [0.0]*len(OUTCOMES)
+    total_weight = 0.0
+
+    # draw the hole card separately, it is the only card that can make blackjack
+    counts = list(composition)
+    for i in range(NUM_VALUES):
+        count = counts[i]
+        if count == 0:
+            continue
+        weight = count / num_cards
+
+        if (upcard == 1 and i == 9) or (upcard == 10 and i == 0):
+            if not no_blackjack:
+                probabilities[BLACKJACK] += weight
+                total_weight += weight
+            continue
+
+        counts[i] = count - 1
+        sub = _dealer_from(tuple(counts), upcard + i + 1, upcard == 1 or i == 0, hit_soft_17)
+        counts[i] = count
+
+        total_weight += weight
+        for j in range(len(OUTCOMES)):
+            probabilities[j] += weight * sub[j]
+
+    if total_weight == 0:
+        raise ValueError("No hole card can be drawn from this composition")
+
+    return tuple(probability / total_weight for probability in probabilities)
+
+
+## DEALER_PROBABILITIES method ##
+##
+# Inputs:
+# upcard (int): Blackjack value of the dealer's upcard, 1 for Ace ... 10
+# composition (tuple): Cards the dealer draws from, upcard already removed
+# no_blackjack (bool): True to condition on the dealer not having blackjack
+# hit_soft_17 (bool): Dealer hits soft 17
+#
+# Outputs:
+# probabilities (dict): outcome (17, 18, 19, 20, 21, 'blackjack', 'bust') -> probability
+
+def dealer_probabilities(upcard, composition, no_blackjack=False, hit_soft_17=False):
+    return dict(zip(OUTCOMES, dealer_outcome_probs(upcard, composition, no_blackjack, hit_soft_17)))
+
+
+## CLEAR_CACHE method ##
+##
+# Inputs:
+# <none>
+#
+# Outputs:
+# <none>
+# Drops all memoized shoe states
+
+def clear_cache():
+    _dealer_from.cache_clear()
@@ -0,0 +1,934 @@
+### BLACKJACK ENGINE ###
+# I/O-free round engine. Holds the game objects and rules; the CLI (cli.py)
+# is a thin shell over play_round(), supplying player decisions and displaying events.
+# play_round_steps() is the same round as a generator that yields at every decision, for callers
+# that can't block on a decision callback (server.py).
+#
+# No input(), print(), time.sleep() or os.system() calls are allowed in this module.
+
+
+import random
+from array import array
+from blackjack.cards import ACE_MIN, CARD_COLOUR, CARD_NAME, CARD_RANK, CARD_SUIT, CARD_VALUE, STRAIGHT_MASKS
+from blackjack.shoe import Shoe
+
+
+
+## NEW_SHOE method ##
+##
+# Inputs:
+# num_decks (int): No. of decks to be used in the new shoe
+#
+# Outputs:
+# shoe (Shoe): New shuffled shoe
+
+def new_shoe(num_decks):
+
+    shoe = Shoe(num_decks)
+
+    return shoe
+
+
+## SHUFFLE_SHOE method ##
+##
+# Inputs:
+# shoe (bytearray): Deck of card codes to be shuffled
+# times (int): No. of times the shoe is to be shuffled
+#
+# Outputs:
+# shoe (bytearray): Shuffled shoe
+
+def shuffle_shoe(shoe = list, times = int):
+    if times < 1:
+        raise ValueError("Shuffle times must be > 0")
+
+    for i in range(times):
+        random.shuffle(shoe)
+
+    return shoe
+
+
+## SUM_CARDS method ##
+##
+# Inputs:
+# hand_cards (list): Hand/deck of card codes
+#
+# Outputs:
+# sum_cards_prim (int): Sum of blackjack primary values of all cards
+# sum_cards_sec (int): Sum of blackjack secondary values of all cards
+# best_sum (int): Highest allowable sum out of primary and secondary sums calculated above
+
+def sum_cards(hand_cards):
+    sum_cards_sec = 0
+    for card in hand_cards:
+        sum_cards_sec += CARD_VALUE[card]
+
+    # aces are the highest card codes
+    if hand_cards and max(hand_cards) >= ACE_MIN:
+        sum_cards_prim = sum_cards_sec + 10
+    else:
+        sum_cards_prim = sum_cards_sec
+
+    if sum_cards_prim <= 21:
+        best_sum = sum_cards_prim
+    else:
+        best_sum = sum_cards_sec
+
+    return sum_cards_prim, sum_cards_sec, best_sum
+
+
+## COMPARE_PLAYER_DEALER method ##
+##
+# Inputs:
+# playerHand (HandClass): Player's Hand object
+# dealerHand (HandClass): Dealer's Hand object
+# payoffs (dict): Dictionary containing payoff of every event - main bet, blackjack, sidebets
+#
+# Outputs:
+# playerHand (HandClass)
+# Sets playerHand.outcome: 'bust', 'dealer_bust', 'lose', 'push' or 'win'
+
+def compare_player_dealer(playerHand, dealerHand, payoffs):
+    dealer_best_sum = dealerHand.best_total
+    player_best_sum = playerHand.best_total
+
+    if player_best_sum > 21:
+        playerHand.hand_winnings[MAIN] = -playerHand.bets[MAIN]
+        playerHand.outcome = 'bust'
+
+    elif dealer_best_sum > 21:
+        playerHand.hand_winnings[MAIN] = playerHand.bets[MAIN]
+        playerHand.hand_winnings[BLACKJACK] = playerHand.blackjack_hand * payoffs['blackjack'] * playerHand.bets[BLACKJACK]
+        playerHand.outcome = 'dealer_bust'
+
+    # Dealer has higher hand
+    elif dealer_best_sum > player_best_sum:
+        playerHand.hand_winnings[MAIN] = -playerHand.bets[MAIN]
+        playerHand.outcome = 'lose'
+
+    # Equal hands
+    elif dealer_best_sum == player_best_sum:
+        playerHand.hand_winnings[MAIN] = 0.0
+        playerHand.hand_winnings[BLACKJACK] = 0.0
+        playerHand.outcome = 'push'
+
+    # Player has higher hand
+    else:
+        playerHand.hand_winnings[MAIN] = playerHand.bets[MAIN]
+        playerHand.hand_winnings[BLACKJACK] = playerHand.blackjack_hand * payoffs['blackjack'] * playerHand.bets[BLACKJACK]
+        playerHand.outcome = 'win'
+
+    return playerHand
+
+
+## CHECK_PERFECT_PAIR method ##
+##
+# Inputs:
+# player_hand_cards (list): Player's Hand of card codes
+# payoffs (dict)
+#
+# Outputs:
+# payoffs (dict)
+# Checks for Perfect Pairs sidebet. Sets payoffs['sidebet_L'] to 30 (perfect), 12 (coloured), 5 (mixed), else leaves it untouched
+
+def check_perfect_pair(player_hand_cards, payoffs):
+    first_card, second_card = player_hand_cards[0], player_hand_cards[1]
+
+    # same code means same face and same suit
+    if first_card == second_card:
+        payoffs['sidebet_L'] = 30
+    elif CARD_RANK[first_card] == CARD_RANK[second_card]:
+        if CARD_COLOUR[first_card] == CARD_COLOUR[second_card]:
+            payoffs['sidebet_L'] = 12
+        else:
+            payoffs['sidebet_L'] = 5
+
+    return payoffs
+
+
+## CHECK_21_PLUS_3 method ##
+##
+# Inputs:
+# player_hand_cards (list): Player's Hand of card codes
+# dealer_hand_cards (list): Dealer's Hand of card codes
+# payoffs (dict)
+#
+# Outputs:
+# payoffs (dict)
+# Sets payoffs['sidebet_R'] to 100 (suited trips), 40 (straight flush), 30 (trips), 10 (straight), 5 (flush), else leaves it untouched
+
+def check_21_plus_3(player_hand_cards, dealer_hand_cards, payoffs):
+    card_1, card_2, card_3 = player_hand_cards[0], player_hand_cards[1], dealer_hand_cards[0]
+
+    rank_1, rank_2, rank_3 = CARD_RANK[card_1], CARD_RANK[card_2], CARD_RANK[card_3]
+    is_trips = rank_1 == rank_2 == rank_3
+    is_flush = CARD_SUIT[card_1] == CARD_SUIT[card_2] == CARD_SUIT[card_3]
+    # consecutive triplets are (A,2,3), (2,3,4) ... (J,Q,K) and (Q,K,A)
+    is_straight = ((1 << rank_1) | (1 << rank_2) | (1 << rank_3)) in STRAIGHT_MASKS
+
+    if is_trips and is_flush:
+        payoffs['sidebet_R'] = 100
+    elif is_straight and is_flush:
+        payoffs['sidebet_R'] = 40
+    elif is_trips:
+        payoffs['sidebet_R'] = 30
+    elif is_straight:
+        payoffs['sidebet_R'] = 10
+    elif is_flush:
+        payoffs['sidebet_R'] = 5
+
+    return payoffs
+
+
+# Slots of HandClass.bets / hand_winnings and Bro.prev_bets
+MAIN, BLACKJACK, INSURANCE, SIDEBET_L, SIDEBET_R = range(5)
+BET_NAMES = ('main', 'blackjack', 'insurance', 'sidebet_L', 'sidebet_R')
+NO_BETS = array('d', [0.0]*len(BET_NAMES))
+
+# Hand statuses
+ACTIVE, STAND, STAND_INSURANCE, STAND_BLACKJACK, BUST, EXIT = range(6)
+STATUS_NAMES = ('active', 'stand', 'stand_insurance', 'stand_blackjack', 'bust', 'exit')
+
+MAX_HANDS = 4       # up to three splits (resplits)
+
+DOUBLE_RULES = {'any': (2, 21), '9-11': (9, 11), '10-11': (10, 11)}    # best totals a first-two-card hand may double on
+
+
+## RULES class ##
+##
+# Attributes:
+# num_decks (int): No. of decks in the shoe
+# penetration (float): Fraction of the shoe dealt before the cut card
+# hit_soft_17 (bool): Dealer hits soft 17 (H17). False: dealer stands on all 17s (S17).
+# blackjack_payout (float): Blackjack pays this times the main bet. 1.5 = 3:2, 1.2 = 6:5.
+# insurance_payout (float): Insurance pays this times the insurance bet. 2.0 = 2:1.
+# double_on (string): First two cards a hand may double on, a key of DOUBLE_RULES: 'any', '9-11' or '10-11'
+# double_after_split (bool): Split hands may double (DAS)
+# max_hands (int): Most hands a player can split into. 1 = no splitting, 2 = one split, up to MAX_HANDS.
+#
+# The defaults are the house rules of the console game. Written as a spec by str() and read back by
+# parse_rules(), e.g. '8D S17 3:2 NDAS SP2 DA PEN0.5'.
+
+class Rules:
+    __slots__ = ('num_decks', 'penetration', 'hit_soft_17', 'blackjack_payout', 'insurance_payout', 'double_on',
+                 'double_after_split', 'max_hands')
+
+    def __init__(self, num_decks=8, penetration=0.5, hit_soft_17=False, blackjack_payout=1.5, insurance_payout=2.0,
+                 double_on='any', double_after_split=False, max_hands=2):
+        if num_decks < 1:
+            raise ValueError("Shoe must have at least 1 deck")
+        if not 0 < penetration < 1:
+            raise ValueError("Penetration must be > 0 and < 1")
+        if double_on not in DOUBLE_RULES:
+            raise ValueError("Unknown double rule %r, expected one of %s" % (double_on, sorted(DOUBLE_RULES)))
+        if not 1 <= max_hands <= MAX_HANDS:
+            raise ValueError("max_hands must be 1 to %d" % MAX_HANDS)
+
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.hit_soft_17 = hit_soft_17
+        self.blackjack_payout = blackjack_payout
+        self.insurance_payout = insurance_payout
+        self.double_on = double_on
+        self.double_after_split = double_after_split
+        self.max_hands = max_hands
+
+    ## Base payoffs of play_round(). Blackjack is paid on top of the main bet's even money.
+    def payoffs(self):
+        return {'blackjack': self.blackjack_payout - 1, 'insurance': self.insurance_payout, 'sidebet_L': 0, 'sidebet_R': 0}
+
+    ## Spec string, parse_rules(str(rules)) == rules
+    def __str__(self):
+        spec = '%dD %s %s %s SP%d D%s PEN%s' % (self.num_decks, 'H17' if self.hit_soft_17 else 'S17', payout_ratio(self.blackjack_payout),
+                'DAS' if self.double_after_split else 'NDAS', self.max_hands, 'A' if self.double_on == 'any' else self.double_on, self.penetration)
+        if self.insurance_payout != 2.0:
+            spec += ' INS' + payout_ratio(self.insurance_payout)
+        return spec
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and all(getattr(self, name) == getattr(other, name) for name in Rules.__slots__)
+
+    def __hash__(self):
+        return hash(str(self))
+
+
+## PAYOUT_RATIO method ##
+##
+# Inputs:
+# payout (float): e.g. 1.5
+#
+# Outputs:
+# ratio (string): e.g. '3:2'
+
+def payout_ratio(payout):
+    for denominator in range(1, 11):
+        if abs(payout*denominator - round(payout*denominator)) < 1e-9:
+            return '%d:%d' % (round(payout*denominator), denominator)
+    return '%s:1' % payout
+
+
+## PARSE_RULES method ##
+##
+# Inputs:
+# spec (string): Space or comma separated tokens, each setting one rule. Missing rules keep base's value.
+#       <n>D decks, S17/H17, <a>:<b> blackjack payout, DAS/NDAS, SP<n> max hands, DA/D9-11/D10-11 double rule,
+#       PEN<fraction> penetration, INS<a>:<b> insurance payout
+# base (Rules): Rules to start from. Defaults to the house rules.
+#
+# Outputs:
+# rules (Rules)
+
+def parse_rules(spec, base=None):
+    base = Rules() if base is None else base
+    values = {name: getattr(base, name) for name in Rules.__slots__}
+
+    for token in spec.replace(',', ' ').upper().split():
+        try:
+            if token in ('S17', 'H17'):
+                values['hit_soft_17'] = token == 'H17'
+            elif token in ('DAS', 'NDAS'):
+                values['double_after_split'] = token == 'DAS'
+            elif token.startswith('INS'):
+                numerator, denominator = token[3:].split(':')
+                values['insurance_payout'] = int(numerator) / int(denominator)
+            elif ':' in token:
+                numerator, denominator = token.split(':')
+                values['blackjack_payout'] = int(numerator) / int(denominator)
+            elif token.startswith('SP'):
+                values['max_hands'] = int(token[2:])
+            elif token.startswith('PEN'):
+                values['penetration'] = float(token[3:])
+            elif token.startswith('D') and (token == 'DA' or token[1:] in DOUBLE_RULES):
+                values['double_on'] = 'any' if token == 'DA' else token[1:]
+            elif token.endswith('D'):
+                values['num_decks'] = int(token[:-1])
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError("Invalid rule %r in %r" % (token, spec))
+
+    return Rules(**values)
+
+
+DEFAULT_RULES = Rules()
+_NO_SPLIT_HANDS = [None]*(MAX_HANDS - 1)
+
+
+## HANDCLASS class ##
+##
+# Attributes:
+# name (string): name of Hand e.g. Hand #1, Hand #2, Dealer Hand #1
+# player_action (string): H = Hit, S = Stand, D = Double down, SPLIT = split, EXIT = exit game
+# actions (list): Every player_action of the hand so far, in order
+# hand_cards (list): Codes of all the cards in current hand
+# hand_status (int): ACTIVE if player is hitting, STAND_INSURANCE if player wins insurance, STAND_BLACKJACK if player gets blackjack, STAND, BUST, EXIT
+# hand_winnings (array): Winnings corresponding to each type of bet, indexed by MAIN ... SIDEBET_R
+# bets (array): Bet amounts for each type of bet, indexed by MAIN ... SIDEBET_R
+# blackjack_hand (int): 1 if hand is blackjack, 0 otherwise
+# outcome (string): Result of comparison with dealer. '' until settled, then 'bust', 'dealer_bust', 'lose', 'push' or 'win'
+# hard_total (int): Sum of blackjack secondary values of all cards (Aces count 1)
+# soft_total (int): hard_total + 10 if hand has an Ace, else hard_total. Same as sum_cards_prim.
+# best_total (int): soft_total if it is 21 or under, else hard_total. Same as best_sum.
+# num_aces (int): No. of Aces in the hand
+#
+# Totals are kept up to date by add_card()/remove_card(). Always change hand_cards through them.
+
+class HandClass:
+    __slots__ = ('name', 'player_action', 'actions', 'hand_cards', 'hand_status', 'hand_winnings', 'bets', 'blackjack_hand',
+                 'outcome', 'hard_total', 'soft_total', 'best_total', 'num_aces')
+
+    def __init__(self, name):
+        self.name = name
+        self.player_action = ''
+        self.actions = []
+        self.hand_cards = []
+        self.hand_status = ACTIVE
+        self.hand_winnings = array('d', NO_BETS)
+        self.bets = array('d', NO_BETS)
+        self.blackjack_hand = 0     # if hand has blackjack then 1 else 0
+        self.outcome = ''
+        self.hard_total = 0
+        self.soft_total = 0
+        self.best_total = 0
+        self.num_aces = 0
+
+    ## Add a card code to the hand and update the totals
+    def add_card(self, card):
+        self.hand_cards.append(card)
+        hard_total = self.hard_total + CARD_VALUE[card]
+        self.hard_total = hard_total
+        if card >= ACE_MIN:
+            self.num_aces += 1
+
+        if self.num_aces:
+            self.soft_total = hard_total + 10
+            self.best_total = hard_total + 10 if hard_total <= 11 else hard_total
+        else:
+            self.soft_total = self.best_total = hard_total
+
+    ## Remove the card at index from the hand, update the totals and return the card code
+    def remove_card(self, index):
+        card = self.hand_cards.pop(index)
+        hard_total = self.hard_total - CARD_VALUE[card]
+        self.hard_total = hard_total
+        if card >= ACE_MIN:
+            self.num_aces -= 1
+
+        if self.num_aces:
+            self.soft_total = hard_total + 10
+            self.best_total = hard_total + 10 if hard_total <= 11 else hard_total
+        else:
+            self.soft_total = self.best_total = hard_total
+
+        return card
+
+    def __str__(self):
+        show_hand_cards = "{" + ", ".join(CARD_NAME[card] for card in self.hand_cards) + "}"
+        show_hand_winnings = "[" + ", ".join("%s: %s" % item for item in zip(BET_NAMES, self.hand_winnings)) + "]"
+        show_bets = "[" + ", ".join("%s: %s" % item for item in zip(BET_NAMES, self.bets)) + "]"
+
+        tempshow = "name: %s, player_action: %s,\nhand_cards: %s,\nhand_status: %s,\nbets: %s,\nhand_winnings: %s,\nblackjack_hand: %s" % (self.name,
+                self.player_action, show_hand_cards, STATUS_NAMES[self.hand_status], show_bets, show_hand_winnings, self.blackjack_hand)
+
+        return tempshow
+
+
+## BRO class ##
+##
+# Attributes:
+# name (string): name of Bro. e.g. dealer, player
+# balance (int): Latest balance. NULL for dealer.
+# init_balance (int): Starting balance = deposited money. NULL for dealer.
+# max_balance (int): Highest balance achieved. NULL for dealer.
+# prev_bets (array): Bet amounts in last hand for each type of bet, indexed by MAIN ... SIDEBET_R. Always 0 for insurance.
+# hands (list): MAX_HANDS slots for the hands (HandClass) in play. hands[0] is Hand #1 (the dealer's only hand), None if unused.
+# num_hands (int): No. of hands in play this round. 1 + No. of splits
+
+class Bro:
+    __slots__ = ('name', 'balance', 'init_balance', 'max_balance', 'prev_bets', 'hands', 'num_hands')
+
+    def __init__(self, name, balance = int):
+        self.name = name
+        self.balance = balance
+        self.init_balance = balance
+        self.max_balance = balance
+        self.prev_bets = array('d', NO_BETS)
+        self.hands = [None]*MAX_HANDS
+        self.num_hands = 0
+
+
+## ROUNDRESULT class ##
+##
+# Attributes:
+# hands (list): Player's hands (HandClass) in play order. Cards, statuses, bets and per-bet winnings live on each hand.
+# dealer_hand (HandClass): Dealer's hand
+# payoffs (dict): Payoffs used for the round, including the sidebet multipliers that were hit
+# balance_delta (float): Net change in Player's balance over the round
+# exited (bool): True if the player exited mid-round and forfeited the active bets
+
+class RoundResult:
+    def __init__(self, hands, dealer_hand, payoffs):
+        self.hands = hands
+        self.dealer_hand = dealer_hand
+        self.payoffs = payoffs
+        self.balance_delta = 0.0
+        self.exited = False
+
+    def __str__(self):
+        return "hands: %s,\ndealer_hand: %s,\nbalance_delta: %s, exited: %s" % ([str(hand) for hand in self.hands],
+                str(self.dealer_hand), self.balance_delta, self.exited)
+
+
+## GET_INIT_OPTIONS method ##
+##
+# Inputs:
+# Player (Bro)
+# playerHand (HandClass)
+# num_hands (int): number of hands being played by the player. 1 + No. of splits
+# rules (Rules)
+#
+# Outputs:
+# options (tuple): Actions allowed on the first two cards of the hand
+
+def get_init_options(Player, playerHand, num_hands, rules=DEFAULT_RULES):
+    # Don't allow doubling down or splitting if balance not sufficient for one more main bet
+    if Player.balance < (num_hands + 1)*playerHand.bets[MAIN]:
+        return ('H', 'S', 'EXIT')
+
+    low, high = DOUBLE_RULES[rules.double_on]
+    can_double = (num_hands == 1 or rules.double_after_split) and low <= playerHand.best_total <= high
+    # if player has two cards of the same value, give option of splitting
+    can_split = num_hands < rules.max_hands and CARD_VALUE[playerHand.hand_cards[0]] == CARD_VALUE[playerHand.hand_cards[1]]
+
+    return _INIT_OPTIONS[can_double, can_split]
+
+
+_INIT_OPTIONS = {(False, False): ('H', 'S', 'EXIT'), (True, False): ('H', 'S', 'D', 'EXIT'),
+                 (False, True): ('H', 'S', 'SPLIT', 'EXIT'), (True, True): ('H', 'S', 'D', 'SPLIT', 'EXIT')}
+
+
+## DEAL_CARDS_TO_PLAYER method ##
+##
+# Inputs:
+# Player (Bro)
+# playerHand (HandClass)
+# deck (Shoe)
+# observer (function): event callback, observer(event, result, hand). None to ignore events.
+# result (RoundResult)
+#
+# Outputs:
+# playerHand (HandClass)
+# deck (Shoe)
+# Generator: yields decision requests (see play_round_steps())
+
+def deal_cards_to_player(Player, playerHand, deck, observer, result):
+
+    while playerHand.player_action in ('H','D'):
+        new_card = deck.deal()
+        playerHand.add_card(new_card)
+
+        # If DOUBLE DOWN
+        if playerHand.player_action == 'D':
+            playerHand.bets[MAIN] *= 2
+            if observer is not None:
+                observer('double', result, playerHand)
+
+        if observer is not None:
+            observer('player_card', result, playerHand)
+
+        player_best_sum = playerHand.best_total
+
+        if player_best_sum > 21:
+        # if player's best allowable score > 21 then bust out
+            playerHand.hand_status = BUST
+            break
+        elif player_best_sum == 21 or playerHand.player_action == 'D':
+        # if player's best allowable score == 21 or player had doubled down then auto-stand
+            playerHand.hand_status = STAND
+            break
+
+        # if player has not busted, ask for hit/stand action
+        playerHand.player_action = yield ('next', playerHand, ('H', 'S', 'EXIT'), result.dealer_hand.hand_cards[0])
+        playerHand.actions.append(playerHand.player_action)
+
+    return playerHand, deck
+
+
+## PLAY_HAND method ##
+##
+# Inputs:
+# Player (Bro)
+# playerHand (HandClass)
+# deck (Shoe)
+# observer (function): event callback. None to ignore events.
+# result (RoundResult)
+#
+# Outputs:
+# playerHand (HandClass)
+# deck (Shoe)
+# Generator: yields decision requests (see play_round_steps())
+
+def play_hand(Player, playerHand, deck, observer, result):
+    # if player has Blackjack in first two cards of the hand, return
+    if playerHand.hand_status == STAND_BLACKJACK:
+        if observer is not None:
+            observer('blackjack', result, playerHand)
+        return playerHand, deck
+
+    playerHand, deck = yield from deal_cards_to_player(Player, playerHand, deck, observer, result)
+
+    if playerHand.player_action == 'EXIT':
+        playerHand.hand_status = EXIT
+
+    elif playerHand.player_action == 'S':
+        playerHand.hand_status = STAND
+        if observer is not None:
+            observer('stand', result, playerHand)
+
+    # If player busted
+    elif playerHand.hand_status == BUST:
+        if observer is not None:
+            observer('bust', result, playerHand)
+
+    return playerHand, deck
+
+
+## OPEN_HAND method ##
+##
+# Inputs:
+# Player (Bro)
+# playerHand (HandClass)
+# num_hands (int)
+# rules (Rules)
+# result (RoundResult)
+#
+# Outputs:
+# playerHand (HandClass)
+# Stands on a two-card 21 as blackjack, else asks for the first action of the hand
+# Generator: yields decision requests (see play_round_steps())
+
+def open_hand(Player, playerHand, num_hands, rules, result):
+    if playerHand.best_total == 21:
+        playerHand.player_action = 'S_BJ'
+        playerHand.actions.append('S_BJ')
+        playerHand.blackjack_hand = 1
+        playerHand.bets[BLACKJACK] = playerHand.bets[MAIN]
+        playerHand.hand_status = STAND_BLACKJACK
+    else:
+        playerHand.blackjack_hand = 0
+        playerHand.player_action = yield ('first', playerHand, get_init_options(Player, playerHand, num_hands, rules), result.dealer_hand.hand_cards[0])
+        playerHand.actions.append(playerHand.player_action)
+
+    return playerHand
+
+
+## SETTLE_SIDEBETS method ##
+##
+# Inputs:
+# Player (Bro)
+# Dealer (Bro)
+# payoffs (dict)
+# observer (function): event callback. None to ignore events.
+# result (RoundResult)
+#
+# Outputs:
+# payoffs (dict)
+# Settles both sidebets on Hand #1 and applies their winnings to Player's balance
+
+def settle_sidebets(Player, Dealer, payoffs, observer, result):
+    playerHand, dealerHand = Player.hands[0], Dealer.hands[0]
+
+    # check LEFT sidebet if player has bet on it
+    if playerHand.bets[SIDEBET_L] != 0:
+        payoffs = check_perfect_pair(playerHand.hand_cards, payoffs)
+
+        if payoffs['sidebet_L'] == 0:
+            playerHand.hand_winnings[SIDEBET_L] = -playerHand.bets[SIDEBET_L]
+        else:
+            playerHand.hand_winnings[SIDEBET_L] = payoffs['sidebet_L'] * playerHand.bets[SIDEBET_L]
+        Player.balance += playerHand.hand_winnings[SIDEBET_L]
+
+        if observer is not None:
+            observer('sidebet_L', result, playerHand)
+
+    # check RIGHT sidebet if player has bet on it
+    if playerHand.bets[SIDEBET_R] != 0:
+        payoffs = check_21_plus_3(playerHand.hand_cards, dealerHand.hand_cards, payoffs)
+
+        if payoffs['sidebet_R'] == 0:
+            playerHand.hand_winnings[SIDEBET_R] = -playerHand.bets[SIDEBET_R]
+        else:
+            playerHand.hand_winnings[SIDEBET_R] = payoffs['sidebet_R'] * playerHand.bets[SIDEBET_R]
+        Player.balance += playerHand.hand_winnings[SIDEBET_R]
+
+        if observer is not None:
+            observer('sidebet_R', result, playerHand)
+
+    return payoffs
+
+
+## OFFER_INSURANCE method ##
+##
+# Inputs:
+# Player (Bro)
+# Dealer (Bro)
+# payoffs (dict)
+# observer (function): event callback. None to ignore events.
+# result (RoundResult)
+#
+# Outputs:
+# <none>
+# If Dealer's face up card is Ace, offers insurance and checks for Dealer's blackjack
+# Generator: yields decision requests (see play_round_steps())
+
+def offer_insurance(Player, Dealer, payoffs, observer, result):
+    playerHand, dealerHand = Player.hands[0], Dealer.hands[0]
+    if dealerHand.hand_cards[0] < ACE_MIN:
+        return
+
+    insurance_input = 'N'
+    if Player.balance >= playerHand.bets[MAIN]*1.5:
+        insurance_input = yield ('insurance', playerHand, ('Y', 'N'), dealerHand.hand_cards[0])
+
+        # if Player takes insurance
+        if insurance_input == 'Y':
+            playerHand.bets[INSURANCE] = playerHand.bets[MAIN]/2
+            if observer is not None:
+                observer('insurance_bought', result, playerHand)
+    elif observer is not None:
+        observer('insurance_unavailable', result, playerHand)
+
+    # if Player took insurance and Dealer doesn't have blackjack, lose insurance and continue BAU
+    if insurance_input == 'Y' and CARD_VALUE[dealerHand.hand_cards[1]] != 10:
+        playerHand.hand_winnings[INSURANCE] = -playerHand.bets[INSURANCE]
+        Player.balance += playerHand.hand_winnings[INSURANCE]
+        if observer is not None:
+            observer('insurance_lost', result, playerHand)
+    # if Player took insurance and Dealer has blackjack, win insurance and stand
+    elif insurance_input == 'Y':
+        playerHand.hand_winnings[INSURANCE] = payoffs['insurance'] * playerHand.bets[INSURANCE]
+        Player.balance += playerHand.hand_winnings[INSURANCE]
+        playerHand.player_action = 'S_IN'
+        playerHand.actions.append('S_IN')
+        playerHand.hand_status = STAND_INSURANCE
+        if observer is not None:
+            observer('insurance_won', result, playerHand)
+    # if Player didn't take insurance and Dealer has blackjack, stand
+    elif CARD_VALUE[dealerHand.hand_cards[1]] == 10:
+        playerHand.player_action = 'S_IN'
+        playerHand.actions.append('S_IN')
+        playerHand.hand_status = STAND_INSURANCE
+        if observer is not None:
+            observer('dealer_blackjack', result, playerHand)
+    # else (player didn't take insurance and Dealer doesn't have blackjack) continue BAU
+
+
+## PLAY_DEALER method ##
+##
+# Inputs:
+# Dealer (Bro)
+# deck (Shoe)
+# observer (function): event callback. None to ignore events.
+# result (RoundResult)
+# hit_soft_17 (bool): Dealer hits soft 17 (Rules.hit_soft_17)
+#
+# Outputs:
+# deck (Shoe)
+# Dealer deals cards to himself until best allowable sum is 17 or higher (past soft 17 with hit_soft_17)
+
+def play_dealer(Dealer, deck, observer, result, hit_soft_17=False):
+    dealerHand = Dealer.hands[0]
+    while dealerHand.best_total < 17 or (hit_soft_17 and dealerHand.best_total == 17 and dealerHand.hard_total != 17):
+        new_card = deck.deal()
+        dealerHand.add_card(new_card)
+
+        if observer is not None:
+            observer('dealer_card', result, Dealer.hands[0])
+
+    return deck
+
+
+## SPLIT_HAND method ##
+##
+# Inputs:
+# Player (Bro)
+# playerHand (HandClass): Pair to split
+# deck (Shoe)
+# result (RoundResult)
+#
+# Outputs:
+# newHand (HandClass)
+# Moves playerHand's second card to a new hand after the other hands, with only a main bet equal
+# to playerHand's, and deals one card to each of the two
+
+def split_hand(Player, playerHand, deck, result):
+    newHand = HandClass('Hand #%d' % (len(result.hands) + 1))
+    newHand.bets[MAIN] = playerHand.bets[MAIN]
+    newHand.add_card(playerHand.remove_card(1))
+    Player.hands[len(result.hands)] = newHand
+    result.hands.append(newHand)
+    Player.num_hands = len(result.hands)
+
+    new_card = deck.deal()
+    playerHand.add_card(new_card)
+    new_card = deck.deal()
+    newHand.add_card(new_card)
+
+    return newHand
+
+
+## PLAY_ROUND_STEPS method ##
+##
+# Inputs:
+# Player (Bro): Player with hands[0] set and its bets placed
+# deck (Shoe or ContinuousShoe): Shoe to deal from. Reshuffling between rounds is up to the caller (deck.needs_shuffle()).
+# observer (function): event callback, observer(event, result, hand). None (default) to play silently.
+# payoffs (dict): Base payoffs. Defaults to rules.payoffs().
+# rules (Rules): Table rules. Defaults to DEFAULT_RULES (the console game's). Deck count and penetration are the shoe's business.
+# profiler (PhaseProfiler): Times the round's phases (see profile.py). None (default) to not profile.
+#
+# Outputs:
+# result (RoundResult): returned when the generator finishes (StopIteration.value)
+# Plays a full round without any I/O, as a generator. Every player decision is yielded as a request
+# (kind, playerHand, options, dealer_upcard) and the chosen action, which must be one of options, is
+# sent back. A caller can wait for the decision however it likes (see play_round(), server.py).
+#       kind: 'insurance' (options 'Y'/'N'), 'first' (first action of a hand) or 'next' (after a hit)
+# Player's balance is updated with every winning/loss.
+
+def play_round_steps(Player, deck, observer=None, payoffs=None, rules=DEFAULT_RULES, profiler=None):
+    if profiler is not None:
+        profiler.begin('deal')
+
+    if payoffs is None:
+        payoffs = rules.payoffs()     # Blackjack payoffs are additive on main bet, i.e. BJ pays 0.5x over normal win unless push. Rest are their own payoffs.
+    else:
+        payoffs = payoffs.copy()
+
+    start_balance = Player.balance
+
+    Dealer = Bro('dealer', None)
+    Dealer.hands[0] = HandClass('Dealer Hand #1')
+    Dealer.num_hands = 1
+    Player.hands[1:] = _NO_SPLIT_HANDS
+    Player.num_hands = 1
+
+    result = RoundResult([Player.hands[0]], Dealer.hands[0], payoffs)
+
+    # deal first two cards to Dealer and Player
+    for i in range(2):
+        new_card = deck.deal()
+        Player.hands[0].add_card(new_card)
+
+        new_card = deck.deal()
+        Dealer.hands[0].add_card(new_card)
+
+    if observer is not None:
+        observer('deal', result, Player.hands[0])
+
+    if profiler is not None:
+        profiler.switch('sidebets')
+    payoffs = settle_sidebets(Player, Dealer, payoffs, observer, result)
+    if Dealer.hands[0].hand_cards[0] >= ACE_MIN:
+        if profiler is not None:
+            profiler.switch('insurance')
+        yield from offer_insurance(Player, Dealer, payoffs, observer, result)
+
+    if profiler is not None:
+        profiler.switch('player')
+
+
+    #>>>>> if player has blackjack, don't ask for input, skip to results/comparison
+    #>>>>> Else if player splits, play every hand in turn
+
+    if Player.hands[0].hand_status != STAND_INSURANCE:
+        yield from open_hand(Player, Player.hands[0], 1, rules, result)
+
+    if Player.hands[0].player_action == 'SPLIT':
+        # Hand #1's second card goes to Hand #2, with only a main bet (equal to Hand #1's main bet before DD)
+        split_hand(Player, Player.hands[0], deck, result)
+
+        if observer is not None:
+            observer('split', result, Player.hands[0])
+
+        # If player has blackjack on any hand, then stand on that hand. Hands split again are added at the end.
+        index = 0
+        while index < len(result.hands):
+            playerHand = result.hands[index]
+            index += 1
+            if observer is not None:
+                observer('play_split_hand', result, playerHand)
+
+            yield from open_hand(Player, playerHand, len(result.hands), rules, result)
+
+            while playerHand.player_action == 'SPLIT':
+                split_hand(Player, playerHand, deck, result)
+                if observer is not None:
+                    observer('split', result, playerHand)
+                yield from open_hand(Player, playerHand, len(result.hands), rules, result)
+
+            # If player "exits" then stop
+            if playerHand.player_action == 'EXIT':
+                playerHand.hand_status = EXIT
+                break
+
+            yield from play_hand(Player, playerHand, deck, observer, result)
+
+            if playerHand.hand_status == EXIT:
+                break
+
+    # If player didn't SPLIT and didn't "exit"
+    elif Player.hands[0].player_action != 'EXIT':
+        yield from play_hand(Player, Player.hands[0], deck, observer, result)
+
+    # If player hit "exit"
+    else:
+        Player.hands[0].hand_status = EXIT
+
+
+    #############################################################
+    ### RESULT TIME. By now player has either Busted or Stood ###
+    #############################################################
+
+    if profiler is not None:
+        profiler.switch('settle')
+
+    if any(playerHand.hand_status == EXIT for playerHand in result.hands):
+        for playerHand in result.hands:
+            playerHand.hand_winnings[MAIN] = -playerHand.bets[MAIN]
+        result.exited = True
+
+    else:
+        if observer is not None:
+            observer('reveal', result, None)
+
+        # Blackjack hands are compared before Dealer takes cards
+        for playerHand in result.hands:
+            if playerHand.hand_status == STAND_BLACKJACK:
+                compare_player_dealer(playerHand, Dealer.hands[0], payoffs)
+                if observer is not None:
+                    observer('settle', result, playerHand)
+
+        # Dealer takes cards only if some hand is neither Blackjack nor Bust
+        if any(playerHand.hand_status not in (STAND_BLACKJACK, BUST) for playerHand in result.hands):
+            if profiler is not None:
+                profiler.switch('dealer')
+            deck = play_dealer(Dealer, deck, observer, result, rules.hit_soft_17)
+            if profiler is not None:
+                profiler.switch('settle')
+
+        for playerHand in result.hands:
+            if playerHand.hand_status != STAND_BLACKJACK:
+                compare_player_dealer(playerHand, Dealer.hands[0], payoffs)
+                if observer is not None:
+                    observer('settle', result, playerHand)
+
+
+    # Sidebets and insurance were settled as they happened. Settle main bets now.
+    for playerHand in result.hands:
+        Player.balance += playerHand.hand_winnings[MAIN] + playerHand.hand_winnings[BLACKJACK]
+
+    Player.max_balance = Player.balance if Player.balance > Player.max_balance else Player.max_balance
+
+    result.balance_delta = Player.balance - start_balance
+
+    # the round's cards go to the discard tray (or back into a continuous shuffler)
+    deck.discard()
+
+    if profiler is not None:
+        profiler.end()
+
+    return result
+
+
+## PLAY_ROUND method ##
+##
+# Inputs:
+# Player (Bro): Player with hands[0] set and its bets placed
+# deck (Shoe): Shoe to deal from
+# decide (function): decision callback, decide(kind, Player, playerHand, options, dealer_upcard) -> action
+#       kind: 'insurance' (options 'Y'/'N'), 'first' (first action of a hand) or 'next' (after a hit)
+# observer (function): event callback, observer(event, result, hand). None (default) to play silently.
+# payoffs (dict): Base payoffs. Defaults to rules.payoffs().
+# rules (Rules): Table rules. Defaults to DEFAULT_RULES.
+# profiler (PhaseProfiler): Times the round's phases, and the decide calls as 'decision'. None (default) to not profile.
+#
+# Outputs:
+# result (RoundResult)
+# Plays a full round without any I/O, asking decide for every decision of play_round_steps().
+
+def play_round(Player, deck, decide, observer=None, payoffs=None, rules=DEFAULT_RULES, profiler=None):
+    steps = play_round_steps(Player, deck, observer, payoffs, rules, profiler)
+    try:
+        kind, playerHand, options, dealer_upcard = next(steps)
+        while True:
+            if profiler is None:
+                action = decide(kind, Player, playerHand, options, dealer_upcard)
+            else:
+                profiler.begin('decision')
+                action = decide(kind, Player, playerHand, options, dealer_upcard)
+                profiler.end()
+            if action not in options:
+                raise ValueError("Invalid %s action %r, expected one of %s" % (kind, action, options))
+            kind, playerHand, options, dealer_upcard = steps.send(action)
+    except StopIteration as stop:
+        return stop.value
@@ -0,0 +1,413 @@
+### BLACKJACK EV SOLVER ###
+# Expected value of each legal action (hit, stand, double, split) for a player hand, given the
+# dealer's upcard and the composition of the unseen cards (see dealer.py).
+#
+# Settlement follows compare_player_dealer() and play_round() in engine.py, under the table Rules
+# passed in (DEFAULT_RULES, the console game's, unless given):
+#   - dealer stands on all 17s, or hits soft 17 (H17), and only checks for blackjack under an Ace. With
+#     a ten up the dealer may still hold blackjack, which beats everything but a player 21 (push).
+#   - player auto-stands on 21 and gets one card on a double. Which hands may double comes with the options.
+#   - split hands may double with DAS (on the totals of Rules.double_on) and split again up to
+#     Rules.max_hands. A split hand dealt 21 is a blackjack: it is compared with the dealer's first two
+#     cards before the dealer draws and wins Rules.blackjack_payout unless the dealer has 21.
+#
+# EVs are in units of the hand's initial main bet. Player draws are exact for every card removed.
+# By default the dealer's outcome distribution is computed once, for the composition at the decision,
+# and reused down the player's hit tree; that keeps a query in the tens of milliseconds. exact=True
+# recomputes the dealer for every card the player draws (seconds per query, for offline validation).
+# The hands of a split are evaluated independently on the same composition (cards drawn to one
+# hand are not removed from the other), the usual approximation for splits. Likewise each hand may
+# resplit as if the other hands had not, up to Rules.max_hands.
+#
+# Subproblems are memoized on (hand state, composition, rules), so repeated queries within a shoe reuse them.
+#
+# compile_ev_strategy() derives a basic strategy table (strategy.py) for any Rules from the solver.
+
+
+from functools import lru_cache
+from blackjack.cards import CARD_VALUE
+from blackjack.dealer import BLACKJACK, BUST, NUM_VALUES, dealer_outcome_probs, full_composition, remove_values
+from blackjack.engine import DEFAULT_RULES, DOUBLE_RULES, HandClass
+from blackjack.strategy import ACTIONS_DOUBLE, ACTIONS_NO_DOUBLE, DOUBLE, DOUBLE_STAND, HIT, SPLIT, STAND, STRATEGY_TABLE, table_index
+
+
+VALUE_CODES = (None, 48) + tuple(4*(value-2) for value in range(2, NUM_VALUES+1))     # a card code of each value 1 (Ace) .. 10
+
+
+## _DEALER_PROBS method ##
+##
+# Inputs:
+# upcard (int): Blackjack value of the dealer's upcard, 1 for Ace ... 10
+# composition (tuple)
+# hit_soft_17 (bool): Dealer hits soft 17
+#
+# Outputs:
+# probabilities (tuple): Dealer OUTCOMES, conditioned on no blackjack under an Ace (the round would be over)
+
+@lru_cache(maxsize=1 << 16)
+def _dealer_probs(upcard, composition, hit_soft_17):
+    return dealer_outcome_probs(upcard, composition, upcard == 1, hit_soft_17)
+
+
+## _STAND_EV method ##
+##
+# Inputs:
+# total (int): Player's best total, 21 or under
+# upcard (int)
+# composition (tuple)
+# hit_soft_17 (bool)
+#
+# Outputs:
+# ev (float): EV of standing
+
+@lru_cache(maxsize=1 << 18)
+def _stand_ev(total, upcard, composition, hit_soft_17):
+    probabilities = _dealer_probs(upcard, composition, hit_soft_17)
+
+    ev = probabilities[BUST]
+    for i in range(5):
+        dealer_total = 17 + i
+        if total > dealer_total:
+            ev += probabilities[i]
+        elif total < dealer_total:
+            ev -= probabilities[i]
+
+    # dealer blackjack is a 21
+    if total < 21:
+        ev -= probabilities[BLACKJACK]
+
+    return ev
+
+
+## _HIT_EV method ##
+##
+# Inputs:
+# hard_total (int): Player's total counting Aces as 1
+# has_ace (bool)
+# upcard (int)
+# composition (tuple): Cards the player draws from
+# dealer_composition (tuple): Cards the dealer draws from. None to use composition (exact).
+# hit_soft_17 (bool)
+#
+# Outputs:
+# ev (float): EV of taking one card and then playing the rest of the hand optimally (hit/stand)
+
+@lru_cache(maxsize=1 << 18)
+def _hit_ev(hard_total, has_ace, upcard, composition, dealer_composition, hit_soft_17):
+    num_cards = sum(composition)
+    ev = 0.0
+    counts = list(composition)
+
+    for i in range(NUM_VALUES):
+        count = counts[i]
+        if count == 0:
+            continue
+
+        new_hard_total = hard_total + i + 1
+        if new_hard_total > 21:
+            ev -= count / num_cards
+            continue
+
+        new_has_ace = has_ace or i == 0
+        best_total = new_hard_total + 10 if new_has_ace and new_hard_total <= 11 else new_hard_total
+
+        counts[i] = count - 1
+        sub_composition = tuple(counts)
+        counts[i] = count
+
+        value = _stand_ev(best_total, upcard, sub_composition if dealer_composition is None else dealer_composition, hit_soft_17)
+        if best_total < 21:
+            value = max(value, _hit_ev(new_hard_total, new_has_ace, upcard, sub_composition, dealer_composition, hit_soft_17))
+
+        ev += count / num_cards * value
+
+    return ev
+
+
+## _DOUBLE_EV method ##
+##
+# Inputs:
+# hard_total (int)
+# has_ace (bool)
+# upcard (int)
+# composition (tuple)
+# dealer_composition (tuple): None to use composition (exact)
+# hit_soft_17 (bool)
+#
+# Outputs:
+# ev (float): EV of doubling down, per initial bet
+
+def _double_ev(hard_total, has_ace, upcard, composition, dealer_composition, hit_soft_17):
+    num_cards = sum(composition)
+    ev = 0.0
+    counts = list(composition)
+
+    for i in range(NUM_VALUES):
+        count = counts[i]
+        if count == 0:
+            continue
+
+        new_hard_total = hard_total + i + 1
+        if new_hard_total > 21:
+            ev -= 2 * count / num_cards
+            continue
+
+        best_total = new_hard_total + 10 if (has_ace or i == 0) and new_hard_total <= 11 else new_hard_total
+
+        counts[i] = count - 1
+        ev += 2 * count / num_cards * _stand_ev(best_total, upcard, tuple(counts) if dealer_composition is None else dealer_composition, hit_soft_17)
+        counts[i] = count
+
+    return ev
+
+
+## _SPLIT_HAND_EV method ##
+##
+# Inputs:
+# pair_value (int): Value of each card of the pair, 1 for Ace ... 10
+# upcard (int)
+# composition (tuple): Unseen cards, the pair already removed
+# dealer_composition (tuple): None to use composition (exact)
+# num_hands (int): No. of hands in play once this one is split off
+# rules (Rules)
+#
+# Outputs:
+# ev (float): EV of one hand of a split, starting from one card of the pair, per initial bet
+
+@lru_cache(maxsize=1 << 12)
+def _split_hand_ev(pair_value, upcard, composition, dealer_composition, num_hands, rules):
+    num_cards = sum(composition)
+    hit_soft_17 = rules.hit_soft_17
+    dealer_blackjack = _dealer_probs(upcard, composition if dealer_composition is None else dealer_composition, hit_soft_17)[BLACKJACK]
+    low, high = DOUBLE_RULES[rules.double_on]
+    ev = 0.0
+    counts = list(composition)
+
+    for i in range(NUM_VALUES):
+        count = counts[i]
+        if count == 0:
+            continue
+
+        hard_total = pair_value + i + 1
+        has_ace = pair_value == 1 or i == 0
+        best_total = hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+
+        # 21 on a split hand is paid as blackjack against the dealer's first two cards
+        if best_total == 21:
+            value = rules.blackjack_payout * (1.0 - dealer_blackjack)
+        else:
+            counts[i] = count - 1
+            sub_composition = tuple(counts)
+            counts[i] = count
+            value = max(_stand_ev(best_total, upcard, sub_composition if dealer_composition is None else dealer_composition, hit_soft_17),
+                        _hit_ev(hard_total, has_ace, upcard, sub_composition, dealer_composition, hit_soft_17))
+            if rules.double_after_split and low <= best_total <= high:
+                value = max(value, _double_ev(hard_total, has_ace, upcard, sub_composition, dealer_composition, hit_soft_17))
+            if i + 1 == pair_value and num_hands < rules.max_hands:
+                value = max(value, 2 * _split_hand_ev(pair_value, upcard, sub_composition, dealer_composition, num_hands + 1, rules))
+
+        ev += count / num_cards * value
+
+    return ev
+
+
+## ACTION_EVS method ##
+##
+# Inputs:
+# hand_cards (list): Card codes of the player's hand
+# dealer_upcard (int): Card code of the dealer's upcard
+# composition (tuple): Unseen cards (undealt cards plus the dealer's hole card), counts per value
+# options (tuple): Actions allowed, as passed to the decision callback. 'EXIT' is ignored.
+# exact (bool): True to recompute the dealer's outcomes for every card the player draws
+# rules (Rules): Table rules
+# num_hands (int): No. of hands in play, 1 + No. of splits so far
+#
+# Outputs:
+# evs (dict): action ('H', 'S', 'D', 'SPLIT') -> EV per initial main bet
+
+def action_evs(hand_cards, dealer_upcard, composition, options=('H', 'S', 'D', 'SPLIT'), exact=False, rules=DEFAULT_RULES, num_hands=1):
+    composition = tuple(composition)
+    if len(composition) != NUM_VALUES:
+        raise ValueError("composition must have %d counts, got %d" % (NUM_VALUES, len(composition)))
+
+    upcard = CARD_VALUE[dealer_upcard]
+    hard_total = 0
+    for card in hand_cards:
+        hard_total += CARD_VALUE[card]
+    has_ace = any(CARD_VALUE[card] == 1 for card in hand_cards)
+    best_total = hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+
+    if best_total > 21:
+        raise ValueError("Hand is bust")
+
+    dealer_composition = None if exact else composition
+    hit_soft_17 = rules.hit_soft_17
+
+    evs = {}
+    if 'S' in options:
+        evs['S'] = _stand_ev(best_total, upcard, composition, hit_soft_17)
+    if 'H' in options:
+        evs['H'] = _hit_ev(hard_total, has_ace, upcard, composition, dealer_composition, hit_soft_17)
+    if 'D' in options and len(hand_cards) == 2:
+        evs['D'] = _double_ev(hard_total, has_ace, upcard, composition, dealer_composition, hit_soft_17)
+    if 'SPLIT' in options and len(hand_cards) == 2 and CARD_VALUE[hand_cards[0]] == CARD_VALUE[hand_cards[1]]:
+        evs['SPLIT'] = 2 * _split_hand_ev(CARD_VALUE[hand_cards[0]], upcard, composition, dealer_composition, num_hands + 1, rules)
+
+    return evs
+
+
+## BEST_ACTION method ##
+##
+# Inputs:
+# hand_cards (list)
+# dealer_upcard (int)
+# composition (tuple)
+# options (tuple)
+# exact (bool)
+# rules (Rules)
+# num_hands (int)
+#
+# Outputs:
+# action (string): Action with the highest EV
+# ev (float): Its EV
+
+def best_action(hand_cards, dealer_upcard, composition, options=('H', 'S', 'D', 'SPLIT'), exact=False, rules=DEFAULT_RULES, num_hands=1):
+    evs = action_evs(hand_cards, dealer_upcard, composition, options, exact, rules, num_hands)
+    action = max(evs, key=evs.get)
+    return action, evs[action]
+
+
+## CELL_EVS method ##
+##
+# Inputs:
+# rules (Rules): Table rules, including the shoe's No. of decks
+#
+# Outputs:
+# evs (dict): (total, soft, pair, upcard value) -> {action: EV}, for every entry of a strategy table (see
+#       strategy.table_index()) that a two-card hand can reach. Each EV is the average over the two-card
+#       hands of the entry, weighted by how likely each is dealt from a full shoe with the upcard out.
+#       Pairs count towards their total's entry (played without splitting) and their own pair entry.
+
+def cell_evs(rules=DEFAULT_RULES):
+    full = full_composition(rules.num_decks)
+    sums = {}
+    weights = {}
+
+    for upcard in range(1, NUM_VALUES+1):
+        after_upcard = remove_values(full, (upcard,))
+        for first in range(1, NUM_VALUES+1):
+            for second in range(first, NUM_VALUES+1):
+                if (first, second) == (1, 10):
+                    continue    # blackjack, no decision
+                hand = HandClass('Hand #1')
+                hand.add_card(VALUE_CODES[first])
+                hand.add_card(VALUE_CODES[second])
+                soft = 1 if hand.best_total != hand.hard_total else 0
+
+                if first == second:
+                    weight = after_upcard[first-1] * (after_upcard[first-1] - 1)
+                    cells = ((hand.best_total, soft, 0, upcard), (hand.best_total, soft, first, upcard))
+                else:
+                    weight = 2 * after_upcard[first-1] * after_upcard[second-1]
+                    cells = ((hand.best_total, soft, 0, upcard),)
+
+                evs = action_evs(hand.hand_cards, VALUE_CODES[upcard], remove_values(full, (first, second, upcard)),
+                                 ('H', 'S', 'D', 'SPLIT') if first == second else ('H', 'S', 'D'), rules=rules)
+                for cell in cells:
+                    cell_sums = sums.setdefault(cell, {})
+                    weights[cell] = weights.get(cell, 0) + weight
+                    for action, ev in evs.items():
+                        if action != 'SPLIT' or cell[2]:
+                            cell_sums[action] = cell_sums.get(action, 0.0) + weight * ev
+
+    return {cell: {action: total / weights[cell] for action, total in cell_sums.items()} for cell, cell_sums in sums.items()}
+
+
+## CHECK_STRATEGY_TABLE method ##
+##
+# Inputs:
+# rules (Rules): Table rules the table is meant for
+# table (bytes): Strategy table from strategy.compile_strategy()
+#
+# Outputs:
+# disagreements (list): ((total, soft, pair), upcard value, table action, best action, EV lost) for every
+#       entry of cell_evs() where the table doesn't pick the highest-EV action, with doubling allowed or,
+#       for a double entry, with doubling not allowed (table action and best action are then 'H' or 'S')
+#
+# A table is total-dependent, so it is checked per entry rather than per two-card hand. Some single hands
+# disagree with their entry: with a ten up (no peek), 4,7 and 5,6 gain a little by doubling where the
+# other 11s, and 11s on average, lose by it. Solve those with action_evs() for the hand.
+
+def check_strategy_table(rules=DEFAULT_RULES, table=STRATEGY_TABLE):
+    disagreements = []
+
+    for (total, soft, pair, upcard), evs in sorted(cell_evs(rules).items()):
+        entry = table[table_index(total, soft, pair, upcard)]
+        best = max(evs, key=evs.get)
+        chosen = ACTIONS_DOUBLE[entry]
+        if evs[chosen] < evs[best] - 1e-9:
+            disagreements.append(((total, soft, pair), upcard, chosen, best, evs[best] - evs[chosen]))
+            continue
+
+        # the entry's fallback when the hand may not double
+        best = 'H' if evs['H'] > evs['S'] else 'S'
+        chosen = ACTIONS_NO_DOUBLE[entry]
+        if chosen != 'SPLIT' and evs[chosen] < evs[best] - 1e-9:
+            disagreements.append(((total, soft, pair), upcard, chosen, best, evs[best] - evs[chosen]))
+
+    return disagreements
+
+
+## COMPILE_EV_STRATEGY method ##
+##
+# Inputs:
+# rules (Rules): Table rules, including the shoe's No. of decks
+#
+# Outputs:
+# table (bytes): Strategy table (see strategy.py) with the highest-EV action of every entry of cell_evs().
+#       Double entries fall back to the better of hit and stand. Totals no two-card hand reaches stand.
+#
+# Takes a few seconds; strategy.rules_strategy_table() caches the tables.
+
+def compile_ev_strategy(rules=DEFAULT_RULES):
+    table = bytearray([STAND]) * len(STRATEGY_TABLE)
+
+    for (total, soft, pair, upcard), evs in cell_evs(rules).items():
+        entry = HIT if evs['H'] > evs['S'] else STAND
+        if evs['D'] > evs[ACTIONS_DOUBLE[entry]]:
+            entry = DOUBLE if entry == HIT else DOUBLE_STAND
+        if pair and evs['SPLIT'] > evs[ACTIONS_DOUBLE[entry]]:
+            entry = SPLIT
+        table[table_index(total, soft, pair, upcard)] = entry
+
+    return bytes(table)
+
+
+## UNSEEN_COMPOSITION method ##
+##
+# Inputs:
+# deck (Shoe)
+# dealer_hand (HandClass): Dealer's hand. Cards after the upcard are unseen.
+#
+# Outputs:
+# composition (tuple): Counts per value of the undealt cards and the dealer's hidden cards
+
+def unseen_composition(deck, dealer_hand):
+    counts = list(deck.composition())
+    for card in dealer_hand.hand_cards[1:]:
+        counts[CARD_VALUE[card]-1] += 1
+    return tuple(counts)
+
+
+## CLEAR_CACHE method ##
+##
+# Inputs:
+# <none>
+#
+# Outputs:
+# <none>
+# Drops all memoized subproblems, e.g. between shoes
+
+def clear_cache():
+    for cached in (_dealer_probs, _stand_ev, _hit_ev, _split_hand_ev):
+        cached.cache_clear()
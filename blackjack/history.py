@@ -0,0 +1,288 @@
+### BLACKJACK HAND HISTORY ###
+# Append-only binary log of played rounds. Every round is one fixed-width little-endian record, so
+# a log can be appended to, split and indexed without parsing, and read as an array (see
+# analytics.py).
+#
+# File layout: an 8-byte header (MAGIC, version, record size) followed by records.
+#
+# Record layout (RECORD_FORMAT, RECORD_SIZE bytes):
+#   round_id (uint64), balance after the round (float64)
+#   Hand #1 bets and winnings, 5 + 5 float64 indexed MAIN ... SIDEBET_R
+#   Hand #2 main and blackjack bets, main and blackjack winnings, 4 float64 (0 without a split)
+#   the same 4 float64 for each of Hand #3 ... Hand #MAX_HANDS (0 without a resplit)
+#   for each of Hand #1 ... Hand #MAX_HANDS: its cards, 21 card codes padded with PAD, and every
+#       action taken on it, MAX_ACTIONS action codes (see ACTIONS) padded with 0
+#   cards of the dealer, 17 card codes padded with PAD. 21 and 17 are the most cards a hand can
+#       hold: a player hand hits only below 21, the dealer only below 17.
+#   for each player hand: No. of cards, No. of actions, status and outcome code (uint8, see
+#       engine.STATUS_NAMES, OUTCOMES), all 0 for the hand slots not played
+#   No. of dealer cards, flags (uint8, FLAG_*), left and right sidebet payoffs (uint8, 0 if lost or not bet)
+# A hand that was split holds its cards after the split. Its actions start with the SPLITs.
+#
+# Records are packed into a preallocated buffer and written out a buffer at a time. Files are
+# rotated by size: path, path.1, path.2 ... A writer opened on an existing log appends to its last
+# file, after checking that the file's header matches this version's layout.
+
+
+import os
+import struct
+from collections import namedtuple
+from blackjack.cards import NUM_CARDS
+from blackjack.engine import MAIN, BLACKJACK, INSURANCE, BET_NAMES, MAX_HANDS
+
+
+MAGIC = b'BJH1'
+VERSION = 3
+HEADER_FORMAT = '<4sHH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+PAD = NUM_CARDS     # unused card slot, as in batch.py
+MAX_PLAYER_CARDS = 21
+MAX_DEALER_CARDS = 17
+MAX_ACTIONS = MAX_PLAYER_CARDS - 1 + MAX_HANDS - 1     # hits to 21 cards and the last action, after every split
+
+ACTIONS = ('', 'H', 'S', 'D', 'SPLIT', 'EXIT', 'S_BJ', 'S_IN')
+OUTCOMES = ('', 'bust', 'dealer_bust', 'lose', 'push', 'win')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+
+FLAG_INSURANCE = 1      # insurance bought
+FLAG_SPLIT = 2          # player split
+FLAG_EXITED = 4         # player exited and forfeited the round
+FLAG_RESPLIT = 8        # player split more than once
+
+# (name, struct format) of every record field, in order
+RECORD_FIELDS = (
+    [('round_id', 'Q'), ('balance', 'd')]
+    + [('hand1_bet_' + name, 'd') for name in BET_NAMES]
+    + [('hand1_win_' + name, 'd') for name in BET_NAMES]
+    + [('hand%d_%s' % (number, name), 'd') for number in range(2, MAX_HANDS + 1)
+       for name in ('bet_main', 'bet_blackjack', 'win_main', 'win_blackjack')]
+    + [('hand%d_%s' % (number, name), fmt) for number in range(1, MAX_HANDS + 1)
+       for name, fmt in (('cards', '%ds' % MAX_PLAYER_CARDS), ('actions', '%ds' % MAX_ACTIONS))]
+    + [('dealer_cards', '%ds' % MAX_DEALER_CARDS)]
+    + [('hand%d_%s' % (number, name), 'B') for number in range(1, MAX_HANDS + 1)
+       for name in ('num_cards', 'num_actions', 'status', 'outcome')]
+    + [('dealer_num_cards', 'B'), ('flags', 'B'), ('sidebet_L', 'B'), ('sidebet_R', 'B')]
+)
+RECORD_FORMAT = '<' + ''.join(fmt for name, fmt in RECORD_FIELDS)
+RECORD_FORMAT += '%dx' % (-struct.calcsize(RECORD_FORMAT) % 8)     # padded to a multiple of 8 bytes
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+HandRecord = namedtuple('HandRecord', [name for name, fmt in RECORD_FIELDS])
+
+_record = struct.Struct(RECORD_FORMAT)
+_PADDING = bytes([PAD]) * MAX_PLAYER_CARDS
+_NO_ACTIONS = bytes(MAX_ACTIONS)
+_NO_SPLIT_VALUES = (0.0,) * (4 * (MAX_HANDS - 1))
+_NO_HAND = (b'', b'', (0, 0, 0, 0))
+
+
+## HISTORY_FILES method ##
+##
+# Inputs:
+# path (string): Path of the first log file
+#
+# Outputs:
+# paths (list): path and its rotated files that exist, in write order
+
+def history_files(path):
+    paths = []
+    index = 0
+    while os.path.exists(path if index == 0 else '%s.%d' % (path, index)):
+        paths.append(path if index == 0 else '%s.%d' % (path, index))
+        index += 1
+    return paths
+
+
+## HISTORYWRITER class ##
+##
+# Attributes:
+# path (string): Path of the first log file. Rotated files are path.1, path.2 ...
+# max_bytes (int): Size at which to start the next file. 0 never rotates.
+# buffer (bytearray): Preallocated buffer of buffer_records records
+# num_buffered (int): No. of records in the buffer
+# file_index (int): Index of the file being written
+# file_size (int): Bytes written to it so far
+# records (int): No. of records written, including buffered ones
+
+class HistoryWriter:
+    def __init__(self, path, buffer_records=4096, max_bytes=0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.buffer = bytearray(buffer_records * RECORD_SIZE)
+        self.num_buffered = 0
+        self.file_index = 0
+        self.file_size = 0
+        self.records = 0
+        self._file = None
+        # appending to an existing log continues in its last file
+        self._open(max(len(history_files(path)) - 1, 0))
+
+    ## Open file number index for appending, writing the header if it's new.
+    ## Raises ValueError if the file is not a hand history of this version, so records never mix layouts.
+    def _open(self, index):
+        path = self.path if index == 0 else '%s.%d' % (self.path, index)
+        self._file = open(path, 'ab+')
+        self.file_index = index
+        self.file_size = self._file.tell()
+        if self.file_size == 0:
+            self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_SIZE))
+            self.file_size = HEADER_SIZE
+            return
+
+        try:
+            self._file.seek(0)
+            read_header(self._file.read(HEADER_SIZE), path)
+            if (self.file_size - HEADER_SIZE) % RECORD_SIZE:
+                raise ValueError("%s: truncated record at the end of the file" % path)
+        except ValueError:
+            self._file.close()
+            self._file = None
+            raise
+
+    ## Pack one round into the buffer
+    # round_id (int), result (RoundResult), balance (float): Player's balance after the round
+    def write_round(self, round_id, result, balance):
+        if self.num_buffered * RECORD_SIZE == len(self.buffer):
+            self.flush()
+
+        hand1 = result.hands[0]
+        hand2 = result.hands[1] if len(result.hands) > 1 else None
+        dealer = result.dealer_hand
+
+        flags = 0
+        if hand1.bets[INSURANCE] != 0:
+            flags |= FLAG_INSURANCE
+        if hand2 is not None:
+            flags |= FLAG_SPLIT
+        if result.exited:
+            flags |= FLAG_EXITED
+        if len(result.hands) > 2:
+            flags |= FLAG_RESPLIT
+
+        if hand2 is None:
+            split_values = _NO_SPLIT_VALUES
+        else:
+            # bets and winnings of Hand #2 on, zero for the hand slots not played
+            split_values = [value for hand in result.hands[1:]
+                            for value in (hand.bets[MAIN], hand.bets[BLACKJACK], hand.hand_winnings[MAIN], hand.hand_winnings[BLACKJACK])]
+            split_values += _NO_SPLIT_VALUES[len(split_values):]
+
+        # cards, actions and codes of every hand slot
+        hands = [(bytes(hand.hand_cards), bytes(ACTION_CODES[action] for action in hand.actions),
+                  (len(hand.hand_cards), len(hand.actions), hand.hand_status, OUTCOME_CODES[hand.outcome]))
+                 for hand in result.hands]
+        hands += [_NO_HAND] * (MAX_HANDS - len(hands))
+        dealer_cards = bytes(dealer.hand_cards)
+
+        _record.pack_into(self.buffer, self.num_buffered * RECORD_SIZE,
+                          round_id, balance, *hand1.bets, *hand1.hand_winnings, *split_values,
+                          *[field for cards, actions, codes in hands
+                            for field in (cards + _PADDING[len(cards):], actions + _NO_ACTIONS[len(actions):])],
+                          dealer_cards + _PADDING[len(dealer_cards):MAX_DEALER_CARDS],
+                          *[code for cards, actions, codes in hands for code in codes],
+                          len(dealer_cards), flags, result.payoffs['sidebet_L'], result.payoffs['sidebet_R'])
+
+        self.num_buffered += 1
+        self.records += 1
+
+    ## Write buffered records out, rotating first if the file is full
+    def flush(self):
+        if self.num_buffered == 0:
+            return
+        if self.max_bytes and self.file_size > HEADER_SIZE and self.file_size + self.num_buffered*RECORD_SIZE > self.max_bytes:
+            self._file.close()
+            self._open(self.file_index + 1)
+
+        self._file.write(memoryview(self.buffer)[:self.num_buffered * RECORD_SIZE])
+        self.file_size += self.num_buffered * RECORD_SIZE
+        self.num_buffered = 0
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+## READ_HEADER method ##
+##
+# Inputs:
+# header (bytes): First HEADER_SIZE bytes of a log file
+# path (string): For error messages
+#
+# Outputs:
+# <none>
+# Raises ValueError if the header is not a hand history of this version
+
+def read_header(header, path):
+    if len(header) < HEADER_SIZE:
+        raise ValueError("%s: too short for a hand history" % path)
+    magic, version, record_size = struct.unpack(HEADER_FORMAT, header[:HEADER_SIZE])
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+        raise ValueError("%s: not a version %d hand history (magic %r, version %d, record size %d)" % (path, VERSION, magic, version, record_size))
+
+
+## READ_HISTORY method ##
+##
+# Inputs:
+# path (string): Path of the first log file. Rotated files are read after it.
+# chunk_records (int): No. of records read per file read
+#
+# Outputs:
+# records (generator): HandRecord of every round, in write order. Reads a chunk at a time.
+
+def read_history(path, chunk_records=4096):
+    for file_path in history_files(path):
+        with open(file_path, 'rb') as f:
+            read_header(f.read(HEADER_SIZE), file_path)
+            while True:
+                chunk = f.read(chunk_records * RECORD_SIZE)
+                if not chunk:
+                    break
+                if len(chunk) % RECORD_SIZE:
+                    raise ValueError("%s: truncated record at the end of the file" % file_path)
+                for values in _record.iter_unpack(chunk):
+                    yield HandRecord._make(values)
+
+
+## RECORD_CARDS method ##
+##
+# Inputs:
+# record (HandRecord)
+#
+# Outputs:
+# hands (list): Card codes of every player hand played, without padding
+# dealer_cards (list): Card codes of the dealer's hand
+
+def record_cards(record):
+    hands = []
+    for number in range(1, MAX_HANDS + 1):
+        num_cards = getattr(record, 'hand%d_num_cards' % number)
+        if num_cards:
+            hands.append(list(getattr(record, 'hand%d_cards' % number)[:num_cards]))
+    return hands, list(record.dealer_cards[:record.dealer_num_cards])
+
+
+## RECORD_ACTIONS method ##
+##
+# Inputs:
+# record (HandRecord)
+#
+# Outputs:
+# actions (list): Actions (see ACTIONS) taken on every player hand played, in order
+
+def record_actions(record):
+    hands = []
+    for number in range(1, MAX_HANDS + 1):
+        if getattr(record, 'hand%d_num_cards' % number):
+            codes = getattr(record, 'hand%d_actions' % number)[:getattr(record, 'hand%d_num_actions' % number)]
+            hands.append([ACTIONS[code] for code in codes])
+    return hands
@@ -0,0 +1,133 @@
+### BLACKJACK PROFILING ###
+# Per-phase timing counters of the round lifecycle. A PhaseProfiler is a registry of
+# (count, total nanoseconds) counters keyed by phase path, e.g. ('player', 'decision').
+# Callers mark phase boundaries with begin() / switch() / end(); phases begun inside another
+# phase nest under it.
+#
+# Phases recorded:
+#   betting     asking for the bets (CLI, server)
+#   deal        the initial deal                                    (engine, play_round_steps)
+#   sidebets    Perfect Pairs and 21+3 checks                        (engine)
+#   insurance   the insurance offer, only when the upcard is an Ace  (engine)
+#   player      player actions: hits, doubles, splits                (engine)
+#   dealer      the dealer's draw                                    (engine)
+#   settle      comparing hands and paying bets, entered again after the dealer's draw  (engine)
+#   display     showing the round's winnings (CLI)
+#   decision    nested in insurance / player: waiting on the decision callback, or on the client in a served session
+#
+# Profiling is off unless a PhaseProfiler is passed in (profiler=None costs one comparison per phase).
+# Results are written as JSON or as folded stacks ("deal 12345" lines of self time in ns) for
+# flame graph tools such as flamegraph.pl or speedscope.
+
+
+import json
+import time
+
+
+## PHASEPROFILER class ##
+##
+# Attributes:
+# counters (dict): phase path (tuple) -> [No. of times the phase was entered, total nanoseconds in it]
+# clock (function): Nanosecond clock. Defaults to time.perf_counter_ns.
+# _stack (list): (path, start time) of every phase begun and not ended yet, innermost last
+
+class PhaseProfiler:
+    __slots__ = ('counters', 'clock', '_stack')
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.counters = {}
+        self.clock = clock
+        self._stack = []
+
+    ## Start phase inside the current one
+    def begin(self, phase):
+        stack = self._stack
+        path = stack[-1][0] + (phase,) if stack else (phase,)
+        stack.append((path, self.clock()))
+
+    ## End the current phase and count its time
+    def end(self):
+        path, start = self._stack.pop()
+        elapsed = self.clock() - start
+        counter = self.counters.get(path)
+        if counter is None:
+            self.counters[path] = [1, elapsed]
+        else:
+            counter[0] += 1
+            counter[1] += elapsed
+
+    ## Phase boundary: end the current phase and begin the next one at the same level
+    def switch(self, phase):
+        self.end()
+        self.begin(phase)
+
+    ## Forget phases left open, e.g. by a round abandoned midway
+    def reset(self):
+        self._stack.clear()
+
+    ## Add another profiler's counters into this one
+    def merge(self, other):
+        for path, (count, total) in other.counters.items():
+            counter = self.counters.get(path)
+            if counter is None:
+                self.counters[path] = [count, total]
+            else:
+                counter[0] += count
+                counter[1] += total
+        return self
+
+    ## (path, count, total ns, self ns) of every phase, in the order phases were first seen, nested phases
+    ## after their parent. Self time excludes nested phases.
+    def summary(self):
+        self_times = {path: total for path, (count, total) in self.counters.items()}
+        for path, (count, total) in self.counters.items():
+            if len(path) > 1 and path[:-1] in self_times:
+                self_times[path[:-1]] -= total
+
+        first_seen = {path: index for index, path in enumerate(self.counters)}
+        order = sorted(self.counters, key=lambda path: [first_seen.get(path[:depth], 0) for depth in range(1, len(path) + 1)])
+        return [(path, self.counters[path][0], self.counters[path][1], self_times[path]) for path in order]
+
+    def to_json(self):
+        return {'phases': [{'phase': ';'.join(path), 'count': count, 'total_ns': total, 'self_ns': self_time}
+                           for path, count, total, self_time in self.summary()]}
+
+    ## Folded stacks: one "phase;nested_phase <self ns>" line per phase
+    def folded(self):
+        return ''.join('%s %d\n' % (';'.join(path), max(self_time, 0)) for path, count, total, self_time in self.summary())
+
+
+## WRITE_PROFILE method ##
+##
+# Inputs:
+# profiler (PhaseProfiler)
+# path (string): Output file. JSON if it ends with .json, else folded stacks.
+#
+# Outputs:
+# <none>
+
+def write_profile(profiler, path):
+    with open(path, 'w') as f:
+        if path.endswith('.json'):
+            json.dump(profiler.to_json(), f, indent=1)
+        else:
+            f.write(profiler.folded())
+
+
+## PRINT_PROFILE method ##
+##
+# Inputs:
+# profiler (PhaseProfiler)
+#
+# Outputs:
+# prints count, total, mean and share of the time of every phase
+
+def print_profile(profiler):
+    rows = profiler.summary()
+    grand_total = sum(total for path, count, total, self_time in rows if len(path) == 1)
+    if grand_total == 0:
+        return
+
+    print("\n%-22s %10s %12s %10s %7s" % ("Phase", "Count", "Total ms", "Mean us", "Share"))
+    for path, count, total, self_time in rows:
+        print("%-22s %10d %12.1f %10.2f %6.1f%%" % ('  '*(len(path) - 1) + path[-1], count, total/1e6, total/1e3/count, 100*total/grand_total))
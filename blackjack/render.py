@@ -0,0 +1,117 @@
+### BLACKJACK RENDER ###
+# Output backends for the console game. The CLI never prints, sleeps, clears the screen or reads
+# input directly; it calls a renderer:
+#   line(text)      : show one line (like print)
+#   pause(seconds)  : dramatic pause between steps of a round
+#   clear()         : clear the screen between rounds
+#   ask(prompt)     : show a prompt and read the player's answer
+#   flush()         : write out anything held back
+#
+#   NullRenderer     : discards all output and pauses, for automated runs. Prompts are not shown.
+#   BufferedRenderer : collects output in memory and writes it in one go on flush() / ask()
+#   TerminalRenderer : the interactive game. Pauses are scaled by pace (0 = no pauses) and the
+#                      screen is cleared with an ANSI escape, only when writing to a terminal.
+
+
+import sys
+import time
+
+
+CLEAR_SCREEN = '\033[2J\033[H'
+
+
+## NULLRENDERER class ##
+##
+# Attributes:
+# <none>
+
+class NullRenderer:
+    def line(self, text=''):
+        pass
+
+    def pause(self, seconds):
+        pass
+
+    def clear(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def ask(self, prompt):
+        return input()
+
+
+## BUFFEREDRENDERER class ##
+##
+# Attributes:
+# stream: File object written to on flush(). None for sys.stdout at the time of writing.
+# lines (list): Output not written yet
+
+class BufferedRenderer:
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.lines = []
+
+    def line(self, text=''):
+        self.lines.append(text)
+
+    def pause(self, seconds):
+        pass
+
+    def clear(self):
+        pass
+
+    ## Write out held lines, in one write
+    def flush(self):
+        if self.lines:
+            self.lines.append('')
+            (self.stream or sys.stdout).write('\n'.join(self.lines))
+            self.lines.clear()
+
+    ## Held output, without writing it out
+    def getvalue(self):
+        return ''.join(text + '\n' for text in self.lines)
+
+    def ask(self, prompt):
+        self.flush()
+        if self.stream is None:
+            return input(prompt)
+        self.stream.write(prompt)
+        self.stream.flush()
+        return input()
+
+
+## TERMINALRENDERER class ##
+##
+# Attributes:
+# pace (float): Multiplier of every pause. 1 = the game's normal pacing, 0 = no pauses.
+# stream: File object written to. None for sys.stdout at the time of writing.
+
+class TerminalRenderer:
+    def __init__(self, pace=1.0, stream=None):
+        self.pace = pace
+        self.stream = stream
+
+    def line(self, text=''):
+        (self.stream or sys.stdout).write(text + '\n')
+
+    def pause(self, seconds):
+        if self.pace > 0:
+            (self.stream or sys.stdout).flush()
+            time.sleep(seconds * self.pace)
+
+    def clear(self):
+        stream = self.stream or sys.stdout
+        if stream.isatty():
+            stream.write(CLEAR_SCREEN)
+
+    def flush(self):
+        (self.stream or sys.stdout).flush()
+
+    def ask(self, prompt):
+        if self.stream is None:
+            return input(prompt)
+        self.stream.write(prompt)
+        self.stream.flush()
+        return input()
@@ -0,0 +1,183 @@
+### BLACKJACK RNG ###
+# Shuffle backends for Shoe. A backend fills a shoe buffer (in template order) with a fresh
+# shuffle and returns the seed of that shoe; replay() rebuilds the same shoe from the seed, so any
+# shoe can be regenerated exactly, e.g. to audit a disputed hand.
+#
+#   'mt'    : stdlib Mersenne Twister. Each shoe is shuffled by its own random.Random seeded with a
+#             64-bit seed drawn from the backend's seed source. Seed: int.
+#   'pcg64' : NumPy PCG64. Shoes are shuffled in bulk, by sorting one uniform random key per card, a
+#             batch of shoes per call. Every shoe uses exactly one 64-bit draw per card, so a shoe is
+#             found again by advancing the generator to its offset in the stream.
+#             Seed: (master seed, offset in draws). Requires numpy, imported on first use.
+#
+# state() / set_state() save and restore a backend's position in its stream as bytes, so the
+# shoes after a checkpoint come out the same (see checkpoint.py).
+
+
+import ast
+import random
+import struct
+
+
+RANDOM_STATE_FORMAT = '<625Id'      # Mersenne Twister state words and position, gauss_next (NaN for None)
+
+
+## PACK_RANDOM_STATE method ##
+##
+# Inputs:
+# source: random.Random or the random module
+#
+# Outputs:
+# state (bytes): source's state
+
+def pack_random_state(source):
+    version, internal_state, gauss_next = source.getstate()
+    return struct.pack(RANDOM_STATE_FORMAT, *internal_state, float('nan') if gauss_next is None else gauss_next)
+
+
+## UNPACK_RANDOM_STATE method ##
+##
+# Inputs:
+# source: random.Random or the random module, to restore
+# state (bytes): From pack_random_state()
+#
+# Outputs:
+# <none>
+
+def unpack_random_state(source, state):
+    values = struct.unpack(RANDOM_STATE_FORMAT, state)
+    gauss_next = values[-1]
+    source.setstate((random.Random.VERSION, values[:-1], None if gauss_next != gauss_next else gauss_next))
+
+
+## MTSHUFFLER class ##
+##
+# Attributes:
+# name (string): 'mt'
+# seed_source: random.Random (or the random module) the per-shoe seeds are drawn from
+# from_module (bool): The seeds came from the random module. Kept in state(); a restored shuffler
+#       draws from a private random.Random, so restoring never touches the process-wide random state.
+
+class MTShuffler:
+    name = 'mt'
+
+    ## seed: master seed (int, str, ...) or None to draw shoe seeds from the random module
+    def __init__(self, seed=None):
+        self.seed_source = random if seed is None else random.Random(seed)
+        self.from_module = seed is None
+
+    ## Shuffle cards in place and return the shoe's seed
+    def next_shoe(self, cards):
+        seed = self.seed_source.getrandbits(64)
+        random.Random(seed).shuffle(cards)
+        return seed
+
+    ## Shuffle cards (in template order) in place as the shoe with this seed was
+    def replay(self, cards, seed):
+        random.Random(seed).shuffle(cards)
+
+    ## Seed source state. The first byte is 1 when the seeds came from the random module.
+    def state(self):
+        return bytes((self.from_module,)) + pack_random_state(self.seed_source)
+
+    def set_state(self, state):
+        self.from_module = bool(state[0])
+        if self.seed_source is random:
+            self.seed_source = random.Random()
+        unpack_random_state(self.seed_source, state[1:])
+
+
+## PCG64SHUFFLER class ##
+##
+# Attributes:
+# name (string): 'pcg64'
+# seed (int or tuple): Master seed. Drawn from OS entropy when not given, and kept for replay.
+# batch (int): No. of shoes shuffled per bulk call
+# offset (int): No. of 64-bit draws taken from the stream so far
+
+class PCG64Shuffler:
+    name = 'pcg64'
+
+    def __init__(self, seed=None, batch=256):
+        import numpy as np
+        self._np = np
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.seed = seed
+        self.batch = batch
+        self.offset = 0
+        self._generator = np.random.Generator(np.random.PCG64(seed))
+        self._shoes = None      # bulk-shuffled shoes not handed out yet
+        self._next = 0
+
+    ## Shuffle n copies of template at once
+    # Outputs: shoes (array): n x len(template) uint8 card codes, seeds (list): seed of every shoe
+    def shoes(self, template, n):
+        np = self._np
+        size = len(template)
+        keys = self._generator.random((n, size))
+        shoes = np.frombuffer(bytes(template), dtype=np.uint8)[np.argsort(keys, axis=1, kind='stable')]
+
+        seeds = [(self.seed, self.offset + i*size) for i in range(n)]
+        self.offset += n*size
+        return shoes, seeds
+
+    ## Shuffle cards in place from the next bulk-shuffled shoe and return its seed
+    def next_shoe(self, cards):
+        if self._shoes is None or self._next == len(self._shoes[0]) or self._shoes[0].shape[1] != len(cards):
+            self._shoes = self.shoes(cards, self.batch)
+            self._next = 0
+
+        shoes, seeds = self._shoes
+        i = self._next
+        self._next = i + 1
+        cards[:] = shoes[i].tobytes()
+        return seeds[i]
+
+    ## Shuffle cards (in template order) in place as the shoe with this seed was
+    def replay(self, cards, seed):
+        np = self._np
+        master_seed, offset = seed
+        bit_generator = np.random.PCG64(master_seed)
+        bit_generator.advance(offset)
+        keys = np.random.Generator(bit_generator).random(len(cards))
+        cards[:] = np.frombuffer(bytes(cards), dtype=np.uint8)[np.argsort(keys, kind='stable')].tobytes()
+
+    ## Offset of the next shoe (uint64) and the master seed (repr). Shoes shuffled ahead are dropped
+    ## on restore and shuffled again from the same offset.
+    def state(self):
+        offset = self.offset
+        if self._shoes is not None:
+            shoes, seeds = self._shoes
+            offset -= (len(seeds) - self._next) * shoes.shape[1]
+        return struct.pack('<Q', offset) + repr(self.seed).encode()
+
+    def set_state(self, state):
+        np = self._np
+        offset, = struct.unpack_from('<Q', state)
+        self.seed = ast.literal_eval(state[8:].decode())
+        bit_generator = np.random.PCG64(self.seed)
+        bit_generator.advance(offset)
+        self._generator = np.random.Generator(bit_generator)
+        self.offset = offset
+        self._shoes = None
+        self._next = 0
+
+
+SHUFFLERS = {'mt': MTShuffler, 'pcg64': PCG64Shuffler}
+
+
+## MAKE_SHUFFLER method ##
+##
+# Inputs:
+# name (string): 'mt' or 'pcg64'
+# seed: Master seed, None for a random one
+#
+# Outputs:
+# shuffler (MTShuffler or PCG64Shuffler)
+
+def make_shuffler(name='mt', seed=None):
+    if name not in SHUFFLERS:
+        raise ValueError("Unknown shuffler %r, expected one of %s" % (name, sorted(SHUFFLERS)))
+    return SHUFFLERS[name](seed)
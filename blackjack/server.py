@@ -0,0 +1,484 @@
+### BLACKJACK SERVER ###
+# asyncio game server hosting many independent sessions over a TCP line protocol. Every connection
+# is a session with its own player, shoe and bets. The round engine runs as a generator
+# (engine.play_round_steps), so a session awaits the player's next line between steps
+# instead of blocking in input(), and one process serves thousands of tables.
+#
+# Protocol: one UTF-8 line per message.
+# Server -> client:
+#   WELCOME <session id>
+#   RESUMED <session id>            the session was restored from its checkpoint and goes on under its old id
+#   ASK <prompt> [<option> ...]     waits for one answer line. Prompts:
+#       deposit                     deposit amount, minimum 10, or RESUME <session id> (with --checkpoint-dir)
+#       bet [R]                     'main' or 'main,left,right' in multiples of 10. R (when offered) repeats the last bet.
+#       insurance Y N               engine decisions, see engine.play_round_steps()
+#       first H S D SPLIT EXIT      (only the allowed options are listed)
+#       next H S EXIT
+#       continue Y N                play another round
+#   ERR <message>                   answer rejected. The ASK is repeated.
+#   SHOE <seed>                     a new shoe was shuffled
+#   BALANCE <amount>                at the start of every round
+#   EVENT <event> <hand> <cards> <total> [<detail> ...]
+#                                   round event. hand is hand1, hand2 ... or dealer, cards are comma-separated
+#                                   short names (AH, 10S). The dealer's hole card is only sent from 'reveal' on.
+#   RESULT <net winnings> <balance>
+#   BYE <final balance> <highest balance>
+#                                   last line of every session, however it ends (0 0 before a deposit)
+# Client -> server: one answer per ASK, case-insensitive. QUIT at any prompt ends the session; a round
+# in progress is abandoned (with --checkpoint-dir it is settled as an EXIT first).
+#
+# Usage: python -m blackjack.server --port 8021, then e.g. nc localhost 8021
+#
+# With --profile PATH every session times its phases (profile.py: betting and decision
+# include waiting for the client). The counters of all sessions are printed and written to PATH
+# when the server stops.
+#
+# With --checkpoint-dir DIR every session writes a snapshot (checkpoint.py) to DIR/session-<id>.bjs
+# after every round, from a worker thread so the event loop never waits on the disk (a resume reads
+# it back the same way). After a crash or a dropped connection the player answers the deposit ASK
+# with RESUME <id> and plays on with the same balance, bets and shoe, and the same cards to come.
+# A checkpoint that can't be read is answered with ERR and the deposit ASK is repeated.
+
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import re
+import signal
+from functools import partial
+from blackjack.cards import CARD_SHORT_NAME, CARD_VALUE_PRIM
+from blackjack.checkpoint import read_checkpoint, session_state, write_checkpoint
+from blackjack.engine import MAIN, BLACKJACK, INSURANCE, SIDEBET_L, SIDEBET_R, Bro, HandClass, play_round_steps
+from blackjack.profile import PhaseProfiler, print_profile, write_profile
+from blackjack.rng import MTShuffler
+from blackjack.shoe import ContinuousShoe, Shoe
+
+
+## SESSIONENDED class ##
+##
+# Raised by LineChannel.ask() when the client quits, hangs up, times out or sends an overlong line
+
+class SessionEnded(Exception):
+    pass
+
+
+## LINECHANNEL class ##
+##
+# Attributes:
+# reader (asyncio.StreamReader), writer (asyncio.StreamWriter): The client connection
+# timeout (float): Seconds to wait for an answer before ending the session. None waits forever.
+# lines (list): Output not written yet. Written out in one go before every ASK.
+
+class LineChannel:
+    def __init__(self, reader, writer, timeout=None):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.lines = []
+
+    def line(self, text):
+        self.lines.append(text)
+
+    ## Write out held lines
+    async def flush(self):
+        if self.lines:
+            self.lines.append('')
+            self.writer.write('\n'.join(self.lines).encode())
+            self.lines.clear()
+        await self.writer.drain()
+
+    ## Send an ASK and wait for the answer (upper case, stripped)
+    async def ask(self, prompt):
+        self.line('ASK ' + prompt)
+        await self.flush()
+        try:
+            answer = await asyncio.wait_for(self.reader.readline(), self.timeout)
+        except asyncio.TimeoutError:
+            raise SessionEnded('timeout')
+        except (ValueError, asyncio.LimitOverrunError):
+            # a line over the stream limit (64 KiB) would stay half read, so the session can't go on
+            raise SessionEnded('overlong line')
+        answer = answer.decode(errors='replace').strip().upper()
+        if answer in ('', 'QUIT'):
+            raise SessionEnded('quit')
+        return answer
+
+    ## ASK until the answer is one of options
+    async def ask_choice(self, prompt, options):
+        question = ' '.join((prompt,) + tuple(options))
+        answer = await self.ask(question)
+        while answer not in options:
+            self.line('ERR expected one of %s' % ' '.join(options))
+            answer = await self.ask(question)
+        return answer
+
+
+## PARSE_BET method ##
+##
+# Inputs:
+# answer (string): Answer to 'ASK bet'
+# Player (Bro)
+#
+# Outputs:
+# bets (tuple): (main, left sidebet, right sidebet), None if the answer is not a valid bet
+# error (string): Why the bet was rejected, '' if valid
+# Same rules as the console game: main bet > 0, sidebets >= 0, all multiples of 10, total within balance.
+
+def parse_bet(answer, Player):
+    if answer == 'R':
+        bets = (Player.prev_bets[MAIN], Player.prev_bets[SIDEBET_L], Player.prev_bets[SIDEBET_R])
+        if bets[0] == 0:
+            return None, 'no last bet'
+    else:
+        amounts = answer.replace(' ', '').split(',')
+        if len(amounts) == 1:
+            amounts += ['0', '0']
+        if len(amounts) != 3 or not all(amount.isnumeric() for amount in amounts):
+            return None, 'invalid bet'
+        bets = tuple(int(amount)*1.0 for amount in amounts)
+        if bets[0] < 1 or any(bet % 10 for bet in bets):
+            return None, 'invalid bet'
+
+    if sum(bets) > Player.balance:
+        return None, 'insufficient balance %s' % Player.balance
+    return bets, ''
+
+
+## HAND_TAG method ##
+##
+# Inputs:
+# result (RoundResult)
+# hand (HandClass): Hand the event is about, None for the dealer
+#
+# Outputs:
+# tag (string): hand1, hand2 ... or dealer
+
+def hand_tag(result, hand):
+    if hand is None or hand is result.dealer_hand:
+        return 'dealer'
+    return 'hand%d' % (result.hands.index(hand) + 1)
+
+
+## SEND_EVENT method ##
+##
+# Inputs:
+# event (string): Round event raised by play_round_steps()
+# result (RoundResult): Round in progress
+# hand (HandClass): Hand the event is about. None for dealer-only events.
+# channel (LineChannel)
+#
+# Outputs:
+# queues the EVENT line(s)
+
+def send_event(event, result, hand, channel):
+    tag = hand_tag(result, hand)
+    if tag == 'dealer':
+        hand = result.dealer_hand
+
+    text = 'EVENT %s %s %s %d' % (event, tag, ','.join(CARD_SHORT_NAME[card] for card in hand.hand_cards), hand.best_total)
+
+    if event == 'sidebet_L':
+        text += ' %s %s' % (result.payoffs['sidebet_L'], hand.hand_winnings[SIDEBET_L])
+    elif event == 'sidebet_R':
+        text += ' %s %s' % (result.payoffs['sidebet_R'], hand.hand_winnings[SIDEBET_R])
+    elif event.startswith('insurance'):
+        text += ' %s' % hand.hand_winnings[INSURANCE]
+    elif event == 'double':
+        text += ' %s' % hand.bets[MAIN]
+    elif event == 'settle':
+        text += ' %s %s' % (hand.outcome, hand.hand_winnings[MAIN] + hand.hand_winnings[BLACKJACK])
+
+    channel.line(text)
+
+    # the dealer's upcard only
+    if event in ('deal', 'play_split_hand'):
+        upcard = result.dealer_hand.hand_cards[0]
+        channel.line('EVENT %s dealer %s %d' % (event, CARD_SHORT_NAME[upcard], CARD_VALUE_PRIM[upcard]))
+
+
+## CHECKPOINT_PATH method ##
+##
+# Inputs:
+# checkpoint_dir (string)
+# session_id (int)
+#
+# Outputs:
+# path (string): Checkpoint file of the session
+
+def checkpoint_path(checkpoint_dir, session_id):
+    return os.path.join(checkpoint_dir, 'session-%d.bjs' % session_id)
+
+
+## LAST_CHECKPOINTED_SESSION method ##
+##
+# Inputs:
+# checkpoint_dir (string)
+#
+# Outputs:
+# session_id (int): Highest session id with a checkpoint in checkpoint_dir, 0 if none
+
+def last_checkpointed_session(checkpoint_dir):
+    session_ids = [int(match.group(1)) for match in map(re.compile(r'session-(\d+)\.bjs$').match, os.listdir(checkpoint_dir)) if match]
+    return max(session_ids, default=0)
+
+
+## ABANDON_ROUND method ##
+##
+# Inputs:
+# steps (generator): engine.play_round_steps() of the round, waiting for a decision
+# kind (string): Decision it waits for
+#
+# Outputs:
+# result (RoundResult): The round, exited at the first chance (main bets forfeited)
+
+def abandon_round(steps, kind):
+    try:
+        while True:
+            kind, playerHand, options, dealer_upcard = steps.send('N' if kind == 'insurance' else 'EXIT')
+    except StopIteration as stop:
+        return stop.value
+
+
+## PLAY_SESSION method ##
+##
+# Inputs:
+# channel (LineChannel)
+# session_id (int)
+# num_decks (int)
+# seed: Master seed of the server. Each session shuffles from its own seed derived from it. None for random shoes.
+# penetration (float): Fraction of the shoe dealt before the cut card
+# csm (bool): Deal from a continuous shuffling machine instead of a shoe
+# profiler (PhaseProfiler): Session's phase timings. None to not profile.
+# checkpoint_dir (string): Directory of the session checkpoints. None to not checkpoint.
+# in_play (set): Ids of the sessions in progress, so a session is not resumed twice at once
+#
+# Outputs:
+# Player (Bro): Player at the end of the session
+# Plays rounds until the player stops, runs out of balance or the session ends (SessionEnded).
+# Raises SessionEnded (or ConnectionError) only if the session ends before the deposit.
+
+async def play_session(channel, session_id, num_decks, seed, penetration=0.5, csm=False, profiler=None, checkpoint_dir=None, in_play=None):
+    channel.line('WELCOME %d' % session_id)
+    if in_play is None:
+        in_play = set()
+
+    Player = deck = None
+    rounds = 0
+    while Player is None:
+        answer = await channel.ask('deposit')
+        resume = re.match(r'RESUME\s+(\d+)$', answer) if checkpoint_dir is not None else None
+        if resume is not None:
+            resume_id = int(resume.group(1))
+            path = checkpoint_path(checkpoint_dir, resume_id)
+            if resume_id in in_play:
+                channel.line('ERR session %d is in play' % resume_id)
+            elif not os.path.exists(path):
+                channel.line('ERR no checkpoint for session %d' % resume_id)
+            else:
+                # read in a worker thread like the writes, so the event loop never waits on the disk
+                try:
+                    Player, deck, rounds = await asyncio.to_thread(read_checkpoint, path)
+                except ValueError:
+                    channel.line('ERR bad checkpoint for session %d' % resume_id)
+                    continue
+                session_id = resume_id
+                channel.line('RESUMED %d' % session_id)
+        elif not answer.isnumeric() or int(answer) < 10:
+            channel.line('ERR minimum deposit is 10')
+        else:
+            Player = Bro('player', int(answer)*1.0)
+
+    if deck is None:
+        # own seed source, so restoring another session's checkpoint can't touch this session's shoes
+        rng = MTShuffler(random.getrandbits(64) if seed is None else '%s-%s' % (seed, session_id))
+        deck = ContinuousShoe(num_decks, rng) if csm else Shoe(num_decks, rng, penetration)
+        channel.line('SHOE %s' % deck.seed)
+
+    in_play.add(session_id)
+    try:
+        path = None if checkpoint_dir is None else checkpoint_path(checkpoint_dir, session_id)
+        await play_rounds(channel, Player, deck, rounds, profiler, path)
+    except (SessionEnded, ConnectionError):
+        pass
+    finally:
+        in_play.discard(session_id)
+    return Player
+
+
+## PLAY_ROUNDS method ##
+##
+# Inputs:
+# channel (LineChannel)
+# Player (Bro), deck (Shoe or ContinuousShoe): The session's player and shoe
+# rounds (int): No. of rounds played so far
+# profiler (PhaseProfiler): Session's phase timings. None to not profile.
+# path (string): Checkpoint file written after every round. None to not checkpoint.
+#
+# Outputs:
+# <none>
+# The rounds of play_session()
+
+async def play_rounds(channel, Player, deck, rounds, profiler=None, path=None):
+    observer = partial(send_event, channel=channel)
+
+    while Player.balance >= 10:
+        channel.line('BALANCE %s' % Player.balance)
+
+        if deck.needs_shuffle():
+            deck.shuffle()
+            channel.line('SHOE %s' % deck.seed)
+
+        Player.hands[0] = HandClass('Hand #1')
+
+        if profiler is not None:
+            profiler.begin('betting')
+        can_repeat = 0 < sum(Player.prev_bets) <= Player.balance
+        bets, error = parse_bet(await channel.ask('bet R' if can_repeat else 'bet'), Player)
+        while bets is None:
+            channel.line('ERR ' + error)
+            bets, error = parse_bet(await channel.ask('bet R' if can_repeat else 'bet'), Player)
+        Player.hands[0].bets[MAIN], Player.hands[0].bets[SIDEBET_L], Player.hands[0].bets[SIDEBET_R] = bets
+        Player.prev_bets[:] = Player.hands[0].bets
+        if profiler is not None:
+            profiler.end()
+
+        # drive the engine, awaiting every decision
+        steps = play_round_steps(Player, deck, observer, profiler=profiler)
+        try:
+            kind, playerHand, options, dealer_upcard = next(steps)
+            while True:
+                if profiler is None:
+                    action = await channel.ask_choice(kind, options)
+                else:
+                    profiler.begin('decision')
+                    action = await channel.ask_choice(kind, options)
+                    profiler.end()
+                kind, playerHand, options, dealer_upcard = steps.send(action)
+        except StopIteration as stop:
+            result = stop.value
+        except (SessionEnded, ConnectionError):
+            # the client left mid-round: settle it as an EXIT and checkpoint past its cards,
+            # so a resume can't deal them again or take back the bets
+            if path is not None:
+                if profiler is not None:
+                    profiler.end()
+                abandon_round(steps, kind)
+                await asyncio.to_thread(write_checkpoint, path, session_state(Player, deck, rounds + 1))
+            raise
+
+        channel.line('RESULT %s %s' % (result.balance_delta, Player.balance))
+        rounds += 1
+        if path is not None:
+            await asyncio.to_thread(write_checkpoint, path, session_state(Player, deck, rounds))
+
+        if result.exited or Player.balance < 10:
+            break
+        if await channel.ask_choice('continue', ('Y', 'N')) == 'N':
+            break
+
+    return Player
+
+
+## CLOSE_SESSION method ##
+##
+# Inputs:
+# channel (LineChannel)
+# Player (Bro): Player at the end of the session, None if it ended before the deposit
+#
+# Outputs:
+# <none>
+# Sends BYE and closes the connection. Best effort: the client may be gone already.
+
+async def close_session(channel, Player):
+    try:
+        if Player is None:
+            channel.line('BYE 0 0')
+        else:
+            channel.line('BYE %s %s' % (Player.balance, Player.max_balance))
+        await channel.flush()
+        channel.writer.close()
+        await channel.writer.wait_closed()
+    except OSError:
+        pass
+
+
+## SERVE method ##
+##
+# Inputs:
+# host (string), port (int): Address to listen on
+# num_decks (int)
+# seed: Master seed, None for random shoes
+# timeout (float): Seconds a session may wait for an answer. None waits forever.
+# penetration (float), csm (bool): Cut card position and continuous shuffler mode, as in play_session()
+# profiler (PhaseProfiler): Every session's phase timings are merged into it when the session ends. None to not profile.
+# checkpoint_dir (string): Directory for the session checkpoints. None to not checkpoint.
+#
+# Outputs:
+# <none>
+# Accepts connections until cancelled. Every connection runs play_session() as its own task.
+
+async def serve(host='127.0.0.1', port=8021, num_decks=8, seed=None, timeout=None, penetration=0.5, csm=False, profiler=None, checkpoint_dir=None):
+    session_ids = itertools.count(1)
+    in_play = set()
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        session_ids = itertools.count(last_checkpointed_session(checkpoint_dir) + 1)
+
+    async def handle(reader, writer):
+        channel = LineChannel(reader, writer, timeout)
+        session_profiler = None if profiler is None else PhaseProfiler()
+        Player = None
+        try:
+            Player = await play_session(channel, next(session_ids), num_decks, seed, penetration, csm, session_profiler,
+                                        checkpoint_dir, in_play)
+        except (SessionEnded, ConnectionError):
+            pass
+        finally:
+            # phases cut short by the session ending are not counted
+            if session_profiler is not None:
+                profiler.merge(session_profiler)
+            await close_session(channel, Player)
+
+    server = await asyncio.start_server(handle, host, port, backlog=4096)
+    print("Serving blackjack on %s" % ', '.join('%s:%s' % sock.getsockname()[:2] for sock in server.sockets))
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blackjack line-protocol game server")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8021, help="Port to listen on")
+    parser.add_argument('--decks', type=int, default=8, help="No. of decks in every shoe")
+    parser.add_argument('--seed', default=None, help="Master seed for reproducible shoes (default: random)")
+    parser.add_argument('--penetration', type=float, default=0.5, help="Fraction of the shoe dealt before the cut card")
+    parser.add_argument('--csm', action='store_true', help="Deal from a continuous shuffling machine")
+    parser.add_argument('--timeout', type=float, default=None, help="Seconds to wait for an answer before closing a session")
+    parser.add_argument('--profile', default=None, help="Time session phases and write the counters to this file on exit (.json, else folded stacks)")
+    parser.add_argument('--checkpoint-dir', default=None, help="Save every session here after each round, so it can be resumed (RESUME <id>)")
+    args = parser.parse_args()
+    if not 0 < args.penetration < 1:
+        parser.error("--penetration must be > 0 and < 1")
+
+    profiler = None if args.profile is None else PhaseProfiler()
+
+    # stop on SIGTERM as on Ctrl-C, so sessions are wound up and the profile written
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.decks, args.seed, args.timeout, args.penetration, args.csm, profiler,
+                          args.checkpoint_dir))
+    except KeyboardInterrupt:
+        pass
+
+    if profiler is not None:
+        print_profile(profiler)
+        write_profile(profiler, args.profile)
+
+
+if __name__ == '__main__':
+    main()
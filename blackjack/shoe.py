@@ -0,0 +1,312 @@
+### BLACKJACK SHOE ###
+# Dealing shoe of card codes. Cards are dealt by advancing a cursor; reshuffling copies the
+# prebuilt ordered template for the deck count back into the same buffer and shuffles it in place
+# with the shoe's shuffle backend (see rng.py), which records the seed of every shoe.
+#
+# The shoe also keeps the Hi-Lo and KO running counts and the No. of cards left of every rank.
+# deal() stays a plain cursor step: the counts catch up on the cards dealt since the last query,
+# so every card is counted exactly once (O(1) per card) and nothing is spent when nobody counts.
+# Counts cover every dealt card, including a dealer's hole card that is not revealed yet.
+#
+# A Shoe is reshuffled once the cut card comes out: callers check needs_shuffle() before every round.
+# A cut card deep in a small shoe can leave too few cards for a round. When the shoe runs out
+# mid-round, the dealer shuffles the discard tray (the cards of the earlier rounds) and deals on
+# from it, as at a real table, and the whole shoe is shuffled once that round ends.
+# ContinuousShoe is a continuous shuffling machine (CSM): the round's cards go back into the machine
+# when the round ends, and it never needs a shuffle. The engine ends every round with deck.discard().
+#
+# state() packs what it takes to rebuild the shoe (kind, deck count, cut, shoe seed, shuffle backend
+# state); restore_shoe() rebuilds it and moves the cursor back to where it was, so the rest of the
+# shoe and every shoe after it deal the same cards. Used by checkpoint.py after every round.
+
+
+import ast
+import random
+import struct
+from blackjack.cards import DECK_TEMPLATE, FACES, HI_LO_TAG, KO_TAG
+from blackjack.rng import SHUFFLERS, MTShuffler, pack_random_state, unpack_random_state
+
+
+_TEMPLATES = {}     # num_decks -> ordered shoe (bytes)
+
+NUM_RANKS = len(FACES)
+
+SHOE_STATE_FORMAT = '<B8sHIHH'      # kind, backend name, num_decks, cut, seed size, backend state size
+SHOE_STATE_SIZE = struct.calcsize(SHOE_STATE_FORMAT)
+
+
+## SHOE_TEMPLATE method ##
+##
+# Inputs:
+# num_decks (int): No. of decks in the shoe
+#
+# Outputs:
+# template (bytes): Ordered (unshuffled) shoe of card codes. Built once per deck count.
+
+def shoe_template(num_decks):
+    template = _TEMPLATES.get(num_decks)
+    if template is None:
+        if num_decks < 1:
+            raise ValueError("Shoe must have at least 1 deck")
+        template = _TEMPLATES[num_decks] = DECK_TEMPLATE * num_decks
+    return template
+
+
+## SHOE class ##
+##
+# Attributes:
+# num_decks (int): No. of decks in the shoe
+# cards (bytearray): Card codes in dealing order. Never reallocated.
+# pos (int): Index of the next card to deal
+# rng: Shuffle backend (MTShuffler, PCG64Shuffler). Defaults to an MTShuffler drawing shoe seeds from the random module.
+# seed: Seed of the current shoe. replay(seed) deals the same shoe again.
+# cut (int): Position of the cut card. The shoe is due for a shuffle once more than cut cards are dealt.
+#       penetration (float, 0 < penetration < 1) places it at that fraction of the shoe. Defaults to 0.5.
+# shuffled (bool, constructor only): False leaves the shoe in template order with no seed, to be
+#       loaded by set_state() or replay() without a throwaway shuffle
+# Counts (up to date after _count()):
+# _counted (int): No. of cards counted so far
+# _hi_lo (int): Hi-Lo running count, starts at 0
+# _ko (int): KO running count, starts at 4 - 4*num_decks (the standard initial running count)
+# _rank_counts (list): No. of cards left per rank (0 = 2 ... 12 = A)
+# _round_start (int): Position of the current round's first card. cards[:_round_start] are the discards.
+# _refilled (bool): The discards were dealt from this round. The shoe is used up when the round ends.
+# _state (bytes): state() of the current shoe, built on first use
+
+class Shoe:
+    kind = 0
+
+    def __init__(self, num_decks, rng=None, penetration=0.5, shuffled=True):
+        if not 0 < penetration < 1:
+            raise ValueError("Penetration must be > 0 and < 1")
+        self.num_decks = num_decks
+        self.cards = bytearray(shoe_template(num_decks))
+        self.pos = 0
+        self.cut = int(len(self.cards) * penetration)
+        self.rng = MTShuffler() if rng is None else rng
+        self.seed = None
+        if shuffled:
+            self.shuffle()
+        else:
+            self._round_start = 0
+            self._refilled = False
+            self._state = None
+            self._reset_count()
+
+    ## Start counting a fresh shoe
+    def _reset_count(self):
+        self._counted = 0
+        self._hi_lo = 0
+        self._ko = 4 - 4*self.num_decks
+        self._rank_counts = [4*self.num_decks]*NUM_RANKS
+
+    ## Count the cards dealt since the last count
+    def _count(self):
+        pos = self.pos
+        if self._counted == pos:
+            return
+        hi_lo, ko, rank_counts = self._hi_lo, self._ko, self._rank_counts
+        for card in self.cards[self._counted:pos]:
+            hi_lo += HI_LO_TAG[card]
+            ko += KO_TAG[card]
+            rank_counts[card >> 2] -= 1
+        self._hi_lo, self._ko, self._counted = hi_lo, ko, pos
+
+    ## Deal the next card code
+    def deal(self):
+        pos = self.pos
+        try:
+            card = self.cards[pos]
+        except IndexError:
+            self._refill()
+            return self.deal()
+        self.pos = pos + 1
+        return card
+
+    ## Out of cards mid-round: shuffle the discards behind the round's cards and deal on from them.
+    ## The shuffle is seeded from the shoe's seed, so replay(seed) deals the same cards.
+    def _refill(self):
+        start = self._round_start
+        if start == 0:
+            raise IndexError("Shoe is empty")
+        cards = self.cards
+        discards = cards[:start]
+        random.Random(repr(self.seed)).shuffle(discards)
+        cards[:] = cards[start:] + discards
+        self.pos = len(cards) - start
+        self._round_start = 0
+        self._refilled = True
+        self._state = None
+        self._reset_count()     # the count starts over with the round's cards on the table
+
+    ## Put every card back in template order and shuffle, in place
+    def shuffle(self):
+        self.cards[:] = shoe_template(self.num_decks)
+        self.seed = self.rng.next_shoe(self.cards)
+        self.pos = 0
+        self._round_start = 0
+        self._refilled = False
+        self._state = None
+        self._reset_count()
+
+    ## Rebuild the shoe that had this seed, from its first card
+    def replay(self, seed):
+        self.cards[:] = shoe_template(self.num_decks)
+        self.rng.replay(self.cards, seed)
+        self.seed = seed
+        self.pos = 0
+        self._round_start = 0
+        self._refilled = False
+        self._state = None
+        self._reset_count()
+
+    ## True once the cut card has come out. Checked between rounds.
+    def needs_shuffle(self):
+        return self.pos > self.cut
+
+    ## End of a round. The dealt cards stay in the discard tray until the next shuffle.
+    ## After a refill nothing is left to deal from: the shoe is used up and needs a shuffle.
+    def discard(self):
+        if self._refilled:
+            self.pos = len(self.cards)
+        self._round_start = self.pos
+
+    ## No. of cards left to deal
+    def remaining(self):
+        return len(self.cards) - self.pos
+
+    ## Fraction of the shoe already dealt
+    def penetration(self):
+        return self.pos / len(self.cards)
+
+    ## Running count of the dealt cards. system: 'hi_lo' or 'ko'
+    def running_count(self, system='hi_lo'):
+        self._count()
+        if system == 'hi_lo':
+            return self._hi_lo
+        elif system == 'ko':
+            return self._ko
+        raise ValueError("Unknown count system %r, expected 'hi_lo' or 'ko'" % system)
+
+    ## Hi-Lo running count per deck left to deal
+    def true_count(self):
+        self._count()
+        return self._hi_lo * 52 / max(len(self.cards) - self.pos, 1)
+
+    ## No. of cards left per rank, as a tuple indexed by rank (0 = 2 ... 12 = A)
+    def remaining_ranks(self):
+        self._count()
+        return tuple(self._rank_counts)
+
+    ## No. of cards left per blackjack value, as a composition of dealer.py: (aces, twos ... nines, ten-valued cards)
+    def composition(self):
+        self._count()
+        rank_counts = self._rank_counts
+        return (rank_counts[12],) + tuple(rank_counts[:8]) + (rank_counts[8] + rank_counts[9] + rank_counts[10] + rank_counts[11],)
+
+    ## Shoe state as bytes, without the cursor (kept by the caller). Only changes at a shuffle,
+    ## so it is packed once per shoe and costs nothing on the following rounds.
+    def state(self):
+        if self._state is None:
+            seed = repr(self.seed).encode()
+            rng_state = self.rng.state()
+            self._state = struct.pack(SHOE_STATE_FORMAT, self.kind, self.rng.name.encode(), self.num_decks, self.cut,
+                                      len(seed), len(rng_state)) + seed + rng_state
+        return self._state
+
+    ## Rebuild the shoe from state() and put the cursor back at pos. The counts catch up on the next query.
+    def set_state(self, state, pos):
+        kind, name, num_decks, cut, seed_size, rng_size = struct.unpack_from(SHOE_STATE_FORMAT, state)
+        if kind != self.kind or num_decks != self.num_decks:
+            raise ValueError("Shoe state is for a different kind of shoe")
+        start = SHOE_STATE_SIZE + seed_size
+        self.rng.set_state(state[start:start + rng_size])
+        self.replay(ast.literal_eval(state[SHOE_STATE_SIZE:start].decode()))
+        self.cut = cut
+        self.pos = self._round_start = pos
+        self._state = state[:start + rng_size]
+
+    def __len__(self):
+        return len(self.cards) - self.pos
+
+    def __str__(self):
+        return "%d decks, %d of %d cards remaining" % (self.num_decks, len(self.cards) - self.pos, len(self.cards))
+
+
+## CONTINUOUSSHOE class ##
+##
+# Continuous shuffling machine. Every card dealt is drawn uniformly from the cards in the machine,
+# and the cards of a round go back in when it ends.
+#
+# The machine is the Shoe buffer itself: cards[pos:] are in the machine, cards[:pos] are out on the
+# table. deal() swaps a random card of the machine to pos and advances (one Fisher-Yates step, O(1)),
+# and discard() returns the round's cards by moving pos back to 0, O(1). Nothing is rebuilt per round.
+#
+# Attributes (in addition to Shoe's):
+# seed: Seed of the machine. replay(seed) restarts it with the same card order and draw sequence.
+# Counts cover the cards out of the machine in the current round. Penetration doesn't apply.
+
+class ContinuousShoe(Shoe):
+    kind = 1
+
+    def __init__(self, num_decks, rng=None, shuffled=True):
+        Shoe.__init__(self, num_decks, rng, shuffled=shuffled)
+
+    ## Load the machine from the shuffle backend and seed its draws from the same seed
+    def shuffle(self):
+        Shoe.shuffle(self)
+        self._draw = random.Random(repr(self.seed)).random
+
+    def replay(self, seed):
+        Shoe.replay(self, seed)
+        self._draw = random.Random(repr(self.seed)).random
+
+    ## Shoe state plus the machine's card order and draw generator, which change every round
+    def state(self):
+        return Shoe.state(self) + bytes(self.cards) + pack_random_state(self._draw.__self__)
+
+    def set_state(self, state, pos):
+        Shoe.set_state(self, state, pos)
+        start = len(self._state)
+        end = start + len(self.cards)
+        self.cards[:] = state[start:end]
+        unpack_random_state(self._draw.__self__, state[end:])
+
+    ## Deal a card drawn at random from the machine
+    def deal(self):
+        pos = self.pos
+        cards = self.cards
+        index = pos + int(self._draw() * (len(cards) - pos))
+        card = cards[index]         # raises IndexError once the machine is empty
+        cards[index] = cards[pos]
+        cards[pos] = card
+        self.pos = pos + 1
+        return card
+
+    def needs_shuffle(self):
+        return False
+
+    ## Return the round's cards to the machine
+    def discard(self):
+        self.pos = 0
+        self._reset_count()
+
+
+## RESTORE_SHOE method ##
+##
+# Inputs:
+# state (bytes): state() of a Shoe or ContinuousShoe
+# pos (int): Cursor position when the state was taken
+#
+# Outputs:
+# deck (Shoe or ContinuousShoe): The same shoe, with the same shuffle backend state
+
+def restore_shoe(state, pos=0):
+    kind, name, num_decks, cut, seed_size, rng_size = struct.unpack_from(SHOE_STATE_FORMAT, state)
+    rng = SHUFFLERS[name.rstrip(b'\0').decode()](0)      # private placeholder seed, replaced by set_state()
+    if kind == ContinuousShoe.kind:
+        deck = ContinuousShoe(num_decks, rng, shuffled=False)
+    else:
+        deck = Shoe(num_decks, rng, shuffled=False)
+    deck.set_state(state, pos)
+    return deck
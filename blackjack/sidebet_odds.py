@@ -0,0 +1,172 @@
+### BLACKJACK SIDEBET ODDS ###
+# Exact hit probabilities, EV and variance of the Perfect Pairs (left) and 21+3 (right) sidebets for a
+# shoe composition, by enumerating every ordered two-card / three-card combination.
+#
+# Every combination of card codes is classified once with the game's own check_perfect_pair() and
+# check_21_plus_3(), into a 52x52 and a 52x52x52 category table. For a composition (counts per card
+# code), each combination is weighted by the number of ways to draw it without replacement, so a
+# query is a few vectorized array operations and is cheap enough to run on every round.
+#
+# Requires numpy. Run python -m blackjack.sidebet_odds for the house edge at 1 to 8 decks.
+
+
+import numpy as np
+from blackjack.cards import NUM_CARDS
+from blackjack.engine import check_perfect_pair, check_21_plus_3
+from blackjack.shoe import shoe_template
+
+
+# Category names and the payoff the game pays on them, best first
+SIDEBET_L_CATEGORIES = ('perfect_pairs', 'coloured_pairs', 'mixed_pairs')
+SIDEBET_R_CATEGORIES = ('suited_trips', 'straight_flush', 'trips', 'straight', 'flush')
+SIDEBET_L_PAYOUTS = {'perfect_pairs': 30, 'coloured_pairs': 12, 'mixed_pairs': 5}
+SIDEBET_R_PAYOUTS = {'suited_trips': 100, 'straight_flush': 40, 'trips': 30, 'straight': 10, 'flush': 5}
+
+_tables = {}
+
+
+## CATEGORY_TABLES method ##
+##
+# Inputs:
+# <none>
+#
+# Outputs:
+# pair_table (array): 52x52 uint8, category index + 1 of Perfect Pairs for (card 1, card 2), 0 if lost
+# triple_table (array): 52x52x52 uint8, category index + 1 of 21+3 for (card 1, card 2, dealer upcard), 0 if lost
+# Built once with the game's check functions, then cached.
+
+def category_tables():
+    if not _tables:
+        pair_category = {SIDEBET_L_PAYOUTS[name]: i+1 for i, name in enumerate(SIDEBET_L_CATEGORIES)}
+        triple_category = {SIDEBET_R_PAYOUTS[name]: i+1 for i, name in enumerate(SIDEBET_R_CATEGORIES)}
+
+        pair_table = np.zeros((NUM_CARDS, NUM_CARDS), dtype=np.uint8)
+        triple_table = np.zeros((NUM_CARDS, NUM_CARDS, NUM_CARDS), dtype=np.uint8)
+        for first in range(NUM_CARDS):
+            for second in range(NUM_CARDS):
+                payoff = check_perfect_pair([first, second], {'sidebet_L': 0})['sidebet_L']
+                pair_table[first, second] = pair_category.get(payoff, 0)
+                for upcard in range(NUM_CARDS):
+                    payoff = check_21_plus_3([first, second], [upcard], {'sidebet_R': 0})['sidebet_R']
+                    triple_table[first, second, upcard] = triple_category.get(payoff, 0)
+
+        _tables['pair'] = pair_table
+        _tables['triple'] = triple_table
+
+    return _tables['pair'], _tables['triple']
+
+
+## CODE_COUNTS method ##
+##
+# Inputs:
+# cards (iterable): Card codes, e.g. deck.cards[deck.pos:] for the undealt part of a Shoe
+#
+# Outputs:
+# counts (array): No. of cards of each of the 52 codes
+
+def code_counts(cards):
+    return np.bincount(np.frombuffer(bytes(cards), dtype=np.uint8), minlength=NUM_CARDS).astype(np.float64)
+
+
+## FULL_CODE_COUNTS method ##
+##
+# Inputs:
+# num_decks (int)
+#
+# Outputs:
+# counts (array): No. of cards of each code in a full shoe
+
+def full_code_counts(num_decks):
+    return code_counts(shoe_template(num_decks))
+
+
+## _SUMMARIZE method ##
+##
+# Inputs:
+# category_weights (array): Ways to draw each category, index 0 = lost
+# total_weight (float): Ways to draw any combination
+# categories (tuple): Category names
+# payouts (dict): Category name -> payoff
+#
+# Outputs:
+# odds (dict): 'probabilities' (category name -> probability, plus 'lose'), 'ev' and 'variance' per unit bet
+
+def _summarize(category_weights, total_weight, categories, payouts):
+    probabilities = {name: category_weights[i+1] / total_weight for i, name in enumerate(categories)}
+    probabilities['lose'] = category_weights[0] / total_weight
+
+    ev = -probabilities['lose']
+    second_moment = probabilities['lose']
+    for name in categories:
+        ev += probabilities[name] * payouts[name]
+        second_moment += probabilities[name] * payouts[name]**2
+
+    return {'probabilities': probabilities, 'ev': ev, 'variance': second_moment - ev*ev}
+
+
+## PERFECT_PAIRS_ODDS method ##
+##
+# Inputs:
+# counts (array): No. of cards of each code left in the shoe
+# payouts (dict): Category name -> payoff. Defaults to the game's 30/12/5.
+#
+# Outputs:
+# odds (dict): 'probabilities', 'ev', 'variance' of the left sidebet, per unit bet
+
+def perfect_pairs_odds(counts, payouts=SIDEBET_L_PAYOUTS):
+    pair_table, triple_table = category_tables()
+    counts = np.asarray(counts, dtype=np.float64)
+
+    # ordered ways to draw (card 1, card 2) without replacement
+    weights = np.outer(counts, counts) - np.diag(counts)
+    category_weights = np.bincount(pair_table.ravel(), weights=weights.ravel(), minlength=len(SIDEBET_L_CATEGORIES)+1)
+
+    return _summarize(category_weights, weights.sum(), SIDEBET_L_CATEGORIES, payouts)
+
+
+## TWENTY_ONE_PLUS_THREE_ODDS method ##
+##
+# Inputs:
+# counts (array): No. of cards of each code left in the shoe
+# payouts (dict): Category name -> payoff. Defaults to the game's 100/40/30/10/5.
+#
+# Outputs:
+# odds (dict): 'probabilities', 'ev', 'variance' of the right sidebet, per unit bet
+# The player's two cards and the dealer's upcard are the first three cards drawn.
+
+def twenty_one_plus_three_odds(counts, payouts=SIDEBET_R_PAYOUTS):
+    pair_table, triple_table = category_tables()
+    counts = np.asarray(counts, dtype=np.float64)
+    same = np.eye(NUM_CARDS)
+
+    # ordered ways to draw (card 1, card 2, card 3) without replacement
+    weights = (counts[:, None, None]
+               * (counts[None, :, None] - same[:, :, None])
+               * (counts[None, None, :] - same[:, None, :] - same[None, :, :]))
+    category_weights = np.bincount(triple_table.ravel(), weights=weights.ravel(), minlength=len(SIDEBET_R_CATEGORIES)+1)
+
+    return _summarize(category_weights, weights.sum(), SIDEBET_R_CATEGORIES, payouts)
+
+
+## PRINT_HOUSE_EDGES method ##
+##
+# Inputs:
+# deck_counts (iterable): Deck counts to report
+#
+# Outputs:
+# prints hit probabilities and house edge of both sidebets for each deck count
+
+def print_house_edges(deck_counts=range(1, 9)):
+    for num_decks in deck_counts:
+        counts = full_code_counts(num_decks)
+        print("\n%d deck%s" % (num_decks, '' if num_decks == 1 else 's'))
+        for title, odds, payouts in (("Perfect Pairs", perfect_pairs_odds(counts), SIDEBET_L_PAYOUTS),
+                                     ("21+3", twenty_one_plus_three_odds(counts), SIDEBET_R_PAYOUTS)):
+            print("  %s: house edge %.4f%%, variance %.4f" % (title, -100*odds['ev'], odds['variance']))
+            for name, probability in odds['probabilities'].items():
+                if name != 'lose':
+                    print("    %-15s %3d:1  %.6f%%" % (name, payouts[name], 100*probability))
+
+
+if __name__ == '__main__':
+    print_house_edges()
@@ -0,0 +1,412 @@
+### BLACKJACK SIMULATOR ###
+# Monte Carlo simulator over the headless round engine. Work is cut into tasks, each with its own
+# seeded RNG stream and shoe, spread across a process pool, and the per-task statistics are merged
+# at the end. Task seeds depend only on the master seed and the task index, and the task size only on
+# the length of the run (or --task-size), so a seed gives the same numbers whatever the number of workers.
+# By default a run is cut into about TASK_COUNT tasks of MIN_TASK_ROUNDS to MAX_TASK_ROUNDS rounds, enough
+# to keep a large pool busy on modest runs.
+#
+# Usage: python -m blackjack.sim --rounds 1000000 --workers 32 --seed 1
+#
+# Table rules default to the console game's (engine.Rules) and are changed with --decks,
+# --penetration and --rules, e.g. --rules "6D H17 6:5 DAS SP4". sweep.py runs a grid of rule sets.
+# The basic policy plays basic strategy for those rules (strategy.rules_strategy_table()).
+#
+# The shoe is reshuffled once the cut card (--penetration, fraction of the shoe dealt) has come out.
+# --csm plays from a continuous shuffling machine instead, which takes the cards back after every round.
+#
+# With --profile PATH every task times the phases of its rounds (see profile.py); the
+# merged counters are printed and written to PATH (JSON for .json, else folded stacks for flame graphs).
+#
+# With --history PREFIX every task also logs its rounds to PREFIX-<task index>.bjh (see
+# history.py), rotated every HISTORY_FILE_BYTES.
+
+
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from blackjack.engine import MAIN, BLACKJACK, INSURANCE, SIDEBET_L, SIDEBET_R, Bro, HandClass, Rules, parse_rules, play_round
+from blackjack.history import HistoryWriter
+from blackjack.profile import PhaseProfiler, print_profile, write_profile
+from blackjack.rng import SHUFFLERS, make_shuffler
+from blackjack.shoe import ContinuousShoe, Shoe
+from blackjack.strategy import basic_strategy_policy, rules_strategy_table
+
+
+SIDEBET_L_PAYOFFS = (30, 12, 5)             # perfect, coloured, mixed pairs
+SIDEBET_R_PAYOFFS = (100, 40, 30, 10, 5)    # suited trips, straight flush, trips, straight, flush
+SIDEBET_L_NAMES = {30: 'perfect pairs', 12: 'coloured pairs', 5: 'mixed pairs'}
+SIDEBET_R_NAMES = {100: 'suited three-of-a-kind', 40: 'straight flush', 30: 'three-of-a-kind', 10: 'straight', 5: 'flush'}
+
+BANKROLL = 1e12     # large enough that balance never limits doubling, splitting or insurance
+HISTORY_FILE_BYTES = 1 << 30
+TASK_COUNT = 64             # default No. of tasks of a run, before the limits below
+MIN_TASK_ROUNDS = 10000     # smallest default task, so per-task setup stays negligible
+MAX_TASK_ROUNDS = 100000    # largest default task, so long runs still spread across a large pool
+
+
+## DEALER_POLICY method ##
+##
+# Inputs:
+# kind (string): 'insurance', 'first' or 'next'
+# Player (Bro)
+# playerHand (HandClass)
+# options (tuple): allowed actions
+# dealer_upcard (int): Card code of the dealer's upcard
+#
+# Outputs:
+# player_action (string)
+# Mimic-the-dealer decisions: never insure, hit below 17, else stand
+
+def dealer_policy(kind, Player, playerHand, options, dealer_upcard):
+    if kind == 'insurance':
+        return 'N'
+    return 'H' if playerHand.best_total < 17 else 'S'
+
+
+# Decision policies by name, picklable across the process pool. 'basic' plays the strategy table for the task's rules.
+POLICIES = {'basic': basic_strategy_policy, 'dealer': dealer_policy}
+
+
+## SIMSTATS class ##
+##
+# Attributes:
+# rounds (int): No. of rounds played
+# shoes (int): No. of shoes started
+# main_sum (float): Sum of main game net result per round (main, blackjack and insurance), in units of the initial main bet
+# main_sum_sq (float): Sum of squares of the above
+# sidebet_L_sum, sidebet_L_sum_sq (float): Same for the left sidebet, in units of its bet
+# sidebet_R_sum, sidebet_R_sum_sq (float): Same for the right sidebet, in units of its bet
+# sidebet_L_hits (dict): payoff -> No. of rounds the left sidebet paid it
+# sidebet_R_hits (dict): payoff -> No. of rounds the right sidebet paid it
+# splits, doubles, blackjacks (int): No. of rounds with a split, a double down, a player blackjack
+# profile (PhaseProfiler): Phase timings of the rounds, None when not profiled
+
+class SimStats:
+    def __init__(self):
+        self.rounds = 0
+        self.shoes = 0
+        self.main_sum = 0.0
+        self.main_sum_sq = 0.0
+        self.sidebet_L_sum = 0.0
+        self.sidebet_L_sum_sq = 0.0
+        self.sidebet_R_sum = 0.0
+        self.sidebet_R_sum_sq = 0.0
+        self.sidebet_L_hits = {payoff: 0 for payoff in SIDEBET_L_PAYOFFS}
+        self.sidebet_R_hits = {payoff: 0 for payoff in SIDEBET_R_PAYOFFS}
+        self.splits = 0
+        self.doubles = 0
+        self.blackjacks = 0
+        self.profile = None
+
+    ## Add one round's RoundResult
+    def add_round(self, result, main_bet):
+        hands = result.hands
+        hand1 = hands[0]
+
+        main_net = hand1.hand_winnings[INSURANCE]
+        for playerHand in hands:
+            main_net += playerHand.hand_winnings[MAIN] + playerHand.hand_winnings[BLACKJACK]
+            if playerHand.player_action == 'D':
+                self.doubles += 1
+        main_net /= main_bet
+
+        self.rounds += 1
+        self.main_sum += main_net
+        self.main_sum_sq += main_net*main_net
+
+        if hand1.bets[SIDEBET_L] != 0:
+            sidebet_L_net = hand1.hand_winnings[SIDEBET_L] / hand1.bets[SIDEBET_L]
+            self.sidebet_L_sum += sidebet_L_net
+            self.sidebet_L_sum_sq += sidebet_L_net*sidebet_L_net
+            if result.payoffs['sidebet_L'] != 0:
+                self.sidebet_L_hits[result.payoffs['sidebet_L']] += 1
+
+        if hand1.bets[SIDEBET_R] != 0:
+            sidebet_R_net = hand1.hand_winnings[SIDEBET_R] / hand1.bets[SIDEBET_R]
+            self.sidebet_R_sum += sidebet_R_net
+            self.sidebet_R_sum_sq += sidebet_R_net*sidebet_R_net
+            if result.payoffs['sidebet_R'] != 0:
+                self.sidebet_R_hits[result.payoffs['sidebet_R']] += 1
+
+        if len(hands) > 1:
+            self.splits += 1
+        if hand1.blackjack_hand == 1 and len(hands) == 1:
+            self.blackjacks += 1
+
+    ## Add another SimStats into this one
+    def merge(self, other):
+        self.rounds += other.rounds
+        self.shoes += other.shoes
+        self.main_sum += other.main_sum
+        self.main_sum_sq += other.main_sum_sq
+        self.sidebet_L_sum += other.sidebet_L_sum
+        self.sidebet_L_sum_sq += other.sidebet_L_sum_sq
+        self.sidebet_R_sum += other.sidebet_R_sum
+        self.sidebet_R_sum_sq += other.sidebet_R_sum_sq
+        for payoff in self.sidebet_L_hits:
+            self.sidebet_L_hits[payoff] += other.sidebet_L_hits[payoff]
+        for payoff in self.sidebet_R_hits:
+            self.sidebet_R_hits[payoff] += other.sidebet_R_hits[payoff]
+        self.splits += other.splits
+        self.doubles += other.doubles
+        self.blackjacks += other.blackjacks
+        if other.profile is not None:
+            self.profile = other.profile if self.profile is None else self.profile.merge(other.profile)
+        return self
+
+
+## MEAN_CI method ##
+##
+# Inputs:
+# total (float): Sum of samples
+# total_sq (float): Sum of squares of samples
+# n (int): No. of samples
+# z (float): Normal quantile of the interval. 1.96 for 95%.
+#
+# Outputs:
+# mean (float)
+# variance (float): Sample variance
+# half_width (float): Half width of the confidence interval of the mean
+
+def mean_ci(total, total_sq, n, z=1.96):
+    if n < 2:
+        return (total/n if n else 0.0), 0.0, float('inf')
+    mean = total/n
+    variance = max(total_sq/n - mean*mean, 0.0) * n/(n-1)
+    return mean, variance, z*math.sqrt(variance/n)
+
+
+## PROPORTION_CI method ##
+##
+# Inputs:
+# hits (int): No. of successes
+# n (int): No. of trials
+# z (float): Normal quantile of the interval
+#
+# Outputs:
+# rate (float)
+# half_width (float): Half width of the normal-approximation confidence interval
+
+def proportion_ci(hits, n, z=1.96):
+    if n == 0:
+        return 0.0, float('inf')
+    rate = hits/n
+    return rate, z*math.sqrt(rate*(1-rate)/n)
+
+
+## SIMULATE_TASK method ##
+##
+# Inputs:
+# task (tuple): (seed, task_index, rounds, shoes, rules, bets, policy, shuffler, history, csm, profile)
+#       rounds (int): No. of rounds to play. 0 to play by shoes instead.
+#       shoes (int): No. of shoes to play through (up to the cut card) when rounds is 0
+#       rules (Rules): Table rules, including the shoe's decks and penetration
+#       bets (tuple): (main, sidebet_L, sidebet_R) bet amounts
+#       policy (string): Name of the decision policy in POLICIES
+#       shuffler (string): Name of the shuffle backend in rng.SHUFFLERS
+#       history (string): Hand history path prefix, None to not log rounds
+#       csm (bool): Deal from a continuous shuffling machine instead of a shoe
+#       profile (bool): Time the phases of every round into stats.profile
+#
+# Outputs:
+# stats (SimStats)
+# Runs in a worker process. Has its own RNG stream, shoe and player.
+
+def simulate_task(task):
+    seed, task_index, rounds, shoes, rules, bets, policy, shuffler, history, csm, profile = task
+    decide = POLICIES[policy]
+    if policy == 'basic':
+        decide = partial(basic_strategy_policy, table=rules_strategy_table(rules))
+
+    # PCG64 takes integer seeds only
+    task_seed = '%s-%s' % (seed, task_index) if shuffler == 'mt' else (seed, task_index)
+    if csm:
+        deck = ContinuousShoe(rules.num_decks, make_shuffler(shuffler, task_seed))
+    else:
+        deck = Shoe(rules.num_decks, make_shuffler(shuffler, task_seed), rules.penetration)
+    Player = Bro('player', BANKROLL)
+    stats = SimStats()
+    stats.shoes = 1
+    profiler = stats.profile = PhaseProfiler() if profile else None
+
+    main_bet, sidebet_L_bet, sidebet_R_bet = bets
+    writer = None if history is None else HistoryWriter('%s-%04d.bjh' % (history, task_index), max_bytes=HISTORY_FILE_BYTES)
+
+    while rounds == 0 or stats.rounds < rounds:
+        if deck.needs_shuffle():
+            if stats.shoes == shoes:
+                break
+            deck.shuffle()
+            stats.shoes += 1
+
+        Player.hands[0] = playerHand = HandClass('Hand #1')
+        playerHand.bets[MAIN] = main_bet
+        playerHand.bets[SIDEBET_L] = sidebet_L_bet
+        playerHand.bets[SIDEBET_R] = sidebet_R_bet
+
+        result = play_round(Player, deck, decide, rules=rules, profiler=profiler)
+        if writer is not None:
+            writer.write_round(stats.rounds, result, Player.balance)
+        stats.add_round(result, main_bet)
+
+    if writer is not None:
+        writer.close()
+
+    return stats
+
+
+## DEFAULT_TASK_SIZE method ##
+##
+# Inputs:
+# rounds (int): Length of the run in rounds (shoes count as 100 rounds)
+#
+# Outputs:
+# task_size (int): Rounds per task for about TASK_COUNT tasks, kept between MIN_TASK_ROUNDS and MAX_TASK_ROUNDS.
+#       Depends on nothing else, so the tasks (and their seeds) are the same on any number of workers.
+
+def default_task_size(rounds):
+    return min(MAX_TASK_ROUNDS, max(MIN_TASK_ROUNDS, -(-rounds // TASK_COUNT)))
+
+
+## SIMULATE method ##
+##
+# Inputs:
+# rounds (int): Total No. of rounds. 0 to play by shoes instead.
+# shoes (int): Total No. of shoes when rounds is 0
+# workers (int): No. of worker processes. 1 runs in this process.
+# seed (int): Master seed
+# rules (Rules): Table rules. Defaults to the console game's.
+# bets (tuple): (main, sidebet_L, sidebet_R)
+# task_size (int): Rounds (or shoes / 100) per task. None for about TASK_COUNT tasks, see default_task_size().
+# policy (string): Name of the decision policy in POLICIES
+# shuffler (string): Name of the shuffle backend, 'mt' or 'pcg64'
+# history (string): Hand history path prefix, None to not log rounds
+# csm (bool): Deal from a continuous shuffling machine. Needs rounds.
+# profile (bool): Time the phases of every round into stats.profile
+#
+# Outputs:
+# stats (SimStats): Merged statistics of all tasks
+
+def simulate(rounds=0, shoes=0, workers=1, seed=0, rules=None, bets=(10.0, 10.0, 10.0), task_size=None, policy='basic', shuffler='mt', history=None,
+             csm=False, profile=False):
+    rules = Rules() if rules is None else rules
+    if policy not in POLICIES:
+        raise ValueError("Unknown policy %r, expected one of %s" % (policy, sorted(POLICIES)))
+    if shuffler not in SHUFFLERS:
+        raise ValueError("Unknown shuffler %r, expected one of %s" % (shuffler, sorted(SHUFFLERS)))
+    if (rounds > 0) == (shoes > 0):
+        raise ValueError("Give either rounds or shoes")
+    if workers < 1:
+        raise ValueError("Need at least one worker")
+    if csm and shoes:
+        raise ValueError("A continuous shuffler has no shoes, give rounds")
+
+    total = rounds if rounds else shoes
+    if task_size is None:
+        task_size = default_task_size(rounds if rounds else 100*shoes)
+    per_task = task_size if rounds else max(task_size//100, 1)
+    tasks = []
+    for task_index, start in enumerate(range(0, total, per_task)):
+        size = min(per_task, total - start)
+        tasks.append((seed, task_index, size if rounds else 0, 0 if rounds else size, rules, bets, policy, shuffler, history, csm, profile))
+
+    stats = SimStats()
+    if workers == 1:
+        for task in tasks:
+            stats.merge(simulate_task(task))
+    else:
+        # work the strategy table out once, forked workers inherit it
+        if policy == 'basic':
+            rules_strategy_table(rules)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for task_stats in pool.map(simulate_task, tasks):
+                stats.merge(task_stats)
+
+    return stats
+
+
+## PRINT_REPORT method ##
+##
+# Inputs:
+# stats (SimStats)
+# elapsed (float): Wall time in seconds
+#
+# Outputs:
+# prints house edge, variance and sidebet hit rates with 95% confidence intervals
+
+def print_report(stats, elapsed):
+    n = stats.rounds
+    if n == 0:
+        print("\nNo rounds played")
+        return
+    print("\nRounds: %d  Shoes: %d  Time: %.1fs  (%.0f rounds/s)" % (n, stats.shoes, elapsed, n/elapsed if elapsed else 0))
+
+    mean, variance, half_width = mean_ci(stats.main_sum, stats.main_sum_sq, n)
+    print("\nMain game (per initial main bet)")
+    print("House edge: %.4f%% +/- %.4f%%" % (-100*mean, 100*half_width))
+    print("Variance: %.4f  (std dev %.4f)" % (variance, math.sqrt(variance)))
+    print("Splits: %.3f%%  Doubles: %.3f%%  Blackjacks: %.3f%%" % (100*stats.splits/n, 100*stats.doubles/n, 100*stats.blackjacks/n))
+
+    for title, hits, names, total, total_sq in (
+            ("Left sidebet (Perfect Pairs)", stats.sidebet_L_hits, SIDEBET_L_NAMES, stats.sidebet_L_sum, stats.sidebet_L_sum_sq),
+            ("Right sidebet (21+3)", stats.sidebet_R_hits, SIDEBET_R_NAMES, stats.sidebet_R_sum, stats.sidebet_R_sum_sq)):
+        if total == total_sq == 0:
+            continue
+        mean, variance, half_width = mean_ci(total, total_sq, n)
+        print("\n%s" % title)
+        for payoff, count in hits.items():
+            rate, rate_half_width = proportion_ci(count, n)
+            print("  %-24s %3d:1  %.5f%% +/- %.5f%%" % (names[payoff], payoff, 100*rate, 100*rate_half_width))
+        print("House edge: %.4f%% +/- %.4f%%  Variance: %.4f" % (-100*mean, 100*half_width, variance))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo blackjack simulator")
+    parser.add_argument('--rounds', type=int, default=0, help="No. of rounds to play")
+    parser.add_argument('--shoes', type=int, default=0, help="No. of shoes to play (when --rounds is not given)")
+    parser.add_argument('--workers', type=int, default=1, help="No. of worker processes")
+    parser.add_argument('--seed', type=int, default=0, help="Master seed")
+    parser.add_argument('--task-size', type=int, default=None,
+                        help="Rounds per task, or with --shoes 1 shoe per 100 (default: about %d tasks of %d to %d rounds)" % (TASK_COUNT, MIN_TASK_ROUNDS, MAX_TASK_ROUNDS))
+    parser.add_argument('--decks', type=int, default=8, help="No. of decks in the shoe")
+    parser.add_argument('--policy', default='basic', choices=sorted(POLICIES), help="Player decision policy")
+    parser.add_argument('--shuffler', default='mt', choices=sorted(SHUFFLERS), help="Shuffle backend")
+    parser.add_argument('--penetration', type=float, default=0.5, help="Fraction of the shoe dealt before the cut card")
+    parser.add_argument('--csm', action='store_true', help="Deal from a continuous shuffling machine")
+    parser.add_argument('--rules', default='', help="Rule tokens, e.g. \"H17 6:5 DAS SP4\" (see engine.parse_rules)")
+    parser.add_argument('--history', default=None, help="Log every round to hand history files with this path prefix")
+    parser.add_argument('--profile', default=None, help="Time round phases and write the counters to this file (.json, else folded stacks)")
+    parser.add_argument('--bets', default='10,10,10', help="Bet amounts: main, left sidebet, right sidebet")
+    args = parser.parse_args()
+
+    if args.rounds == 0 and args.shoes == 0:
+        args.rounds = 100000
+
+    bets = tuple(float(bet) for bet in args.bets.split(','))
+    if len(bets) != 3 or bets[0] <= 0:
+        parser.error("--bets needs three amounts and a main bet > 0")
+    if args.csm and args.shoes:
+        parser.error("--csm has no shoes, give --rounds")
+    if args.task_size is not None and args.task_size < 1:
+        parser.error("--task-size must be at least 1")
+    try:
+        rules = parse_rules(args.rules, Rules(args.decks, args.penetration))
+    except ValueError as error:
+        parser.error(str(error))
+    print("Rules: %s" % rules)
+
+    start = time.perf_counter()
+    stats = simulate(args.rounds, args.shoes, args.workers, args.seed, rules, bets, args.task_size, policy=args.policy, shuffler=args.shuffler, history=args.history,
+                     csm=args.csm, profile=args.profile is not None)
+    print_report(stats, time.perf_counter() - start)
+
+    if stats.profile is not None:
+        print_profile(stats.profile)
+        write_profile(stats.profile, args.profile)
+
+
+if __name__ == '__main__':
+    main()
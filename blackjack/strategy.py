@@ -0,0 +1,200 @@
+### BLACKJACK STRATEGY ###
+# Basic strategy compiled into a flat lookup table, and a decision policy for play_round().
+#
+# The table is a bytes object indexed by (hand total, soft flag, pair value, dealer upcard):
+#   index = ((pair*2 + soft)*NUM_TOTALS + total)*NUM_VALUES + upcard - 1
+# so a decision is one index computation and one lookup. pair is the value of a splittable pair
+# (1 for Aces ... 10), 0 when the hand can't be split.
+#
+# The charts below are for this game's rules: 8 decks, dealer stands on all 17s, double on the
+# first two cards only, no double after split, one split, no surrender, and the dealer only checks
+# for blackjack under an Ace (so 11 and 8,8 are hit against a ten rather than doubled/split).
+# rules_strategy_table() gives the table for other table rules (engine.Rules), derived from the EV solver (ev.py).
+
+
+from functools import lru_cache
+from blackjack.cards import CARD_VALUE
+from blackjack.engine import DEFAULT_RULES, Rules
+
+
+# Table entries
+HIT, STAND, DOUBLE, DOUBLE_STAND, SPLIT = 0, 1, 2, 3, 4     # DOUBLE: else hit, DOUBLE_STAND: else stand
+
+NUM_TOTALS = 22     # hand totals 0..21
+NUM_VALUES = 10     # upcard / pair values 1 (Ace) .. 10
+NUM_PAIRS = 11      # pair values 0 (no pair) .. 10
+
+# Engine action for each table entry, when doubling is / is not allowed
+ACTIONS_DOUBLE = ('H', 'S', 'D', 'D', 'SPLIT')
+ACTIONS_NO_DOUBLE = ('H', 'S', 'H', 'S', 'SPLIT')
+
+_CHART_CODES = {'H': HIT, 'S': STAND, 'D': DOUBLE, 'X': DOUBLE_STAND, 'P': SPLIT}
+
+
+# Charts. Columns are dealer upcards 2 3 4 5 6 7 8 9 10 A.
+# H = hit, S = stand, D = double else hit, X = double else stand, P = split, - = don't split (play the total)
+HARD_CHART = {
+    4:  'HHHHHHHHHH',
+    5:  'HHHHHHHHHH',
+    6:  'HHHHHHHHHH',
+    7:  'HHHHHHHHHH',
+    8:  'HHHHHHHHHH',
+    9:  'HDDDDHHHHH',
+    10: 'DDDDDDDDHH',
+    11: 'DDDDDDDDHH',
+    12: 'HHSSSHHHHH',
+    13: 'SSSSSHHHHH',
+    14: 'SSSSSHHHHH',
+    15: 'SSSSSHHHHH',
+    16: 'SSSSSHHHHH',
+    17: 'SSSSSSSSSS',
+    18: 'SSSSSSSSSS',
+    19: 'SSSSSSSSSS',
+    20: 'SSSSSSSSSS',
+    21: 'SSSSSSSSSS',
+}
+
+SOFT_CHART = {
+    12: 'HHHHHHHHHH',
+    13: 'HHHHDHHHHH',
+    14: 'HHHDDHHHHH',
+    15: 'HHDDDHHHHH',
+    16: 'HHDDDHHHHH',
+    17: 'HDDDDHHHHH',
+    18: 'SXXXXSSHHH',
+    19: 'SSSSSSSSSS',
+    20: 'SSSSSSSSSS',
+    21: 'SSSSSSSSSS',
+}
+
+PAIR_CHART = {
+    1:  'PPPPPPPPPP',
+    2:  '--PPPP----',
+    3:  '--PPPP----',
+    4:  '----------',
+    5:  '----------',
+    6:  '-PPPP-----',
+    7:  'PPPPPP----',
+    8:  'PPPPPPPP-P',
+    9:  'PPPPP-PP--',
+    10: '----------',
+}
+
+
+## TABLE_INDEX method ##
+##
+# Inputs:
+# total (int): Best total of the hand
+# soft (int): 1 if an Ace is counted as 11 in the best total, else 0
+# pair (int): Value of a splittable pair, 0 if the hand can't be split
+# upcard (int): Blackjack value of the dealer's upcard, 1 for Ace ... 10
+#
+# Outputs:
+# index (int): Index into a strategy table
+
+def table_index(total, soft, pair, upcard):
+    return ((pair*2 + soft)*NUM_TOTALS + total)*NUM_VALUES + upcard - 1
+
+
+## COMPILE_STRATEGY method ##
+##
+# Inputs:
+# hard_chart (dict): hard total -> 10 chart letters (upcards 2..10, A)
+# soft_chart (dict): soft total -> 10 chart letters
+# pair_chart (dict): pair value -> 10 chart letters ('P' or '-')
+#
+# Outputs:
+# table (bytes): Flat strategy table. Totals missing from the charts stand.
+
+def compile_strategy(hard_chart, soft_chart, pair_chart):
+    table = bytearray([STAND]) * (NUM_PAIRS*2*NUM_TOTALS*NUM_VALUES)
+
+    def chart_row(letters):
+        if len(letters) != NUM_VALUES:
+            raise ValueError("Chart row must have %d entries, got %r" % (NUM_VALUES, letters))
+        # chart columns are 2..10, A; table columns are A, 2..10
+        return [letters[-1]] + list(letters[:-1])
+
+    for soft, chart in ((0, hard_chart), (1, soft_chart)):
+        for total, letters in chart.items():
+            for upcard, letter in enumerate(chart_row(letters), 1):
+                table[table_index(total, soft, 0, upcard)] = _CHART_CODES[letter]
+
+    for pair, letters in pair_chart.items():
+        total, soft = (12, 1) if pair == 1 else (2*pair, 0)
+        for upcard, letter in enumerate(chart_row(letters), 1):
+            unsplit = table[table_index(total, soft, 0, upcard)]
+            table[table_index(total, soft, pair, upcard)] = SPLIT if letter == 'P' else unsplit
+
+    return bytes(table)
+
+
+STRATEGY_TABLE = compile_strategy(HARD_CHART, SOFT_CHART, PAIR_CHART)
+
+
+## RULES_STRATEGY_TABLE method ##
+##
+# Inputs:
+# rules (Rules): Table rules
+#
+# Outputs:
+# table (bytes): STRATEGY_TABLE under the rules the charts are for (whatever the penetration, insurance
+#       payout and double rule: the double entries' fallbacks cover hands that may not double), else a table
+#       from ev.compile_ev_strategy(). That takes a few seconds and is cached per rule set.
+
+def rules_strategy_table(rules):
+    return _rules_strategy_table(rules.num_decks, rules.hit_soft_17, rules.blackjack_payout, rules.double_on,
+                                 rules.double_after_split, rules.max_hands)
+
+
+@lru_cache(maxsize=64)
+def _rules_strategy_table(num_decks, hit_soft_17, blackjack_payout, double_on, double_after_split, max_hands):
+    if (num_decks, hit_soft_17, blackjack_payout, double_after_split, max_hands) == (DEFAULT_RULES.num_decks, DEFAULT_RULES.hit_soft_17,
+            DEFAULT_RULES.blackjack_payout, DEFAULT_RULES.double_after_split, DEFAULT_RULES.max_hands):
+        return STRATEGY_TABLE
+
+    # ev.py imports this module
+    from blackjack.ev import compile_ev_strategy
+    return compile_ev_strategy(Rules(num_decks, hit_soft_17=hit_soft_17, blackjack_payout=blackjack_payout, double_on=double_on,
+                                     double_after_split=double_after_split, max_hands=max_hands))
+
+
+## STRATEGY_ACTION method ##
+##
+# Inputs:
+# playerHand (HandClass)
+# options (tuple): actions allowed by the engine
+# dealer_upcard (int): Card code of the dealer's upcard
+# table (bytes): Strategy table
+#
+# Outputs:
+# player_action (string): 'H', 'S', 'D' or 'SPLIT', always one of options
+
+def strategy_action(playerHand, options, dealer_upcard, table=STRATEGY_TABLE):
+    # the engine only offers SPLIT on a pair
+    pair = CARD_VALUE[playerHand.hand_cards[0]] if 'SPLIT' in options else 0
+    soft = 1 if playerHand.best_total != playerHand.hard_total else 0
+
+    entry = table[((pair*2 + soft)*NUM_TOTALS + playerHand.best_total)*NUM_VALUES + CARD_VALUE[dealer_upcard] - 1]
+
+    return (ACTIONS_DOUBLE if 'D' in options else ACTIONS_NO_DOUBLE)[entry]
+
+
+## BASIC_STRATEGY_POLICY method ##
+##
+# Inputs:
+# kind (string): 'insurance', 'first' or 'next'
+# Player (Bro)
+# playerHand (HandClass)
+# options (tuple): allowed actions
+# dealer_upcard (int): Card code of the dealer's upcard
+# table (bytes): Strategy table, e.g. rules_strategy_table(rules)
+#
+# Outputs:
+# player_action (string)
+# Decision callback for play_round(). Never takes insurance.
+
+def basic_strategy_policy(kind, Player, playerHand, options, dealer_upcard, table=STRATEGY_TABLE):
+    if kind == 'insurance':
+        return 'N'
+    return strategy_action(playerHand, options, dealer_upcard, table)
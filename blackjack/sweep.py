@@ -0,0 +1,263 @@
+### BLACKJACK RULE SWEEP ###
+# House edge of every combination of a grid of table rules (engine.Rules), by Monte Carlo
+# simulation (sim.py). The tasks of all combinations go to one process pool. Every
+# combination plays the same task seeds, so rule sets are compared on the same shoes and the
+# differences between them are measured more precisely than the edges themselves.
+#
+# Every finished task is appended to a ledger (PREFIX.jsonl, one JSON line per task) as soon as it
+# completes. A sweep that is interrupted and run again with the same arguments only plays the tasks
+# missing from the ledger. The house edge table (PREFIX.csv) is written from the ledger at the end.
+# A task is keyed by everything that changes its outcome (rules, seed, task No. and size, policy,
+# bets, shuffler, CSM, ledger version), so a run with other settings never reuses the rows of an earlier one.
+#
+# Only the main game is played (no sidebets). The basic policy plays the strategy table for each rule
+# set (strategy.rules_strategy_table()), so every row is the edge of its rules under their own basic strategy.
+#
+# Usage: python -m blackjack.sweep --rounds 10000000 --workers 32 --dealer S17,H17 --blackjack 3:2,6:5 --decks 1,2,6,8
+
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from blackjack.engine import parse_rules, payout_ratio
+from blackjack.sim import POLICIES, SimStats, mean_ci, simulate_task
+from blackjack.strategy import rules_strategy_table
+
+
+# SimStats fields kept in the ledger
+LEDGER_FIELDS = ('rounds', 'main_sum', 'main_sum_sq', 'splits', 'doubles', 'blackjacks')
+
+# Ledger fields of a task's key
+KEY_FIELDS = ('rules', 'seed', 'task', 'task_rounds', 'policy', 'bets', 'shuffler', 'csm', 'version')
+
+# Rows of earlier versions are played again: before version 2, basic strategy was the S17 chart under every rule set
+LEDGER_VERSION = 2
+
+BETS = (10.0, 0.0, 0.0)     # main game only
+
+TABLE_COLUMNS = ('rules', 'decks', 'dealer', 'blackjack', 'das', 'max_hands', 'double', 'rounds', 'house_edge_pct', 'ci95_pct',
+                 'splits_pct', 'doubles_pct')
+
+
+## RULE_GRID method ##
+##
+# Inputs:
+# decks, dealer, blackjack, das, max_hands, double (list): Values of each rule, as parse_rules() tokens. e.g. dealer = ['S17', 'H17']
+# penetration (float)
+#
+# Outputs:
+# grid (list): Rules of every combination, in product order, without duplicates
+
+def rule_grid(decks, dealer, blackjack, das, max_hands, double, penetration=0.5):
+    grid = []
+    for values in itertools.product(decks, dealer, blackjack, das, max_hands, double):
+        rules = parse_rules('%sD %s %s %s SP%s %s PEN%s' % (values + (penetration,)))
+        if rules not in grid:
+            grid.append(rules)
+    return grid
+
+
+## TASK_KEY method ##
+##
+# Inputs:
+# task (tuple): sim.simulate_task() task
+#
+# Outputs:
+# key (tuple): Ledger key of the task, in KEY_FIELDS order
+
+def task_key(task):
+    seed, task_index, rounds, shoes, rules, bets, policy, shuffler, history, csm, profile = task
+    return (str(rules), seed, task_index, rounds, policy, tuple(bets), shuffler, csm, LEDGER_VERSION)
+
+
+## LOAD_LEDGER method ##
+##
+# Inputs:
+# path (string): Ledger file. Need not exist.
+#
+# Outputs:
+# done (dict): task_key() -> SimStats of every finished task
+# A line cut short by an interruption, or written before the key had every field, is ignored and its task played again.
+
+def load_ledger(path):
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                key = tuple(entry[name] for name in KEY_FIELDS)
+            except (ValueError, KeyError):
+                continue
+            stats = SimStats()
+            for name in LEDGER_FIELDS:
+                setattr(stats, name, entry[name])
+            done[key[:5] + (tuple(key[5]),) + key[6:]] = stats
+
+    return done
+
+
+## LEDGER_ENDS_LINE method ##
+##
+# Inputs:
+# path (string): Ledger file, not empty
+#
+# Outputs:
+# ends_line (bool): True if the file ends with a newline
+
+def ledger_ends_line(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read() == b'\n'
+
+
+## LEDGER_LINE method ##
+##
+# Inputs:
+# key (tuple): task_key() of the task
+# stats (SimStats): Result of the task
+#
+# Outputs:
+# line (string): JSON line of the ledger
+
+def ledger_line(key, stats):
+    entry = dict(zip(KEY_FIELDS, key))
+    entry.update((name, getattr(stats, name)) for name in LEDGER_FIELDS)
+    return json.dumps(entry) + '\n'
+
+
+## SWEEP method ##
+##
+# Inputs:
+# grid (list): Rules to evaluate
+# rounds (int): Rounds per rule set
+# workers (int): No. of worker processes. 1 runs in this process.
+# seed (int): Master seed, shared by all rule sets
+# task_size (int): Rounds per task
+# policy (string): Name of the decision policy in sim.POLICIES
+# ledger_path (string): Ledger of finished tasks, appended to and resumed from
+#
+# Outputs:
+# results (dict): rules spec -> merged SimStats
+
+def sweep(grid, rounds, workers=1, seed=0, task_size=100000, policy='basic', ledger_path='sweep.jsonl'):
+    if policy not in POLICIES:
+        raise ValueError("Unknown policy %r, expected one of %s" % (policy, sorted(POLICIES)))
+
+    done = load_ledger(ledger_path)
+    tasks = {}
+    for rules in grid:
+        for task_index, start in enumerate(range(0, rounds, task_size)):
+            task = (seed, task_index, min(task_size, rounds - start), 0, rules, BETS, policy, 'mt', None, False, False)
+            tasks[task_key(task)] = task
+    keys = {key: task for key, task in tasks.items() if key not in done}
+
+    if keys:
+        print("%d of %d tasks to play" % (len(keys), len(grid)*(-(-rounds // task_size))))
+
+    with open(ledger_path, 'a') as ledger:
+        # end a line cut short by an interruption, so the next row starts on a line of its own
+        if ledger.tell() and not ledger_ends_line(ledger_path):
+            ledger.write('\n')
+        if workers == 1:
+            for key, task in keys.items():
+                done[key] = simulate_task(task)
+                ledger.write(ledger_line(key, done[key]))
+                ledger.flush()
+        elif keys:
+            # work the strategy tables out once, forked workers inherit them
+            if policy == 'basic':
+                for rules in set(task[4] for task in keys.values()):
+                    rules_strategy_table(rules)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(simulate_task, task): key for key, task in keys.items()}
+                try:
+                    for future in as_completed(futures):
+                        key = futures[future]
+                        done[key] = future.result()
+                        ledger.write(ledger_line(key, done[key]))
+                        ledger.flush()
+                except BaseException:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+
+    results = {str(rules): SimStats() for rules in grid}
+    for key in tasks:
+        results[key[0]].merge(done[key])
+    return results
+
+
+## WRITE_TABLE method ##
+##
+# Inputs:
+# path (string): CSV file. Replaced atomically.
+# grid (list): Rules, one row each
+# results (dict): rules spec -> SimStats
+#
+# Outputs:
+# rows (list): Table rows written, as dicts of TABLE_COLUMNS
+
+def write_table(path, grid, results):
+    rows = []
+    for rules in grid:
+        stats = results[str(rules)]
+        n = stats.rounds
+        mean, variance, half_width = mean_ci(stats.main_sum, stats.main_sum_sq, n)
+        rows.append({'rules': str(rules), 'decks': rules.num_decks, 'dealer': 'H17' if rules.hit_soft_17 else 'S17',
+                     'blackjack': payout_ratio(rules.blackjack_payout), 'das': int(rules.double_after_split), 'max_hands': rules.max_hands,
+                     'double': rules.double_on, 'rounds': n, 'house_edge_pct': '%.4f' % (-100*mean), 'ci95_pct': '%.4f' % (100*half_width),
+                     'splits_pct': '%.3f' % (100*stats.splits/n), 'doubles_pct': '%.3f' % (100*stats.doubles/n)})
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, TABLE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(temp_path, path)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="House edge of a grid of blackjack rule sets")
+    parser.add_argument('--rounds', type=int, default=1000000, help="No. of rounds per rule set")
+    parser.add_argument('--workers', type=int, default=1, help="No. of worker processes")
+    parser.add_argument('--seed', type=int, default=0, help="Master seed, shared by all rule sets")
+    parser.add_argument('--task-size', type=int, default=100000, help="Rounds per task (the unit of resuming)")
+    parser.add_argument('--policy', default='basic', choices=sorted(POLICIES), help="Player decision policy")
+    parser.add_argument('--decks', default='8', help="Comma-separated deck counts")
+    parser.add_argument('--dealer', default='S17,H17', help="Comma-separated dealer rules: S17, H17")
+    parser.add_argument('--blackjack', default='3:2,6:5', help="Comma-separated blackjack payouts")
+    parser.add_argument('--das', default='NDAS,DAS', help="Comma-separated double after split rules: NDAS, DAS")
+    parser.add_argument('--max-hands', default='2', help="Comma-separated max. No. of hands after splitting (2 = no resplit)")
+    parser.add_argument('--double', default='DA', help="Comma-separated double rules: DA, D9-11, D10-11")
+    parser.add_argument('--penetration', type=float, default=0.5, help="Fraction of the shoe dealt before the cut card")
+    parser.add_argument('--out', default='sweep', help="Output prefix: PREFIX.jsonl ledger and PREFIX.csv table")
+    args = parser.parse_args()
+
+    if args.rounds < 1 or args.task_size < 1:
+        parser.error("--rounds and --task-size must be > 0")
+    try:
+        grid = rule_grid(args.decks.split(','), args.dealer.split(','), args.blackjack.split(','), args.das.split(','),
+                         args.max_hands.split(','), args.double.split(','), args.penetration)
+    except ValueError as error:
+        parser.error(str(error))
+    print("%d rule sets x %d rounds" % (len(grid), args.rounds))
+
+    start = time.perf_counter()
+    results = sweep(grid, args.rounds, args.workers, args.seed, args.task_size, args.policy, args.out + '.jsonl')
+    rows = write_table(args.out + '.csv', grid, results)
+    print("Time: %.1fs\n" % (time.perf_counter() - start))
+
+    print("%-36s %12s %10s" % ("Rules", "House edge %", "+/- 95%"))
+    for row in rows:
+        print("%-36s %12s %10s" % (row['rules'], row['house_edge_pct'], row['ci95_pct']))
+
+
+if __name__ == '__main__':
+    main()
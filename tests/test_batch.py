@@ -0,0 +1,17 @@
+### BATCH SCORER TESTS ###
+# Run with: python -m pytest tests
+
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from blackjack.batch import verify_sidebets_batch, verify_sum_cards_batch
+
+
+def test_sum_cards_batch_matches_sum_cards():
+    assert verify_sum_cards_batch() == 13**2 + 13**3 + 13**4 + 13**5
+
+
+def test_sidebets_batch_matches_engine_sidebets():
+    assert verify_sidebets_batch() == 52**3
@@ -0,0 +1,45 @@
+### CHECKPOINT TESTS ###
+# Run with: python -m pytest tests
+
+
+import random
+
+import pytest
+
+from blackjack.checkpoint import restore_session, session_state
+from blackjack.engine import Bro
+from blackjack.rng import MTShuffler
+from blackjack.shoe import ContinuousShoe, Shoe
+
+
+## Deal rounds of 5 cards from deck, shuffling when due. Returns the cards dealt.
+def deal_rounds(deck, rounds):
+    dealt = []
+    for _ in range(rounds):
+        if deck.needs_shuffle():
+            deck.shuffle()
+        dealt.append(bytes(deck.deal() for _ in range(5)))
+        deck.discard()
+    return dealt
+
+
+@pytest.mark.parametrize('csm', [False, True])
+@pytest.mark.parametrize('seed', [None, 42])
+def test_restore_deals_the_same_cards(csm, seed):
+    random.seed(7)
+    rng = MTShuffler(seed)
+    deck = ContinuousShoe(2, rng) if csm else Shoe(2, rng, penetration=0.75)
+    Player = Bro('player', 1000)
+    Player.balance = 1234.5
+    Player.prev_bets[0] = 20.0
+    deal_rounds(deck, 30)
+
+    data = session_state(Player, deck, 30)
+    expected = deal_rounds(deck, 200)
+
+    random.seed(99)
+    restored, restored_deck, rounds = restore_session(data)
+    assert (rounds, restored.balance, restored.init_balance, restored.prev_bets[0]) == (30, 1234.5, 1000, 20.0)
+    assert deal_rounds(restored_deck, 200) == expected
+    # restoring draws from a private source, the random module is left alone
+    assert random.random() == random.Random(99).random()
@@ -0,0 +1,119 @@
+### CLI TESTS ###
+# Run with: python -m pytest tests
+
+
+import random
+
+import blackjack.cli
+from blackjack.cli import action_prompt, get_auto_decision, start_game
+from blackjack.engine import HandClass, parse_rules
+from blackjack.ev import VALUE_CODES
+from blackjack.strategy import rules_strategy_table
+
+
+## SCRIPTEDRENDERER class ##
+##
+# Plays the console game with random answers, picking hand actions only among those the prompt offers
+#
+# Attributes:
+# rng (random.Random): Answer source
+# rounds (int): No. of rounds to play
+# hints (string): Answer to showing optimal move hints, 'y' or 'n'
+# lines (list): Output
+
+class ScriptedRenderer:
+    def __init__(self, seed, rounds, hints='n'):
+        self.rng = random.Random(seed)
+        self.rounds = rounds
+        self.hints = hints
+        self.lines = []
+
+    def line(self, text=''):
+        self.lines.append(text)
+
+    def pause(self, seconds):
+        pass
+
+    def clear(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def ask(self, prompt):
+        if 'Deposit' in prompt:
+            return '1000000'
+        if 'hints' in prompt:
+            return self.hints
+        if 'Auto-play' in prompt or 'exit the game' in prompt:
+            return 'n'
+        if 'Place Bet' in prompt:
+            return '10'
+        if 'insurance' in prompt:
+            return self.rng.choice('yn')
+        if 'Play another' in prompt:
+            self.rounds -= 1
+            return 'y' if self.rounds > 0 else 'n'
+        # hand actions: split whenever offered, to reach resplits
+        if 'Split (split)' in prompt:
+            return 'split'
+        actions = [answer for name, answer in (('Hit (h)', 'h'), ('Double Down (d)', 'd'), ('Stand (s)', 's')) if name in prompt]
+        return self.rng.choice(actions)
+
+
+def test_action_prompt():
+    assert action_prompt(('H', 'S', 'EXIT')) == ('\nHit (h)/ Stand (s) or exit: ', "'h', 's' or 'exit'")
+    assert action_prompt(('H', 'S', 'D', 'SPLIT', 'EXIT'))[0] == '\nHit (h)/ Double Down (d)/ Split (split)/ Stand (s) or exit: '
+
+
+def test_prompts_follow_non_default_rules():
+    random.seed(1)
+    renderer = ScriptedRenderer(1, 3000)
+    start_game(renderer, rules=parse_rules('1D DAS SP4 D10-11 PEN0.75'))
+    output = '\n'.join(renderer.lines)
+    assert 'HAND #4 WINNINGS' in output
+    assert 'Invalid response' not in output
+
+
+def test_hints_follow_non_default_rules():
+    random.seed(2)
+    renderer = ScriptedRenderer(2, 300, hints='y')
+    start_game(renderer, rules=parse_rules('2D H17 6:5 DAS SP4'))
+    output = '\n'.join(renderer.lines)
+    assert 'Optimal move: Split' in output
+    assert 'HAND #3 WINNINGS' in output
+
+
+def test_hints_see_the_hole_card_after_a_refill(monkeypatch):
+    # a deep cut in one deck runs the shoe out mid-round now and then
+    hinted, holes = [], []
+    print_optimal_move, print_winnings = blackjack.cli.print_optimal_move, blackjack.cli.print_winnings
+
+    def keep_hint(deck, hole_card, *args):
+        hinted.append(hole_card)
+        return print_optimal_move(deck, hole_card, *args)
+
+    def keep_hole(Player, result, renderer):
+        holes.extend([result.dealer_hand.hand_cards[1]] * (len(hinted) - len(holes)))
+        return print_winnings(Player, result, renderer)
+
+    refills = []
+    refill = blackjack.cli.Shoe._refill
+    monkeypatch.setattr(blackjack.cli, 'print_optimal_move', keep_hint)
+    monkeypatch.setattr(blackjack.cli, 'print_winnings', keep_hole)
+    monkeypatch.setattr(blackjack.cli.Shoe, '_refill', lambda deck: refills.append(refill(deck)))
+    random.seed(3)
+    start_game(ScriptedRenderer(3, 300, hints='y'), rules=parse_rules('1D PEN0.95'))
+    assert refills
+    assert hinted == holes
+
+
+def test_auto_play_uses_the_table_for_the_rules():
+    hand = HandClass('Hand #1')
+    hand.add_card(VALUE_CODES[5])
+    hand.add_card(VALUE_CODES[6])
+    renderer = ScriptedRenderer(0, 0)
+    # 11 against an Ace: hit when the dealer stands on soft 17, double when the dealer hits it
+    assert get_auto_decision('first', None, hand, ('H', 'S', 'D', 'EXIT'), VALUE_CODES[1], renderer) == 'H'
+    table = rules_strategy_table(parse_rules('H17'))
+    assert get_auto_decision('first', None, hand, ('H', 'S', 'D', 'EXIT'), VALUE_CODES[1], renderer, table) == 'D'
@@ -0,0 +1,81 @@
+### DEALER PROBABILITY TESTS ###
+# Run with: python -m pytest tests
+
+
+import itertools
+
+import pytest
+
+from blackjack.cards import DECK_TEMPLATE
+from blackjack.dealer import BLACKJACK, OUTCOMES, cards_composition, dealer_outcome_probs, dealer_probabilities, full_composition, remove_values
+from blackjack.engine import Bro, HandClass, play_dealer
+from blackjack.ev import VALUE_CODES
+
+
+# Published S17 dealer outcomes (infinite deck, no peek), upcard -> 17, 18, 19, 20, 21, blackjack, bust.
+# An 8-deck shoe's are within 0.002 of these (the card removal of the upcard and the draws).
+PUBLISHED_S17 = {
+    2:  (0.139809, 0.134904, 0.129880, 0.124025, 0.118218, 0.0, 0.353165),
+    6:  (0.165438, 0.106267, 0.106267, 0.101425, 0.097221, 0.0, 0.423382),
+    10: (0.111424, 0.111424, 0.111424, 0.342194, 0.034501, 0.076923, 0.212109),
+    1:  (0.130789, 0.130789, 0.130789, 0.130789, 0.053107, 0.307692, 0.116046),
+}
+
+
+## CARDSTACK class ##
+##
+# Deals the given cards in order, like a Shoe
+#
+# Attributes:
+# cards (list): Card codes left to deal
+
+class CardStack:
+    def __init__(self, cards):
+        self.cards = list(cards)
+
+    def deal(self):
+        return self.cards.pop(0)
+
+
+@pytest.mark.parametrize('num_decks', [1, 8])
+@pytest.mark.parametrize('upcard', range(1, 11))
+def test_outcomes_sum_to_one(num_decks, upcard):
+    composition = remove_values(full_composition(num_decks), (upcard,))
+    assert sum(dealer_outcome_probs(upcard, composition)) == pytest.approx(1.0)
+    no_blackjack = dealer_outcome_probs(upcard, composition, no_blackjack=True)
+    assert sum(no_blackjack) == pytest.approx(1.0)
+    assert no_blackjack[BLACKJACK] == 0.0
+
+
+@pytest.mark.parametrize('upcard', sorted(PUBLISHED_S17))
+def test_matches_published_s17_table(upcard):
+    composition = remove_values(full_composition(8), (upcard,))
+    assert dealer_outcome_probs(upcard, composition) == pytest.approx(PUBLISHED_S17[upcard], abs=2e-3)
+
+
+def test_composition_of_cards():
+    assert cards_composition(DECK_TEMPLATE * 8) == full_composition(8)
+    assert dealer_probabilities(10, (0,)*9 + (3,)) == {17: 0.0, 18: 0.0, 19: 0.0, 20: 1.0, 21: 0.0, 'blackjack': 0.0, 'bust': 0.0}
+
+
+@pytest.mark.parametrize('hit_soft_17', [False, True])
+@pytest.mark.parametrize('upcard', [1, 6])
+def test_matches_play_dealer_on_every_order(upcard, hit_soft_17):
+    # every order of a few unseen cards, played out by the engine's dealer
+    unseen = (1, 2, 4, 5, 6, 10, 10)
+    counts = dict.fromkeys(OUTCOMES, 0)
+    orders = list(itertools.permutations(unseen))
+    for order in orders:
+        Dealer = Bro('dealer', None)
+        Dealer.hands[0] = dealerHand = HandClass('Dealer Hand #1')
+        dealerHand.add_card(VALUE_CODES[upcard])
+        dealerHand.add_card(VALUE_CODES[order[0]])
+        if dealerHand.best_total == 21:
+            counts['blackjack'] += 1
+            continue
+        play_dealer(Dealer, CardStack(VALUE_CODES[value] for value in order[1:]), None, None, hit_soft_17)
+        counts['bust' if dealerHand.best_total > 21 else dealerHand.best_total] += 1
+
+    composition = cards_composition(VALUE_CODES[value] for value in unseen)
+    expected = dealer_probabilities(upcard, composition, hit_soft_17=hit_soft_17)
+    assert {outcome: count / len(orders) for outcome, count in counts.items()} == pytest.approx(expected)
@@ -0,0 +1,212 @@
+### ROUND ENGINE TESTS ###
+# Run with: python -m pytest tests
+
+
+import itertools
+
+import pytest
+
+from blackjack.cards import card_code
+from blackjack.engine import (MAIN, BLACKJACK, INSURANCE, BUST, STAND, STAND_BLACKJACK, STAND_INSURANCE, DEFAULT_RULES, Bro,
+                              HandClass, Rules, compare_player_dealer, parse_rules, play_dealer, play_round)
+
+
+## FIXEDSHOE class ##
+##
+# Deals the given cards in order, like a Shoe. Round order: player, dealer, player, dealer (hole card), then draws.
+#
+# Attributes:
+# cards (list): Card codes left to deal
+
+class FixedShoe:
+    def __init__(self, faces):
+        self.cards = [card_code(face, 'Hearts') for face in faces]
+
+    def deal(self):
+        return self.cards.pop(0)
+
+    def discard(self):
+        pass
+
+
+## Answer the engine's decisions in the given order
+def scripted(*actions):
+    answers = list(actions)
+
+    def decide(kind, Player, playerHand, options, dealer_upcard):
+        action = answers.pop(0)
+        assert action in options
+        return action
+    return decide
+
+
+## Play one round with a main bet of 10 from a balance of 1000. Returns the player and the RoundResult.
+def play(faces, *actions, rules=DEFAULT_RULES):
+    Player = Bro('player', 1000.0)
+    Player.hands[0] = HandClass('Hand #1')
+    Player.hands[0].bets[MAIN] = 10.0
+    deck = FixedShoe(faces)
+    result = play_round(Player, deck, scripted(*actions), rules=rules)
+    assert deck.cards == []
+    return Player, result
+
+
+def test_blackjack_pays_three_to_two():
+    Player, result = play(['A', '10', 'K', '7'])
+    assert result.hands[0].hand_status == STAND_BLACKJACK
+    assert result.balance_delta == 15.0
+    assert result.hands[0].outcome == 'win'
+
+
+def test_blackjack_against_blackjack_pushes():
+    Player, result = play(['A', 'A', 'K', 'K'], 'N')
+    assert result.hands[0].hand_status == STAND_INSURANCE
+    assert result.hands[0].outcome == 'push'
+    assert result.balance_delta == 0.0
+
+
+def test_insurance():
+    # insured against a dealer blackjack: the side bet pays 2:1, the main bet is lost
+    Player, result = play(['10', 'A', '9', 'K'], 'Y')
+    assert result.hands[0].hand_winnings[INSURANCE] == 10.0
+    assert result.hands[0].outcome == 'lose'
+    assert result.balance_delta == 0.0
+
+    # no dealer blackjack: the insurance is lost and the hand plays on
+    Player, result = play(['10', 'A', '9', '7'], 'Y', 'S')
+    assert result.hands[0].hand_winnings[INSURANCE] == -5.0
+    assert result.hands[0].outcome == 'win'
+    assert result.balance_delta == 5.0
+
+
+def test_split():
+    # 8,8 against 6: Hand #1 draws 3 and hits to 20, Hand #2 draws 10 and stands. The dealer busts 16.
+    Player, result = play(['8', '6', '8', '10', '3', '10', '9', '10'], 'SPLIT', 'H', 'S', 'S')
+    assert [hand.hand_cards for hand in result.hands] == [[card_code(face, 'Hearts') for face in faces] for faces in (('8', '3', '9'), ('8', '10'))]
+    assert [hand.actions for hand in result.hands] == [['SPLIT', 'H', 'S'], ['S']]
+    assert [hand.outcome for hand in result.hands] == ['dealer_bust', 'dealer_bust']
+    assert result.balance_delta == 20.0
+
+
+def test_split_21_is_a_blackjack():
+    # A,A against 9: Hand #1 draws K and is paid 3:2, Hand #2 draws 5 and stands on soft 16 against 17
+    Player, result = play(['A', '9', 'A', '8', 'K', '5'], 'SPLIT', 'S')
+    assert result.hands[0].hand_status == STAND_BLACKJACK
+    assert result.hands[0].hand_winnings[BLACKJACK] == 5.0
+    assert [hand.outcome for hand in result.hands] == ['win', 'lose']
+    assert result.balance_delta == 5.0
+
+
+def test_double():
+    Player, result = play(['6', '9', '5', '7', '10', '2'], 'D')
+    assert result.hands[0].bets[MAIN] == 20.0
+    assert result.hands[0].hand_status == STAND
+    assert result.hands[0].outcome == 'win'
+    assert result.balance_delta == 20.0
+
+
+def test_bust_and_push():
+    # the dealer draws nothing when every hand is bust
+    Player, result = play(['10', '10', '6', '6', '10'], 'H')
+    assert result.hands[0].hand_status == BUST
+    assert result.dealer_hand.hand_cards == [card_code('10', 'Hearts'), card_code('6', 'Hearts')]
+    assert result.balance_delta == -10.0
+
+    Player, result = play(['10', '10', '8', '8'], 'S')
+    assert result.hands[0].outcome == 'push'
+    assert result.balance_delta == 0.0
+
+
+def test_exit_forfeits_the_round():
+    Player, result = play(['10', '10', '8', '8'], 'EXIT')
+    assert result.exited
+    assert result.balance_delta == -10.0
+
+
+def test_rules_round_trip():
+    assert str(DEFAULT_RULES) == '8D S17 3:2 NDAS SP2 DA PEN0.5'
+    assert parse_rules(str(DEFAULT_RULES)) == DEFAULT_RULES
+    for spec in ('1D H17 6:5 DAS SP4 D10-11 PEN0.75', '2d,h17,7:5,d9-11,ins5:2', '6D S17 1:1 SP1'):
+        rules = parse_rules(spec)
+        assert parse_rules(str(rules)) == rules
+        assert str(parse_rules(str(rules))) == str(rules)
+    assert parse_rules('6D H17 DAS').num_decks == 6
+    assert parse_rules('INS5:2').insurance_payout == 2.5
+    assert parse_rules('H17', base=parse_rules('1D')) == Rules(num_decks=1, hit_soft_17=True)
+
+
+@pytest.mark.parametrize('spec', ['H18', 'SPX', '3:0D', 'SP5', 'PEN1'])
+def test_invalid_rules(spec):
+    with pytest.raises(ValueError):
+        parse_rules(spec)
+
+
+## Dealer's cards after play_dealer() from the given faces, the rest drawn from draws
+def dealer_draws(faces, draws, hit_soft_17):
+    Dealer = Bro('dealer', None)
+    Dealer.hands[0] = HandClass('Dealer Hand #1')
+    for face in faces:
+        Dealer.hands[0].add_card(card_code(face, 'Clubs'))
+    play_dealer(Dealer, FixedShoe(draws), None, None, hit_soft_17)
+    return [card_code(face, 'Clubs') for face in faces] + [card_code(face, 'Hearts') for face in draws], Dealer.hands[0].hand_cards
+
+
+def test_dealer_hits_soft_17_only_under_h17():
+    # soft 17 of two, three and four cards
+    for faces in (['A', '6'], ['A', '2', '4'], ['A', '4', 'A', 'A']):
+        dealt, held = dealer_draws(faces, ['3'], False)
+        assert held == dealt[:-1]
+        dealt, held = dealer_draws(faces, ['3'], True)
+        assert held == dealt
+    # hard 17, with and without an Ace, and soft 18
+    for faces in (['10', '7'], ['A', '6', '10'], ['A', '7']):
+        for hit_soft_17 in (False, True):
+            dealt, held = dealer_draws(faces, [], hit_soft_17)
+            assert held == dealt
+
+
+def test_h17_round():
+    # 18 against 6 with an Ace in the hole: the dealer stands on soft 17 under S17, draws to 20 under H17
+    Player, result = play(['10', '6', '8', 'A'], 'S')
+    assert result.balance_delta == 10.0
+    Player, result = play(['10', '6', '8', 'A', '3'], 'S', rules=parse_rules('H17'))
+    assert result.dealer_hand.best_total == 20
+    assert result.balance_delta == -10.0
+
+
+## The baseline's settlement (compare_player_dealer() of blackjack_cli_v5.1.py before the package), without its messages
+def baseline_winnings(player_best, dealer_best, main_bet, blackjack_hand, blackjack_bet, blackjack_payoff):
+    if player_best > 21:
+        return -main_bet, 0.0
+    if dealer_best > 21:
+        return main_bet, blackjack_hand * blackjack_payoff * blackjack_bet
+    if dealer_best > player_best:
+        return -main_bet, 0.0
+    if dealer_best == player_best:
+        return 0.0, 0.0
+    return main_bet, blackjack_hand * blackjack_payoff * blackjack_bet
+
+
+## Hands of two or three cards of the given faces
+def hands(faces):
+    for num_cards in (2, 3):
+        for cards in itertools.combinations_with_replacement(faces, num_cards):
+            hand = HandClass('Hand')
+            for face in cards:
+                hand.add_card(card_code(face, 'Spades'))
+            yield hand
+
+
+def test_compare_player_dealer_matches_the_baseline():
+    payoffs = DEFAULT_RULES.payoffs()
+    faces = ('2', '5', '6', '7', '9', '10', 'A')
+    for playerHand in hands(faces):
+        playerHand.blackjack_hand = int(len(playerHand.hand_cards) == 2 and playerHand.best_total == 21)
+        playerHand.bets[MAIN] = 10.0
+        playerHand.bets[BLACKJACK] = 10.0 * playerHand.blackjack_hand
+        for dealerHand in hands(faces):
+            expected = baseline_winnings(playerHand.best_total, dealerHand.best_total, 10.0, playerHand.blackjack_hand,
+                                         playerHand.bets[BLACKJACK], payoffs['blackjack'])
+            playerHand.hand_winnings[MAIN] = playerHand.hand_winnings[BLACKJACK] = 0.0
+            compare_player_dealer(playerHand, dealerHand, payoffs)
+            assert (playerHand.hand_winnings[MAIN], playerHand.hand_winnings[BLACKJACK]) == pytest.approx(expected)
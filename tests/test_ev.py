@@ -0,0 +1,93 @@
+### EV SOLVER TESTS ###
+# Run with: python -m pytest tests
+
+
+import pytest
+
+from blackjack.dealer import full_composition, remove_values
+from blackjack.engine import parse_rules
+from blackjack.ev import VALUE_CODES, action_evs, check_strategy_table, compile_ev_strategy
+from blackjack.strategy import ACTIONS_DOUBLE, ACTIONS_NO_DOUBLE, STRATEGY_TABLE, rules_strategy_table
+
+
+## Composition with only count cards of each given value
+def only(**counts):
+    composition = [0]*10
+    for name, count in counts.items():
+        composition[int(name[1:]) - 1] = count
+    return tuple(composition)
+
+
+## Card codes of a hand of blackjack values
+def hand(*values):
+    return [VALUE_CODES[value] for value in values]
+
+
+def test_all_tens_shoe():
+    # every card left is a ten: 20 pushes the dealer's 20, a hit busts
+    evs = action_evs(hand(10, 10), VALUE_CODES[10], only(v10=20))
+    assert evs == pytest.approx({'H': -1.0, 'S': 0.0, 'D': -2.0, 'SPLIT': 0.0})
+
+    # 12 against a 6: the dealer's 16 draws a ten and busts
+    evs = action_evs(hand(2, 10), VALUE_CODES[6], only(v10=20), ('H', 'S'))
+    assert evs == pytest.approx({'H': -1.0, 'S': 1.0})
+
+
+def test_split_21_is_paid_as_blackjack():
+    # each Ace draws a ten, two hands of 21 paid 3:2 against a dealer 16 that can't have blackjack
+    evs = action_evs(hand(1, 1), VALUE_CODES[6], only(v10=20), ('H', 'S', 'SPLIT'))
+    assert evs['SPLIT'] == pytest.approx(3.0)
+    evs = action_evs(hand(1, 1), VALUE_CODES[6], only(v10=20), ('H', 'S', 'SPLIT'), rules=parse_rules('6:5'))
+    assert evs['SPLIT'] == pytest.approx(2.4)
+
+
+def test_soft_17_rule():
+    # 18 against an Ace, a 6 and a 4 unseen. A 4 in the hole makes the dealer 21 either way. A 6 makes soft 17:
+    # S17 stands and loses to 18, H17 draws the 4 to 21.
+    unseen = only(v6=1, v4=1)
+    s17 = action_evs(hand(10, 8), VALUE_CODES[1], unseen, ('S',))['S']
+    h17 = action_evs(hand(10, 8), VALUE_CODES[1], unseen, ('S',), rules=parse_rules('H17'))['S']
+    assert (s17, h17) == pytest.approx((0.0, -1.0))
+
+
+def test_split_rules():
+    full = full_composition(8)
+    unseen = remove_values(full, (8, 8, 6))
+    evs = {spec: action_evs(hand(8, 8), VALUE_CODES[6], unseen, rules=parse_rules(spec))['SPLIT'] for spec in ('NDAS SP2', 'DAS SP2', 'NDAS SP4', 'DAS SP4')}
+    assert evs['NDAS SP2'] < evs['DAS SP2'] < evs['DAS SP4']
+    assert evs['NDAS SP2'] < evs['NDAS SP4'] < evs['DAS SP4']
+    # with 3 hands in play a split makes the 4th, and neither hand may split again
+    assert action_evs(hand(8, 8), VALUE_CODES[6], unseen, rules=parse_rules('SP4'), num_hands=3)['SPLIT'] == pytest.approx(evs['NDAS SP2'])
+
+
+def test_two_card_composition():
+    # 16 against a ten, a 5 and a ten unseen. Standing wins when the 5 is the hole card (the dealer's 15 draws the ten).
+    evs = action_evs(hand(6, 10), VALUE_CODES[10], only(v5=1, v10=1), ('H', 'S'))
+    assert evs == pytest.approx({'H': 0.0, 'S': 0.0})
+    assert action_evs(hand(6, 10), VALUE_CODES[10], only(v5=1, v10=1), ('H', 'S'), exact=True) == pytest.approx(evs)
+
+
+def test_hard_11_against_a_ten_depends_on_the_cards():
+    full = full_composition(8)
+    evs_4_7 = action_evs(hand(4, 7), VALUE_CODES[10], remove_values(full, (4, 7, 10)), ('H', 'S', 'D'))
+    evs_2_9 = action_evs(hand(2, 9), VALUE_CODES[10], remove_values(full, (2, 9, 10)), ('H', 'S', 'D'))
+    assert evs_4_7['D'] > evs_4_7['H']
+    assert evs_2_9['D'] < evs_2_9['H']
+
+
+def test_strategy_table_matches_solver():
+    assert check_strategy_table() == []
+
+
+def test_derived_table_plays_like_the_charts():
+    table = compile_ev_strategy()
+    assert [ACTIONS_DOUBLE[entry] for entry in table] == [ACTIONS_DOUBLE[entry] for entry in STRATEGY_TABLE]
+    assert [ACTIONS_NO_DOUBLE[entry] for entry in table] == [ACTIONS_NO_DOUBLE[entry] for entry in STRATEGY_TABLE]
+
+
+def test_rules_table_matches_solver():
+    rules = parse_rules('6D H17 DAS SP4')
+    table = rules_strategy_table(rules)
+    assert table != STRATEGY_TABLE
+    assert check_strategy_table(rules, table) == []
+    assert check_strategy_table(rules) != []
@@ -0,0 +1,79 @@
+### HAND HISTORY TESTS ###
+# Run with: python -m pytest tests
+
+
+import struct
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from blackjack.analytics import map_records, round_net
+from blackjack.engine import MAIN, Bro, HandClass, parse_rules, play_round
+from blackjack.history import FLAG_RESPLIT, HEADER_FORMAT, MAGIC, RECORD_SIZE, VERSION, HistoryWriter, read_history, record_actions, record_cards
+from blackjack.rng import MTShuffler
+from blackjack.shoe import Shoe
+from blackjack.strategy import basic_strategy_policy
+
+
+## Split whenever allowed, else basic strategy
+def split_policy(kind, Player, playerHand, options, dealer_upcard):
+    if 'SPLIT' in options:
+        return 'SPLIT'
+    return basic_strategy_policy(kind, Player, playerHand, options, dealer_upcard)
+
+
+## Play rounds that split whenever allowed and log them to path. Returns the RoundResult of every round.
+def play_logged(path, rules, rounds):
+    deck = Shoe(rules.num_decks, MTShuffler(4))
+    Player = Bro('player', 10**6)
+    results = []
+    with HistoryWriter(path) as writer:
+        for round_id in range(rounds):
+            if deck.needs_shuffle():
+                deck.shuffle()
+            Player.hands[0] = HandClass('Hand #1')
+            Player.hands[0].bets[MAIN] = 10.0
+            result = play_round(Player, deck, split_policy, rules=rules)
+            writer.write_round(round_id, result, Player.balance)
+            results.append(result)
+    return results
+
+
+def test_every_hand_keeps_its_cards_and_actions(tmp_path):
+    path = str(tmp_path / 'history.bjh')
+    results = play_logged(path, parse_rules('SP4 DAS'), 2000)
+
+    records = list(read_history(path))
+    assert len(records) == len(results)
+    for record, result in zip(records, results):
+        assert record_cards(record) == ([hand.hand_cards for hand in result.hands], result.dealer_hand.hand_cards)
+        assert record_actions(record) == [hand.actions for hand in result.hands]
+    assert any(len(result.hands) == 4 for result in results)
+    assert any(actions[:2] == ['SPLIT', 'SPLIT'] for record in records for actions in record_actions(record))
+
+
+def test_round_net_covers_resplit_hands(tmp_path):
+    path = str(tmp_path / 'history.bjh')
+    play_logged(path, parse_rules('SP4 DAS'), 5000)
+
+    records = map_records(path)
+    assert (records['flags'] & FLAG_RESPLIT).any()
+    nets = np.array([round_net(record) for record in records])
+    assert np.array_equal(np.diff(records['balance']), nets[1:])
+
+
+def test_writer_appends_only_to_its_own_layout(tmp_path):
+    path = str(tmp_path / 'history.bjh')
+    play_logged(path, parse_rules('SP4 DAS'), 10)
+    play_logged(path, parse_rules('SP4 DAS'), 10)
+    assert [record.round_id for record in read_history(path)] == list(range(10))*2
+
+    for header in (struct.pack(HEADER_FORMAT, MAGIC, VERSION - 1, RECORD_SIZE), b'not a log'):
+        old_path = str(tmp_path / 'old.bjh')
+        with open(old_path, 'wb') as f:
+            f.write(header)
+        with pytest.raises(ValueError):
+            HistoryWriter(old_path)
+        with open(old_path, 'rb') as f:
+            assert f.read() == header
@@ -0,0 +1,112 @@
+### SERVER PROTOCOL TESTS ###
+# Run with: python -m pytest tests
+
+
+import asyncio
+import socket
+
+from blackjack.server import LineChannel, SessionEnded, close_session, play_session
+
+
+## Serve one session on sock as serve() does: play it, then always close it with BYE
+async def serve_session(sock, session_id, checkpoint_dir, in_play):
+    reader, writer = await asyncio.open_connection(sock=sock)
+    channel = LineChannel(reader, writer, timeout=10)
+    Player = None
+    try:
+        Player = await play_session(channel, session_id, 8, 'test', checkpoint_dir=checkpoint_dir, in_play=in_play)
+    except (SessionEnded, ConnectionError):
+        pass
+    finally:
+        await close_session(channel, Player)
+
+
+## Answer every ASK with answer(prompt, lines so far) until the server closes. Returns all lines received.
+async def run_client(sock, answer):
+    reader, writer = await asyncio.open_connection(sock=sock)
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        lines.append(line.decode().rstrip('\n'))
+        if lines[-1].startswith('ASK '):
+            writer.write((answer(lines[-1].split()[1:], lines) + '\n').encode())
+            await writer.drain()
+    writer.close()
+    return lines
+
+
+## Play a session with a client over a socket pair
+async def session(session_id, checkpoint_dir, in_play, answer):
+    server_sock, client_sock = socket.socketpair()
+    served, lines = await asyncio.gather(serve_session(server_sock, session_id, checkpoint_dir, in_play), run_client(client_sock, answer))
+    return lines
+
+
+## Client: deposit (or resume), bet 10 and stand for the given No. of rounds, then quit
+def standing_player(deposit, rounds):
+    def answer(prompt, lines):
+        if prompt[0] == 'deposit':
+            return deposit
+        if prompt[0] == 'bet':
+            return '10'
+        if prompt[0] == 'insurance':
+            return 'N'
+        if prompt[0] in ('first', 'next'):
+            return 'S'
+        return 'Y' if sum(line.startswith('RESULT') for line in lines) < rounds else 'QUIT'
+    return answer
+
+
+## Lines of every round, from its BALANCE line on
+def rounds_of(lines):
+    starts = [i for i, line in enumerate(lines) if line.startswith('BALANCE')]
+    return [lines[start:end] for start, end in zip(starts, starts[1:] + [len(lines)])]
+
+
+def test_round_quit_and_resume(tmp_path):
+    async def play():
+        in_play = set()
+        straight = await session(1, str(tmp_path / 'a'), in_play, standing_player('1000', 2))
+        first = await session(1, str(tmp_path / 'b'), in_play, standing_player('1000', 1))
+        resumed = await session(2, str(tmp_path / 'b'), in_play, standing_player('RESUME 1', 1))
+        return straight, first, resumed
+
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    straight, first, resumed = asyncio.run(play())
+
+    assert straight[0] == 'WELCOME 1'
+    assert first[-1].startswith('BYE ') and resumed[-1].startswith('BYE ')
+    result = [line for line in first if line.startswith('RESULT')][0]
+    assert first[-1] == 'BYE %s %s' % (result.split()[2], max(1000.0, float(result.split()[2])))
+
+    # the resumed session picks up the balance and deals the cards the uninterrupted one dealt
+    assert resumed[:3] == ['WELCOME 2', 'ASK deposit', 'RESUMED 1']
+    assert rounds_of(resumed)[0][0] == 'BALANCE %s' % result.split()[2]
+    assert rounds_of(resumed)[0] == rounds_of(straight)[1]
+
+
+def test_quit_before_deposit(tmp_path):
+    lines = asyncio.run(session(1, None, set(), lambda prompt, lines: 'QUIT'))
+    assert lines == ['WELCOME 1', 'ASK deposit', 'BYE 0 0']
+
+
+def test_overlong_line_ends_session(tmp_path):
+    def answer(prompt, lines):
+        if prompt[0] in ('first', 'next'):
+            return 'S' * 70000
+        return standing_player('1000', 1)(prompt, lines)
+
+    lines = asyncio.run(session(1, str(tmp_path), set(), answer))
+    assert lines[-1] == 'BYE 990.0 1000.0'
+    assert not any(line.startswith('RESULT') for line in lines)
+    # the abandoned round is settled and checkpointed
+    assert (tmp_path / 'session-1.bjs').exists()
+
+
+def test_resume_bad_checkpoint(tmp_path):
+    (tmp_path / 'session-1.bjs').write_bytes(b'BJS1 not a checkpoint')
+    lines = asyncio.run(session(2, str(tmp_path), set(), lambda prompt, lines: 'RESUME 1' if len(lines) < 3 else 'QUIT'))
+    assert lines == ['WELCOME 2', 'ASK deposit', 'ERR bad checkpoint for session 1', 'ASK deposit', 'BYE 0 0']
@@ -0,0 +1,64 @@
+### SHOE TESTS ###
+# Run with: python -m pytest tests
+
+
+from blackjack.cards import DECK_TEMPLATE
+from blackjack.engine import MAIN, Bro, HandClass, parse_rules, play_round
+from blackjack.rng import MTShuffler
+from blackjack.shoe import Shoe
+from blackjack.sim import simulate
+from blackjack.strategy import basic_strategy_policy
+
+
+## Play rounds from deck. Returns the No. of rounds that ran out of cards and were refilled.
+def play_rounds(deck, rounds, rules=None):
+    Player = Bro('player', 10**9)
+    refills = 0
+    for _ in range(rounds):
+        if deck.needs_shuffle():
+            deck.shuffle()
+        Player.hands[0] = HandClass('Hand #1')
+        Player.hands[0].bets[MAIN] = 10.0
+        if rules is None:
+            play_round(Player, deck, basic_strategy_policy)
+        else:
+            play_round(Player, deck, basic_strategy_policy, rules=rules)
+        refills += deck._refilled
+        assert sorted(deck.cards) == sorted(DECK_TEMPLATE * deck.num_decks)
+    return refills
+
+
+def test_deep_cut_single_deck_refills_mid_round():
+    deck = Shoe(1, MTShuffler(1), penetration=0.95)
+    assert play_rounds(deck, 20000) > 0
+
+
+def test_deep_cut_single_deck_with_resplits():
+    rules = parse_rules('1D PEN0.95 SP4')
+    deck = Shoe(1, MTShuffler(2), penetration=rules.penetration)
+    assert play_rounds(deck, 20000, rules) > 0
+
+
+def test_refill_deals_the_discards_and_ends_the_shoe():
+    deck = Shoe(1, MTShuffler(3), penetration=0.95)
+    first = bytes(deck.cards)
+    for _ in range(50):
+        deck.deal()
+    deck.discard()
+    round_cards = [deck.deal() for _ in range(5)]
+    assert round_cards[:2] == list(first[50:])
+    assert all(card in first[:50] for card in round_cards[2:])
+    deck.discard()
+    assert deck.needs_shuffle() and deck.remaining() == 0
+
+    # replay deals the same refill
+    deck.replay(deck.seed)
+    for _ in range(50):
+        deck.deal()
+    deck.discard()
+    assert [deck.deal() for _ in range(5)] == round_cards
+
+
+def test_simulate_deep_cut_single_deck():
+    stats = simulate(rounds=20000, seed=1, rules=parse_rules('1D PEN0.95'), task_size=20000)
+    assert stats.rounds == 20000
@@ -0,0 +1,75 @@
+### SIDEBET ODDS TESTS ###
+# Run with: python -m pytest tests
+
+
+import itertools
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from blackjack.cards import DECK_TEMPLATE
+from blackjack.engine import check_perfect_pair, check_21_plus_3
+from blackjack.sidebet_odds import (SIDEBET_L_PAYOUTS, SIDEBET_R_PAYOUTS, code_counts, full_code_counts, perfect_pairs_odds,
+                                    twenty_one_plus_three_odds)
+
+
+## Closed-form Perfect Pairs probabilities of a full shoe: the second card against the first
+def pair_probabilities(num_decks):
+    others = 52*num_decks - 1
+    return {'perfect_pairs': (num_decks - 1) / others, 'coloured_pairs': num_decks / others, 'mixed_pairs': 2*num_decks / others}
+
+
+## Closed-form 21+3 probabilities of a full shoe, counted over ordered draws of three cards
+def triple_probabilities(num_decks):
+    total = (52*num_decks) * (52*num_decks - 1) * (52*num_decks - 2)
+    suited_trips = 52 * num_decks*(num_decks - 1)*(num_decks - 2)
+    same_rank = 13 * (4*num_decks)*(4*num_decks - 1)*(4*num_decks - 2)
+    # 12 straights (A-2-3 ... Q-K-A) in any order
+    straights = 12 * 6 * (4*num_decks)**3
+    straight_flushes = 4 * 12 * 6 * num_decks**3
+    same_suit = 4 * (13*num_decks)*(13*num_decks - 1)*(13*num_decks - 2)
+    return {'suited_trips': suited_trips / total, 'straight_flush': straight_flushes / total, 'trips': (same_rank - suited_trips) / total,
+            'straight': (straights - straight_flushes) / total, 'flush': (same_suit - straight_flushes - suited_trips) / total}
+
+
+@pytest.mark.parametrize('num_decks', [1, 8])
+def test_full_shoe_probabilities(num_decks):
+    counts = full_code_counts(num_decks)
+    for odds, expected, payouts in ((perfect_pairs_odds(counts), pair_probabilities(num_decks), SIDEBET_L_PAYOUTS),
+                                    (twenty_one_plus_three_odds(counts), triple_probabilities(num_decks), SIDEBET_R_PAYOUTS)):
+        for name, probability in expected.items():
+            assert odds['probabilities'][name] == pytest.approx(probability, rel=1e-12)
+        assert odds['probabilities']['lose'] == pytest.approx(1 - sum(expected.values()), rel=1e-12)
+        ev = sum(probability * (payouts[name] + 1) for name, probability in expected.items()) - 1
+        assert odds['ev'] == pytest.approx(ev, rel=1e-9)
+
+
+def test_published_house_edges():
+    # 8 decks at 30/12/5: the Perfect Pairs player edge is 2/415. 21+3 at 100/40/30/10/5 is 3.70% to the house.
+    assert perfect_pairs_odds(full_code_counts(8))['ev'] == pytest.approx(2/415)
+    assert twenty_one_plus_three_odds(full_code_counts(8))['ev'] == pytest.approx(-0.037039, abs=1e-6)
+    assert perfect_pairs_odds(full_code_counts(1))['ev'] == pytest.approx(-26/51)
+
+
+def test_depleted_shoe_matches_enumeration():
+    cards = bytearray(DECK_TEMPLATE * 2)
+    random.Random(5).shuffle(cards)
+    cards = cards[:14]
+
+    pair_hits, triple_hits = {}, {}
+    pairs = list(itertools.permutations(cards, 2))
+    triples = list(itertools.permutations(cards, 3))
+    for first, second in pairs:
+        payoff = check_perfect_pair([first, second], {'sidebet_L': 0})['sidebet_L']
+        pair_hits[payoff] = pair_hits.get(payoff, 0) + 1
+    for first, second, upcard in triples:
+        payoff = check_21_plus_3([first, second], [upcard], {'sidebet_R': 0})['sidebet_R']
+        triple_hits[payoff] = triple_hits.get(payoff, 0) + 1
+
+    for odds, hits, total, payouts in ((perfect_pairs_odds(code_counts(cards)), pair_hits, len(pairs), SIDEBET_L_PAYOUTS),
+                                       (twenty_one_plus_three_odds(code_counts(cards)), triple_hits, len(triples), SIDEBET_R_PAYOUTS)):
+        for name, payoff in payouts.items():
+            assert odds['probabilities'][name] == pytest.approx(hits.get(payoff, 0) / total)
+        assert odds['probabilities']['lose'] == pytest.approx(hits.get(0, 0) / total)
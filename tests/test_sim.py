@@ -0,0 +1,17 @@
+### SIMULATOR TESTS ###
+# Run with: python -m pytest tests
+
+
+from blackjack.sim import MAX_TASK_ROUNDS, MIN_TASK_ROUNDS, TASK_COUNT, default_task_size, simulate
+
+
+def test_default_task_size():
+    assert default_task_size(1000) == MIN_TASK_ROUNDS
+    assert default_task_size(TASK_COUNT * 20000) == 20000
+    assert default_task_size(10**9) == MAX_TASK_ROUNDS
+
+
+def test_same_numbers_on_any_number_of_workers():
+    one = simulate(rounds=3*MIN_TASK_ROUNDS, seed=5)
+    three = simulate(rounds=3*MIN_TASK_ROUNDS, workers=3, seed=5)
+    assert (one.rounds, one.shoes, one.main_sum, one.main_sum_sq) == (three.rounds, three.shoes, three.main_sum, three.main_sum_sq)
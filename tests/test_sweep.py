@@ -0,0 +1,50 @@
+### RULE SWEEP TESTS ###
+# Run with: python -m pytest tests
+
+
+import json
+
+from blackjack.sweep import BETS, LEDGER_FIELDS, LEDGER_VERSION, load_ledger, rule_grid, sweep
+
+
+def test_earlier_ledger_versions_are_played_again(tmp_path):
+    ledger_path = str(tmp_path / 'sweep.jsonl')
+    grid = rule_grid(['8'], ['H17'], ['3:2'], ['NDAS'], ['2'], ['DA'])
+    sweep(grid, 2000, task_size=1000, ledger_path=ledger_path)
+
+    # rows without the current version are ignored on resume
+    with open(ledger_path) as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry['version'] for entry in entries] == [LEDGER_VERSION]*2
+    with open(ledger_path, 'w') as f:
+        for entry in entries:
+            del entry['version']
+            f.write(json.dumps(entry) + '\n')
+    assert load_ledger(ledger_path) == {}
+    assert entries[0]['bets'] == list(BETS)
+
+
+def test_resume_plays_only_the_missing_tasks(tmp_path, capsys):
+    grid = rule_grid(['8'], ['S17', 'H17'], ['3:2'], ['NDAS'], ['2'], ['DA'])
+    full = sweep(grid, 2000, task_size=1000, ledger_path=str(tmp_path / 'full.jsonl'))
+    with open(tmp_path / 'full.jsonl') as f:
+        lines = f.readlines()
+    assert len(lines) == 4
+
+    # an interrupted run: two tasks done, the third cut off mid-line
+    ledger_path = str(tmp_path / 'sweep.jsonl')
+    with open(ledger_path, 'w') as f:
+        f.writelines(lines[:2])
+        f.write(lines[2][:20])
+    capsys.readouterr()
+    resumed = sweep(grid, 2000, task_size=1000, ledger_path=ledger_path)
+    assert '2 of 4 tasks to play' in capsys.readouterr().out
+
+    # the ledger keeps only LEDGER_FIELDS of a task
+    for spec, stats in full.items():
+        assert [getattr(resumed[spec], name) for name in LEDGER_FIELDS] == [getattr(stats, name) for name in LEDGER_FIELDS]
+    assert len(load_ledger(ledger_path)) == 4
+
+    # nothing left to play
+    sweep(grid, 2000, task_size=1000, ledger_path=ledger_path)
+    assert 'tasks to play' not in capsys.readouterr().out